@@ -0,0 +1,91 @@
+#
+# bench_dispatch.py - instructions per second of Decompiler.decompile
+#
+# Compares the original dispatch loop, which built the handler name and
+# looked it up with getattr for every instruction, with dispatch through
+# the per-class table from dispatch_table().  Both are driven by
+# run_engine, which resumes the handlers that are generators.  The
+# module is compiled to 2.0 bytecode by compile20:
+#
+#     python benchmarks/bench_dispatch.py [statements] [repeats]
+#
+
+import os, string, sys, time, types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+class GetattrDispatch:
+
+    # A dispatch table that looks each handler up by name when it is
+    # indexed, as the dispatch loop before dispatch_table did for every
+    # instruction.
+
+    def __init__(self, klass):
+        self.klass = klass
+
+    def __getitem__(self, op):
+        return getattr(self.klass,
+                       string.replace(decompile.opname[op], '+', '_'))
+
+class GetattrDecompiler(decompile.Decompiler):
+
+    # the engine's frames dispatch by getattr
+    def begin(self, code, termop, onerror):
+        frame = decompile.Decompiler.begin(self, code, termop, onerror)
+        if frame is not None:
+            frame.dispatch = GetattrDispatch(self.__class__)
+        return frame
+
+def make_source(n):
+    # straight-line statements, with a function every tenth statement
+    lines = []
+    for i in range(n):
+        if i % 10 == 0:
+            lines.append('def f%d(a, b=%d, *c):' % (i, i))
+            lines.append('    return a.b(b, c[%d], d=-a) * (b - %d)' % (i, i))
+        else:
+            lines.append('x%d = a.b(c, d[%d:], e=%d) + f * (g - %d) / h'
+                         % (i, i, i, i))
+    return string.join(lines, '\n') + '\n'
+
+def count_instructions(code):
+    count = len(decompile.InstructionStream(code).offsets)
+    for const in code.co_consts:
+        if type(const) is types.CodeType:
+            count = count + count_instructions(const)
+    return count
+
+def run(klass, cursor, code, repeats):
+    best = None
+    for i in range(repeats):
+        start = time.time()
+        d = klass((2, 0))
+        d.decompile(cursor(code))
+        d.getsource(0)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main(args):
+    statements = 2000
+    repeats = 5
+    if args:
+        statements = int(args[0])
+    if args[1:]:
+        repeats = int(args[1])
+    code = compile20.compile_source(make_source(statements), '<bench>')
+    ninstr = count_instructions(code)
+    print '%d instructions, best of %d runs' % (ninstr, repeats)
+    print '%-10s %-20s %12s' % ('dispatch', 'cursor', 'instr/s')
+    for cursor in (decompile.CodeCursor, decompile.DecodedCodeCursor):
+        for name, klass in (('getattr', GetattrDecompiler),
+                            ('table', decompile.Decompiler)):
+            elapsed = run(klass, cursor, code, repeats)
+            print '%-10s %-20s %12.0f' % (name, cursor.__name__,
+                                          ninstr / elapsed)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,108 @@
+#
+# bench_memory.py - memory used per decompiled instruction
+#
+# Each decompile.py named on the command line (by default the one in
+# this tree) is loaded into a fresh child process, which decompiles a
+# generated module and reports the growth of its peak RSS, and the size
+# of a typical expression node.  The lines are streamed where the
+# Decompiler supports it, so that the expression nodes dominate.  The
+# module is compiled to 2.0 bytecode by compile20.  Naming an older copy
+# of decompile.py as well gives a before and after comparison:
+#
+#     python benchmarks/bench_memory.py [-n statements] [decompile.py ...]
+#
+
+import getopt, os, resource, string, sys, types
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import compile20
+
+def make_source(n):
+    # expression heavy statements, a function every tenth statement and a
+    # large table every hundredth, whose expression is alive all at once
+    lines = []
+    for i in range(n):
+        if i % 100 == 0:
+            items = []
+            for j in range(200):
+                items.append('(a%d, b.c, None, d[%d], -e)' % (j, j))
+            lines.append('t%d = [%s]' % (i, string.join(items, ', ')))
+        elif i % 10 == 0:
+            lines.append('def f%d(a, b=None, *c):' % i)
+            lines.append('    return a.b(b, c[%d], None, d=-a) * (b - a)' % i)
+        else:
+            lines.append('x%d = a.b(c, [d, e, None], e=%d) + f * (g - h) / h'
+                         % (i, i))
+    return string.join(lines, '\n') + '\n'
+
+def count_instructions(code, module):
+    count = len(module.InstructionStream(code).offsets)
+    for const in code.co_consts:
+        if type(const) is types.CodeType:
+            count = count + count_instructions(const, module)
+    return count
+
+def node_size(module):
+    # bytes for a Local node, including its instance dictionary if any
+    node = module.Local('name')
+    size = sys.getsizeof(node)
+    if hasattr(node, '__dict__'):
+        size = size + sys.getsizeof(node.__dict__)
+    return size
+
+def measure(filename, codefile):
+    # Run in a fresh process for each module, so that the peak RSS
+    # reflects the decompilation rather than compiling the source.
+    import imp, marshal
+    module = imp.load_source('decompile_under_test', filename)
+    f = open(codefile, 'rb')
+    code = marshal.load(f)
+    f.close()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    d = module.Decompiler((2, 0))
+    if hasattr(d, 'iterdecompile'):
+        # stream the lines, so that the expressions dominate
+        for item in d.iterdecompile(module.CodeCursor(code)):
+            pass
+    else:
+        d.decompile(module.CodeCursor(code))
+        d.getsource(0)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    ninstr = count_instructions(code, module)
+    # ru_maxrss is in kilobytes on Linux
+    return ninstr, (after - before) * 1024, node_size(module)
+
+def main(args):
+    import marshal, tempfile
+    opts, args = getopt.getopt(args, 'n:', ['child'])
+    statements = 20000
+    for opt, value in opts:
+        if opt == '-n':
+            statements = int(value)
+        elif opt == '--child':
+            print `measure(args[0], args[1])`
+            return
+    if not args:
+        args = [os.path.join(os.path.dirname(here), 'decompile.py')]
+    code = compile20.compile_source(make_source(statements), '<bench>')
+    fd, codefile = tempfile.mkstemp('.marshal')
+    try:
+        os.write(fd, marshal.dumps(code))
+        os.close(fd)
+        print '%-40s %10s %12s %10s %10s' % ('module', 'instr', 'peak RSS',
+                                             'bytes/ins', 'node size')
+        for filename in args:
+            pipe = os.popen('"%s" "%s" --child "%s" "%s"' %
+                            (sys.executable, os.path.abspath(__file__),
+                             filename, codefile))
+            ninstr, growth, size = eval(pipe.read())
+            pipe.close()
+            print '%-40s %10d %12d %10.1f %10d' % (
+                filename[-40:], ninstr, growth, float(growth) / ninstr, size)
+    finally:
+        os.remove(codefile)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+#
+# bench_oneline.py - many statements on one line
+#
+# Decompiles modules of n simple statements all on the same line, as in
+# generated code or bytecode whose line numbers were stripped, for n
+# doubling up to the given size (10000 by default), and fits the times
+# to n ** k.  Adding each statement to its line should take constant
+# time, so k should be close to 1; joining each statement onto the line
+# so far makes it close to 2.  Each decompile.py named on the command
+# line (by default the one in this tree) is measured, so an older copy
+# gives a before and after comparison.  The modules are compiled to 2.0
+# bytecode by compile20:
+#
+#     python benchmarks/bench_oneline.py [-n statements] [decompile.py ...]
+#
+
+import getopt, imp, math, os, string, sys, time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import compile20
+
+def make_source(n):
+    statements = []
+    for i in range(n):
+        statements.append('a%d = b' % i)
+    return string.join(statements, '; ') + '\n'
+
+def run(module, code, repeats):
+    best = None
+    for i in range(repeats):
+        start = time.time()
+        d = module.Decompiler((2, 0))
+        d.decompile(module.CodeCursor(code))
+        d.getsource(0)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def exponent(sizes, times):
+    # the least squares slope of log(time) against log(size)
+    xs = map(math.log, sizes)
+    ys = map(lambda t: math.log(max(t, 1e-9)), times)
+    n = len(xs)
+    mx = reduce(lambda a, b: a + b, xs) / n
+    my = reduce(lambda a, b: a + b, ys) / n
+    sxy = sxx = 0.0
+    for x, y in map(None, xs, ys):
+        sxy = sxy + (x - mx) * (y - my)
+        sxx = sxx + (x - mx) * (x - mx)
+    return sxy / sxx
+
+def main(args):
+    opts, args = getopt.getopt(args, 'n:r:')
+    statements = 10000
+    repeats = 3
+    for opt, value in opts:
+        if opt == '-n':
+            statements = int(value)
+        elif opt == '-r':
+            repeats = int(value)
+    if not args:
+        args = [os.path.join(os.path.dirname(here), 'decompile.py')]
+    sizes = []
+    n = statements
+    while n >= statements / 8 and n > 0:
+        sizes.insert(0, n)
+        n = n / 2
+    codes = map(lambda n: compile20.compile_source(make_source(n), '<oneline>'),
+                sizes)
+    print '%-30s %s %8s' % ('decompile.py',
+                            string.join(map(lambda n: '%9d' % n, sizes), ' '),
+                            'exponent')
+    for i in range(len(args)):
+        module = imp.load_source('decompile_%d' % i, args[i])
+        times = map(lambda code, module=module, repeats=repeats:
+                    run(module, code, repeats), codes)
+        name = args[i]
+        if len(name) > 30:
+            name = '...' + name[-27:]
+        print '%-30s %s %8.2f' % (
+            name, string.join(map(lambda t: '%8.3fs' % t, times), ' '),
+            exponent(sizes, times))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,98 @@
+#
+# bench_prescan.py - decoding instructions with and without NumPy
+#
+# Decodes the instructions and line tables of every code object in the
+# 1.5.2 and 2.0 modules named on the command line (by default the
+# benchmark corpus, compiled to 2.0 bytecode by compile20 as many times
+# as -n says), once with InstructionStream and line_table a code object
+# at a time, and once with a Prescan of them all, checks that the two
+# agree, and prints the throughput of each in megabytes of bytecode per
+# second:
+#
+#     python benchmarks/bench_prescan.py [-r repeats] [-n copies]
+#                                        [file|dir|glob ...]
+#
+# The Prescan needs NumPy; without it there is nothing to compare.
+#
+
+import getopt, glob, os, sys, time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import compile20, decompile
+
+def decode(codes):
+    for co in codes:
+        decompile.InstructionStream(co)
+        decompile.line_table(co)
+
+def best(function, args, repeats):
+    least = None
+    for i in range(repeats):
+        start = time.time()
+        apply(function, args)
+        elapsed = time.time() - start
+        if least is None or elapsed < least:
+            least = elapsed
+    return max(least, 1e-9)
+
+def main(args):
+    try:
+        import prescan
+    except ImportError:
+        sys.stderr.write('bench_prescan.py: NumPy is not installed\n')
+        return 0
+    opts, args = getopt.getopt(args, 'r:n:')
+    repeats = 3
+    copies = 20
+    for opt, value in opts:
+        if opt == '-r':
+            repeats = int(value)
+        elif opt == '-n':
+            copies = int(value)
+    codes = []
+    if not args:
+        sources = glob.glob(os.path.join(here, 'corpus', '*.py'))
+        sources.sort()
+        for i in range(copies):
+            for filename in sources:
+                f = open(filename)
+                source = f.read()
+                f.close()
+                codes.extend(prescan.code_objects(
+                    compile20.compile_source(source, filename)))
+    for filename, relname in decompile.find_inputs(args):
+        try:
+            version, code = decompile.load_pyc(filename)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            continue
+        codes.extend(prescan.code_objects(code))
+    if not codes:
+        sys.stderr.write('bench_prescan.py: no compiled modules found\n')
+        return 1
+    scan = prescan.Prescan(codes)
+    for co in codes:
+        stream = decompile.InstructionStream(co)
+        other = scan.Stream(co)
+        for name in ('offsets', 'opcodes', 'operands', 'nexts', 'index'):
+            assert getattr(stream, name) == getattr(other, name), \
+                   `co, name`
+        assert decompile.line_table(co) == scan.LineTable(co), `co`
+        assert decompile.jump_targets(stream) == scan.JumpTargets(co), `co`
+    size = 0
+    for co in codes:
+        size = size + len(co.co_code)
+    megabytes = size / 1e6
+    print '%d code objects, %d bytes of bytecode' % (len(codes), size)
+    single = best(decode, (codes,), repeats)
+    print '%-20s %8.3fs %8.2f MB/s' % ('InstructionStream', single,
+                                       megabytes / single)
+    whole = best(prescan.Prescan, (codes,), repeats)
+    print '%-20s %8.3fs %8.2f MB/s' % ('Prescan', whole, megabytes / whole)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
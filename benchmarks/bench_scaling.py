@@ -0,0 +1,194 @@
+#
+# bench_scaling.py - how the decompiler scales along each input shape
+#
+# Generates modules that grow along one axis at a time, decompiles each
+# one (Decompiler.decompile and getsource, with the instructions decoded
+# beforehand) and fits the times to size ** k, as bench_oneline.py does
+# for one of the axes:
+#
+#     depth        if statements nested inside each other, each with
+#                  the same number of statements in its body
+#     elif         branches of one if/elif chain
+#     oneline      simple statements on one line
+#     expression   terms of one expression, a + a + ... + a
+#     list         items of a list display of constants
+#     dict         items of a dict display
+#
+# Each axis is run at four sizes, doubling up to its largest, which -s
+# scales.  The work per item should be constant, so k should be close
+# to 1; an axis whose exponent is above the threshold (-t, by default
+# 1.25) is flagged, as is an axis the Decompiler fails on, with its
+# error, and the exit status is then 1.  The results can be saved as
+# JSON with -o.  The modules are compiled to 2.0 bytecode by compile20:
+#
+#     python benchmarks/bench_scaling.py [-r repeats] [-s scale] [-t 1.25]
+#                                        [-o results.json] [axis ...]
+#
+
+import StringIO, getopt, os, string, sys, time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import compile20, decompile
+from bench_oneline import exponent
+
+def make_depth(n, body=60):
+    lines = []
+    for i in range(n):
+        lines.append('%sif a%d:' % (' ' * i, i))
+        for j in range(body):
+            lines.append('%s b%d = %d' % (' ' * i, j, i))
+    lines.append('%sc = b' % (' ' * n))
+    return string.join(lines, '\n') + '\n'
+
+def make_elif(n):
+    lines = ['if x == 0:', '    a = 0']
+    for i in range(1, n):
+        lines.append('elif x == %d:' % i)
+        lines.append('    a = %d' % i)
+    lines.append('else:')
+    lines.append('    a = None')
+    return string.join(lines, '\n') + '\n'
+
+def make_oneline(n):
+    statements = []
+    for i in range(n):
+        statements.append('a%d = b' % i)
+    return string.join(statements, '; ') + '\n'
+
+def make_expression(n):
+    return 'x = ' + string.join(['a'] * n, ' + ') + '\n'
+
+def make_list(n):
+    return 'x = [' + string.join(map(str, range(n)), ', ') + ']\n'
+
+def make_dict(n):
+    items = []
+    for i in range(n):
+        items.append('%d: a' % i)
+    return 'x = {' + string.join(items, ', ') + '}\n'
+
+# (name, source generator, largest size), the sizes large enough that
+# the smallest takes some milliseconds; the jumps over the outermost if
+# and over an if/elif chain must stay under 64K bytes
+AXES = [
+    ('depth', make_depth, 96),
+    ('elif', make_elif, 2000),
+    ('oneline', make_oneline, 32000),
+    ('expression', make_expression, 12800),
+    ('list', make_list, 80000),
+    ('dict', make_dict, 40000),
+]
+
+def run(code, repeats):
+    codes = [code]
+    streams = {}
+    while codes:
+        co = codes.pop()
+        streams[id(co)] = decompile.InstructionStream(co)
+        for const in co.co_consts:
+            if type(const) is type(code):
+                codes.append(const)
+    class Cursor(decompile.DecodedCodeCursor):
+        def __init__(self, code, streams=streams):
+            decompile.DecodedCodeCursor.__init__(self, code,
+                                                 streams[id(code)])
+    best = None
+    for i in range(repeats):
+        start = time.time()
+        d = decompile.Decompiler((2, 0))
+        d.decompile(Cursor(code))
+        d.getsource(0)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def measure(name, make, largest, repeats):
+    # the sizes, times and fitted exponent of one axis, or the error at
+    # the first size that fails
+    sizes = []
+    n = largest
+    while n >= largest / 8 and n > 0:
+        sizes.insert(0, n)
+        n = n / 2
+    times = []
+    result = {'sizes': sizes, 'times': times, 'exponent': None,
+              'error': None}
+    for n in sizes:
+        # the Decompiler prints a disassembly when it fails
+        stdout = sys.stdout
+        sys.stdout = StringIO.StringIO()
+        try:
+            try:
+                code = compile20.compile_source(apply(make, (n,)),
+                                                '<%s %d>' % (name, n))
+                times.append(run(code, repeats))
+            finally:
+                sys.stdout = stdout
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            result['error'] = 'size %d: %s' % (n, decompile.describe_error())
+            return result
+    result['exponent'] = exponent(sizes, times)
+    return result
+
+def main(args):
+    opts, args = getopt.getopt(args, 'r:s:t:o:')
+    repeats = 3
+    scale = 1.0
+    threshold = 1.25
+    output = None
+    for opt, value in opts:
+        if opt == '-r':
+            repeats = int(value)
+        elif opt == '-s':
+            scale = float(value)
+        elif opt == '-t':
+            threshold = float(value)
+        elif opt == '-o':
+            output = value
+    # compile20 parses with the compiler package, which recurses for each
+    # node of the parse tree, and an if nested 96 deep is thousands
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    axes = AXES
+    if args:
+        axes = filter(lambda axis, args=args: axis[0] in args, AXES)
+    results = {}
+    flagged = 0
+    print '%-11s %s %8s' % ('axis', string.join(map(
+        lambda i: '%16s' % ('size %d' % i), range(1, 5)), ' '), 'exponent')
+    for name, make, largest in axes:
+        if name == 'depth':
+            # the tokenizer allows only 100 levels of indentation
+            largest = min(int(largest * scale), 96)
+        else:
+            largest = max(int(largest * scale), 8)
+        result = measure(name, make, largest, repeats)
+        results[name] = result
+        cells = map(lambda n, t: '%6d %8.3fs' % (n, t),
+                    result['sizes'][:len(result['times'])], result['times'])
+        if result['error'] is not None:
+            print '%-11s %s' % (name, result['error'])
+            flagged = flagged + 1
+            continue
+        flag = ''
+        if result['exponent'] > threshold:
+            flag = '  superlinear'
+            flagged = flagged + 1
+        print '%-11s %s %8.2f%s' % (name, string.join(cells, ' '),
+                                    result['exponent'], flag)
+    if output is not None:
+        import json, platform
+        f = open(output, 'w')
+        json.dump({'python': platform.python_version(), 'repeats': repeats,
+                   'threshold': threshold, 'axes': results},
+                  f, indent=1, sort_keys=True)
+        f.write('\n')
+        f.close()
+    return flagged and 1 or 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,274 @@
+#
+# bench_suite.py - decompiler throughput over the checked-in corpus
+#
+# Each module in benchmarks/corpus (or each source file named on the
+# command line) is compiled to 2.0 bytecode by compile20 and decompiled
+# in a fresh child process, so that the peak RSS of one module is not hidden
+# by another, or by the compiler.  The peak reported is the child's own
+# max RSS, interpreter and all, since the growth while decompiling is
+# lost in the pages already held for anything but a large module.  The
+# time of each phase of the Decompiler is the best of several runs:
+#
+#     decode      InstructionStream for every code object
+#     decompile   Decompiler.decompile, with the instructions decoded
+#     source      Decompiler.getsource
+#     format      format_source, joining the lines into the module text
+#
+# The results can be saved as JSON, and compared with results saved
+# earlier, which gives an exit status of 1 if any module got slower by
+# more than the tolerance (a fraction, by default 0.1):
+#
+#     python benchmarks/bench_suite.py -o baseline.json
+#     python benchmarks/bench_suite.py -b baseline.json [-t 0.1]
+#
+# A module that can't be compiled, or that the Decompiler fails on, is
+# reported with its error and left out of the totals.  If that leaves
+# nothing measured, the exit status is 1.
+#
+
+import getopt, glob, os, resource, string, sys, time, types
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import compile20, decompile
+
+PHASES = ('decode', 'decompile', 'source', 'format')
+
+class PredecodedCursor(decompile.DecodedCodeCursor):
+
+    # a DecodedCodeCursor using instructions decoded before it was made,
+    # so that decoding is timed as a phase of its own
+    streams = {}
+
+    def __init__(self, code, stream=None):
+        if stream is None:
+            stream = self.streams[id(code)]
+        decompile.DecodedCodeCursor.__init__(self, code, stream)
+
+def code_objects(code):
+    codes = [code]
+    for const in code.co_consts:
+        if type(const) is types.CodeType:
+            codes.extend(code_objects(const))
+    return codes
+
+def count_instructions(codes):
+    count = 0
+    for co in codes:
+        count = count + len(decompile.InstructionStream(co).offsets)
+    return count
+
+def run_once(code, codes, version):
+    times = {}
+    start = time.time()
+    streams = {}
+    for co in codes:
+        streams[id(co)] = decompile.InstructionStream(co)
+    PredecodedCursor.streams = streams
+    times['decode'] = time.time() - start
+    start = time.time()
+    d = decompile.Decompiler(version)
+    d.decompile(PredecodedCursor(code))
+    times['decompile'] = time.time() - start
+    start = time.time()
+    lines = d.getsource(0)
+    times['source'] = time.time() - start
+    start = time.time()
+    text = decompile.format_source(lines)
+    times['format'] = time.time() - start
+    PredecodedCursor.streams = {}
+    return times, len(lines)
+
+def measure(codefile, repeats):
+    # Run in the child process, on a marshalled code object.  The
+    # Decompiler prints a disassembly when it fails, which must not get
+    # mixed up with the results.
+    import marshal, StringIO
+    f = open(codefile, 'rb')
+    code = marshal.load(f)
+    f.close()
+    codes = code_objects(code)
+    result = {
+        'code_objects': len(codes),
+        'error': None,
+    }
+    version = (2, 0)
+    best = {}
+    stdout = sys.stdout
+    sys.stdout = StringIO.StringIO()
+    try:
+        try:
+            for i in range(repeats):
+                times, nlines = run_once(code, codes, version)
+                for phase in PHASES:
+                    if not best.has_key(phase) or times[phase] < best[phase]:
+                        best[phase] = times[phase]
+        finally:
+            sys.stdout = stdout
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except:
+        exc_type, exc_value = sys.exc_info()[:2]
+        result['error'] = '%s: %s' % (getattr(exc_type, '__name__', exc_type),
+                                      exc_value)
+        result['instructions'] = count_instructions(codes)
+        return result
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # counted afterwards, so as not to add to the peak RSS
+    instructions = count_instructions(codes)
+    result['instructions'] = instructions
+    total = 0.0
+    for phase in PHASES:
+        total = total + best[phase]
+    total = max(total, 1e-9)
+    result['lines'] = nlines
+    result['phases'] = best
+    result['total'] = total
+    result['instructions_per_second'] = instructions / total
+    result['code_objects_per_second'] = len(codes) / total
+    # ru_maxrss is in kilobytes on Linux
+    result['max_rss_bytes'] = maxrss * 1024
+    return result
+
+def run_child(filename, repeats):
+    import json, marshal, tempfile
+    f = open(filename)
+    source = f.read()
+    f.close()
+    try:
+        code = compile20.compile_source(source, os.path.basename(filename))
+    except SyntaxError:
+        return {'error': decompile.describe_error()}
+    fd, codefile = tempfile.mkstemp('.marshal')
+    try:
+        os.write(fd, marshal.dumps(code))
+        os.close(fd)
+        pipe = os.popen('"%s" "%s" --child -n %d "%s"' %
+                        (sys.executable, os.path.abspath(__file__), repeats,
+                         codefile))
+        output = pipe.read()
+        status = pipe.close()
+    finally:
+        os.remove(codefile)
+    if status:
+        return {'error': 'child exited with status %d' % (status >> 8)}
+    return json.loads(output)
+
+def totals(files):
+    instructions = codes = 0
+    total = 0.0
+    for result in files.values():
+        if result.get('error') is None:
+            instructions = instructions + result['instructions']
+            codes = codes + result['code_objects']
+            total = total + result['total']
+    total = max(total, 1e-9)
+    return {
+        'instructions': instructions,
+        'code_objects': codes,
+        'total': total,
+        'instructions_per_second': instructions / total,
+        'code_objects_per_second': codes / total,
+    }
+
+def report(files):
+    names = files.keys()
+    names.sort()
+    print '%-20s %8s %6s %12s %10s %10s  %s' % (
+        'module', 'instr', 'codes', 'instr/s', 'codes/s', 'max RSS',
+        string.join(map(lambda phase: '%9s' % phase, PHASES), ' '))
+    for name in names:
+        result = files[name]
+        if result.get('error') is not None:
+            print '%-20s %s' % (name, result['error'])
+            continue
+        phases = map(lambda phase, times=result['phases']:
+                     '%8.2fms' % (times[phase] * 1000), PHASES)
+        print '%-20s %8d %6d %12.0f %10.0f %10d  %s' % (
+            name, result['instructions'], result['code_objects'],
+            result['instructions_per_second'],
+            result['code_objects_per_second'], result['max_rss_bytes'],
+            string.join(phases, ' '))
+    all = totals(files)
+    print '%-20s %8d %6d %12.0f %10.0f' % (
+        'total', all['instructions'], all['code_objects'],
+        all['instructions_per_second'], all['code_objects_per_second'])
+
+def compare(files, baseline, tolerance):
+    # Print the change in time of each module also in the baseline, and
+    # return the number that got slower by more than the tolerance.
+    print
+    print '%-20s %10s %10s %8s' % ('module', 'baseline', 'now', 'change')
+    names = files.keys()
+    names.sort()
+    regressions = 0
+    for name in names:
+        old = baseline['files'].get(name)
+        new = files[name]
+        if old is None or old.get('error') is not None or \
+           new.get('error') is not None:
+            continue
+        change = new['total'] / old['total'] - 1
+        flag = ''
+        if change > tolerance:
+            flag = '  slower'
+            regressions = regressions + 1
+        print '%-20s %8.2fms %8.2fms %+7.1f%%%s' % (
+            name, old['total'] * 1000, new['total'] * 1000, change * 100, flag)
+    return regressions
+
+def main(args):
+    import json, platform
+    opts, args = getopt.getopt(args, 'n:o:b:t:', ['child'])
+    repeats = 5
+    output = baseline = None
+    tolerance = 0.1
+    child = 0
+    for opt, value in opts:
+        if opt == '-n':
+            repeats = int(value)
+        elif opt == '-o':
+            output = value
+        elif opt == '-b':
+            baseline = value
+        elif opt == '-t':
+            tolerance = float(value)
+        elif opt == '--child':
+            child = 1
+    if child:
+        print json.dumps(measure(args[0], repeats))
+        return 0
+    if not args:
+        args = glob.glob(os.path.join(here, 'corpus', '*.py'))
+        args.sort()
+    files = {}
+    for filename in args:
+        files[os.path.basename(filename)] = run_child(filename, repeats)
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'files': files,
+        'totals': totals(files),
+    }
+    report(files)
+    measured = results['totals']['instructions']
+    if output is not None:
+        f = open(output, 'w')
+        json.dump(results, f, indent=1, sort_keys=True)
+        f.write('\n')
+        f.close()
+    if not measured:
+        sys.stderr.write('no module was measured\n')
+        return 1
+    if baseline is not None:
+        f = open(baseline)
+        regressions = compare(files, json.load(f), tolerance)
+        f.close()
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,153 @@
+# Long if/elif chains, as written by hand in parsers and dispatchers.
+
+def token_kind(c):
+    if c == '(':
+        return 'lparen'
+    elif c == ')':
+        return 'rparen'
+    elif c == '[':
+        return 'lsqb'
+    elif c == ']':
+        return 'rsqb'
+    elif c == '{':
+        return 'lbrace'
+    elif c == '}':
+        return 'rbrace'
+    elif c == ':':
+        return 'colon'
+    elif c == ',':
+        return 'comma'
+    elif c == ';':
+        return 'semi'
+    elif c == '+':
+        return 'plus'
+    elif c == '-':
+        return 'minus'
+    elif c == '*':
+        return 'star'
+    elif c == '/':
+        return 'slash'
+    elif c == '|':
+        return 'vbar'
+    elif c == '&':
+        return 'amper'
+    elif c == '<':
+        return 'less'
+    elif c == '>':
+        return 'greater'
+    elif c == '=':
+        return 'equal'
+    elif c == '.':
+        return 'dot'
+    elif c == '%':
+        return 'percent'
+    elif c == '`':
+        return 'backquote'
+    elif c == '^':
+        return 'circumflex'
+    elif c == '~':
+        return 'tilde'
+    elif c == '@':
+        return 'at'
+    else:
+        return 'unknown'
+
+def http_reason(status):
+    if status == 100:
+        reason = 'Continue'
+    elif status == 200:
+        reason = 'OK'
+    elif status == 201:
+        reason = 'Created'
+    elif status == 202:
+        reason = 'Accepted'
+    elif status == 204:
+        reason = 'No Content'
+    elif status == 301:
+        reason = 'Moved Permanently'
+    elif status == 302:
+        reason = 'Found'
+    elif status == 304:
+        reason = 'Not Modified'
+    elif status == 400:
+        reason = 'Bad Request'
+    elif status == 401:
+        reason = 'Unauthorized'
+    elif status == 403:
+        reason = 'Forbidden'
+    elif status == 404:
+        reason = 'Not Found'
+    elif status == 405:
+        reason = 'Method Not Allowed'
+    elif status == 500:
+        reason = 'Internal Server Error'
+    elif status == 501:
+        reason = 'Not Implemented'
+    elif status == 502:
+        reason = 'Bad Gateway'
+    elif status == 503:
+        reason = 'Service Unavailable'
+    else:
+        reason = 'Unknown'
+    return reason
+
+def classify(x):
+    if x < 0:
+        kind = 'negative'
+    elif x == 0:
+        kind = 'zero'
+    elif x < 10:
+        kind = 'digit'
+    elif x < 100:
+        kind = 'tens'
+    elif x < 1000:
+        kind = 'hundreds'
+    elif x < 10000:
+        kind = 'thousands'
+    elif x < 100000:
+        kind = 'ten thousands'
+    elif x < 1000000:
+        kind = 'hundred thousands'
+    else:
+        kind = 'millions'
+    return kind
+
+def execute(machine, op, arg):
+    if op == 'push':
+        machine.stack.append(arg)
+    elif op == 'pop':
+        machine.stack.pop()
+    elif op == 'dup':
+        machine.stack.append(machine.stack[-1])
+    elif op == 'add':
+        b = machine.stack.pop()
+        a = machine.stack.pop()
+        machine.stack.append(a + b)
+    elif op == 'sub':
+        b = machine.stack.pop()
+        a = machine.stack.pop()
+        machine.stack.append(a - b)
+    elif op == 'mul':
+        b = machine.stack.pop()
+        a = machine.stack.pop()
+        machine.stack.append(a * b)
+    elif op == 'div':
+        b = machine.stack.pop()
+        a = machine.stack.pop()
+        machine.stack.append(a / b)
+    elif op == 'jump':
+        machine.pc = arg
+    elif op == 'jz':
+        if not machine.stack.pop():
+            machine.pc = arg
+    elif op == 'call':
+        machine.frames.append(machine.pc)
+        machine.pc = arg
+    elif op == 'ret':
+        machine.pc = machine.frames.pop()
+    elif op == 'print':
+        print machine.stack[-1]
+    elif op == 'halt':
+        machine.running = 0
+    else:
+        raise ValueError, op
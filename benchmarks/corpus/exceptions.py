@@ -0,0 +1,110 @@
+# Heavy try/except/finally use, as in I/O and network code.
+
+import os, sys
+
+class ParseError(Exception):
+    pass
+
+def read_file(filename):
+    try:
+        f = open(filename)
+    except IOError:
+        return None
+    try:
+        data = f.read()
+    finally:
+        f.close()
+    return data
+
+def to_int(s, default=0):
+    try:
+        return int(s)
+    except ValueError:
+        return default
+
+def to_number(s):
+    try:
+        return int(s)
+    except ValueError:
+        try:
+            return float(s)
+        except ValueError:
+            raise ParseError, s
+
+def remove(filename):
+    try:
+        os.remove(filename)
+    except OSError, e:
+        if os.path.exists(filename):
+            raise
+
+def lookup(table, key):
+    try:
+        value = table[key]
+    except KeyError:
+        value = None
+    except TypeError, e:
+        sys.stderr.write('bad key: %s\n' % e)
+        value = None
+    return value
+
+def call_all(functions, *args):
+    results = []
+    errors = 0
+    for function in functions:
+        try:
+            results.append(apply(function, args))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            errors = errors + 1
+    return results, errors
+
+def copy(src, dst):
+    fin = open(src, 'rb')
+    try:
+        fout = open(dst, 'wb')
+        try:
+            while 1:
+                block = fin.read(8192)
+                if not block:
+                    break
+                fout.write(block)
+        finally:
+            fout.close()
+    finally:
+        fin.close()
+
+def retry(function, attempts=3):
+    while attempts:
+        attempts = attempts - 1
+        try:
+            return function()
+        except IOError:
+            if not attempts:
+                raise
+    return None
+
+def parse_lines(lines):
+    records = []
+    for line in lines:
+        try:
+            name, value = line.split('=', 1)
+        except ValueError:
+            continue
+        try:
+            records.append((name, to_number(value)))
+        except ParseError:
+            records.append((name, value))
+    return records
+
+def guarded(lock, function, args):
+    lock.acquire()
+    try:
+        try:
+            result = apply(function, args)
+        except Exception, e:
+            result = e
+    finally:
+        lock.release()
+    return result
@@ -0,0 +1,370 @@
+# A large module: a small template engine with its tokenizer, parser,
+# node classes and helpers, in the style of the standard library.
+
+import os, re, string, sys, types
+
+__version__ = '1.2'
+
+error = 'template.error'
+
+OPEN = '{{'
+CLOSE = '}}'
+BLOCK_OPEN = '{%'
+BLOCK_CLOSE = '%}'
+
+token_re = re.compile(r'(\{\{.*?\}\}|\{%.*?%\})')
+
+TEXT = 0
+VAR = 1
+BLOCK = 2
+
+def escape(s):
+    s = string.replace(s, '&', '&amp;')
+    s = string.replace(s, '<', '&lt;')
+    s = string.replace(s, '>', '&gt;')
+    s = string.replace(s, '"', '&quot;')
+    return s
+
+def tokenize(source):
+    tokens = []
+    lineno = 1
+    for bit in token_re.split(source):
+        if not bit:
+            continue
+        if bit[:2] == OPEN:
+            tokens.append((VAR, string.strip(bit[2:-2]), lineno))
+        elif bit[:2] == BLOCK_OPEN:
+            tokens.append((BLOCK, string.strip(bit[2:-2]), lineno))
+        else:
+            tokens.append((TEXT, bit, lineno))
+        lineno = lineno + string.count(bit, '\n')
+    return tokens
+
+class Context:
+
+    def __init__(self, dict=None):
+        if dict is None:
+            dict = {}
+        self.dicts = [dict]
+
+    def push(self):
+        self.dicts.insert(0, {})
+
+    def pop(self):
+        if len(self.dicts) == 1:
+            raise error, 'pop from empty context'
+        del self.dicts[0]
+
+    def __getitem__(self, key):
+        for dict in self.dicts:
+            if dict.has_key(key):
+                return dict[key]
+        raise KeyError, key
+
+    def __setitem__(self, key, value):
+        self.dicts[0][key] = value
+
+    def has_key(self, key):
+        for dict in self.dicts:
+            if dict.has_key(key):
+                return 1
+        return 0
+
+    def get(self, key, default=None):
+        if self.has_key(key):
+            return self[key]
+        return default
+
+def resolve(context, path):
+    parts = string.split(path, '.')
+    try:
+        value = context[parts[0]]
+    except KeyError:
+        return ''
+    for part in parts[1:]:
+        if hasattr(value, part):
+            value = getattr(value, part)
+        elif type(value) is types.DictType and value.has_key(part):
+            value = value[part]
+        else:
+            try:
+                value = value[int(part)]
+            except (ValueError, IndexError, TypeError):
+                return ''
+        if callable(value):
+            value = value()
+    return value
+
+class Node:
+
+    def render(self, context):
+        return ''
+
+    def nodes(self):
+        return [self]
+
+class TextNode(Node):
+
+    def __init__(self, text):
+        self.text = text
+
+    def render(self, context):
+        return self.text
+
+class VarNode(Node):
+
+    def __init__(self, expression, filters=None):
+        self.expression = expression
+        if filters is None:
+            filters = []
+        self.filters = filters
+
+    def render(self, context):
+        value = resolve(context, self.expression)
+        for name, arg in self.filters:
+            function = FILTERS[name]
+            if arg is None:
+                value = function(value)
+            else:
+                value = function(value, arg)
+        if type(value) is not types.StringType:
+            value = str(value)
+        return escape(value)
+
+class NodeList:
+
+    def __init__(self):
+        self.nodes = []
+
+    def append(self, node):
+        self.nodes.append(node)
+
+    def render(self, context):
+        bits = []
+        for node in self.nodes:
+            bits.append(node.render(context))
+        return string.join(bits, '')
+
+class IfNode(Node):
+
+    def __init__(self, condition, true, false=None):
+        self.condition = condition
+        self.true = true
+        self.false = false
+
+    def render(self, context):
+        negate = 0
+        condition = self.condition
+        if condition[:4] == 'not ':
+            negate = 1
+            condition = string.strip(condition[4:])
+        value = resolve(context, condition)
+        if negate:
+            value = not value
+        if value:
+            return self.true.render(context)
+        elif self.false is not None:
+            return self.false.render(context)
+        return ''
+
+class ForNode(Node):
+
+    def __init__(self, variable, sequence, body):
+        self.variable = variable
+        self.sequence = sequence
+        self.body = body
+
+    def render(self, context):
+        bits = []
+        sequence = resolve(context, self.sequence)
+        if not sequence:
+            return ''
+        context.push()
+        try:
+            i = 0
+            for item in sequence:
+                context[self.variable] = item
+                context['forloop'] = {'counter': i + 1, 'first': i == 0,
+                                      'last': i == len(sequence) - 1}
+                bits.append(self.body.render(context))
+                i = i + 1
+        finally:
+            context.pop()
+        return string.join(bits, '')
+
+class IncludeNode(Node):
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+
+    def render(self, context):
+        try:
+            template = self.loader(self.name)
+        except IOError, e:
+            return '<!-- include %s failed: %s -->' % (self.name, e)
+        return template.render(context)
+
+def filter_upper(value):
+    return string.upper(str(value))
+
+def filter_lower(value):
+    return string.lower(str(value))
+
+def filter_default(value, arg):
+    if not value:
+        return arg
+    return value
+
+def filter_truncate(value, arg):
+    words = string.split(str(value))
+    length = int(arg)
+    if len(words) > length:
+        words = words[:length] + ['...']
+    return string.join(words)
+
+def filter_join(value, arg):
+    return string.join(map(str, value), arg)
+
+FILTERS = {
+    'upper': filter_upper,
+    'lower': filter_lower,
+    'default': filter_default,
+    'truncate': filter_truncate,
+    'join': filter_join,
+}
+
+def parse_filters(text):
+    bits = string.split(text, '|')
+    expression = string.strip(bits[0])
+    filters = []
+    for bit in bits[1:]:
+        bit = string.strip(bit)
+        if ':' in bit:
+            name, arg = string.split(bit, ':', 1)
+            arg = string.strip(arg)
+            if arg[:1] in ('"', "'"):
+                arg = arg[1:-1]
+        else:
+            name, arg = bit, None
+        if not FILTERS.has_key(name):
+            raise error, 'unknown filter %s' % name
+        filters.append((name, arg))
+    return expression, filters
+
+class Parser:
+
+    def __init__(self, tokens, loader=None):
+        self.tokens = tokens
+        self.position = 0
+        self.loader = loader
+
+    def next(self):
+        token = self.tokens[self.position]
+        self.position = self.position + 1
+        return token
+
+    def parse(self, until=()):
+        nodelist = NodeList()
+        while self.position < len(self.tokens):
+            kind, text, lineno = self.next()
+            if kind == TEXT:
+                nodelist.append(TextNode(text))
+            elif kind == VAR:
+                expression, filters = parse_filters(text)
+                nodelist.append(VarNode(expression, filters))
+            elif kind == BLOCK:
+                command = string.split(text)[0]
+                if command in until:
+                    self.position = self.position - 1
+                    return nodelist
+                nodelist.append(self.parse_block(command, text, lineno))
+        if until:
+            raise error, 'unclosed block, expected %s' % until[0]
+        return nodelist
+
+    def parse_block(self, command, text, lineno):
+        args = string.split(text)[1:]
+        if command == 'if':
+            true = self.parse(('else', 'endif'))
+            kind, text, lineno = self.next()
+            false = None
+            if text == 'else':
+                false = self.parse(('endif',))
+                self.next()
+            return IfNode(string.join(args), true, false)
+        elif command == 'for':
+            if len(args) != 3 or args[1] != 'in':
+                raise error, 'line %d: bad for tag' % lineno
+            body = self.parse(('endfor',))
+            self.next()
+            return ForNode(args[0], args[2], body)
+        elif command == 'include':
+            if self.loader is None:
+                raise error, 'line %d: no loader for include' % lineno
+            return IncludeNode(args[0][1:-1], self.loader)
+        elif command == 'comment':
+            self.parse(('endcomment',))
+            self.next()
+            return TextNode('')
+        else:
+            raise error, 'line %d: unknown tag %s' % (lineno, command)
+
+class Template:
+
+    def __init__(self, source, loader=None):
+        self.source = source
+        self.nodelist = Parser(tokenize(source), loader).parse()
+
+    def render(self, context=None):
+        if context is None:
+            context = Context()
+        elif type(context) is types.DictType:
+            context = Context(context)
+        return self.nodelist.render(context)
+
+class Loader:
+
+    def __init__(self, directories):
+        self.directories = directories
+        self.cache = {}
+
+    def __call__(self, name):
+        if self.cache.has_key(name):
+            return self.cache[name]
+        for directory in self.directories:
+            filename = os.path.join(directory, name)
+            if os.path.isfile(filename):
+                f = open(filename)
+                try:
+                    source = f.read()
+                finally:
+                    f.close()
+                template = Template(source, self)
+                self.cache[name] = template
+                return template
+        raise IOError, 'template %s not found' % name
+
+def render_file(filename, dict, directories=None):
+    if directories is None:
+        directories = [os.path.dirname(filename)]
+    loader = Loader(directories)
+    template = loader(os.path.basename(filename))
+    return template.render(dict)
+
+def main(args):
+    if len(args) < 1:
+        sys.stderr.write('usage: template.py file [name=value ...]\n')
+        return 2
+    dict = {}
+    for arg in args[1:]:
+        if '=' not in arg:
+            sys.stderr.write('bad argument %s\n' % arg)
+            return 2
+        name, value = string.split(arg, '=', 1)
+        dict[name] = value
+    sys.stdout.write(render_file(args[0], dict))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
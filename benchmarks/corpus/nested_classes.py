@@ -0,0 +1,103 @@
+# Deeply nested classes, as found in generated bindings and test suites.
+
+class Outer:
+
+    kind = 'outer'
+
+    class Middle:
+
+        kind = 'middle'
+
+        class Inner:
+
+            kind = 'inner'
+
+            class Deeper:
+
+                kind = 'deeper'
+
+                class Deepest:
+
+                    kind = 'deepest'
+
+                    def describe(self):
+                        return 'deepest of %s' % self.kind
+
+                def describe(self):
+                    return 'deeper'
+
+                def make(self):
+                    return self.Deepest()
+
+            def describe(self):
+                return 'inner'
+
+        def describe(self):
+            return 'middle'
+
+    def describe(self):
+        return 'outer'
+
+class Config:
+
+    class Section:
+
+        def __init__(self, name, items=None):
+            self.name = name
+            if items is None:
+                items = {}
+            self.items = items
+
+        def get(self, key, default=None):
+            if self.items.has_key(key):
+                return self.items[key]
+            return default
+
+        class Item:
+
+            def __init__(self, key, value):
+                self.key = key
+                self.value = value
+
+            def __repr__(self):
+                return '%s = %s' % (self.key, self.value)
+
+    def __init__(self):
+        self.sections = {}
+
+    def section(self, name):
+        if not self.sections.has_key(name):
+            self.sections[name] = self.Section(name)
+        return self.sections[name]
+
+class Shapes:
+
+    class Shape:
+
+        def area(self):
+            raise NotImplementedError
+
+    class Rectangle(Shape):
+
+        def __init__(self, width, height):
+            self.width = width
+            self.height = height
+
+        def area(self):
+            return self.width * self.height
+
+        class Square:
+
+            def __init__(self, side):
+                self.side = side
+
+            def area(self):
+                return self.side * self.side
+
+    class Circle(Shape):
+
+        def __init__(self, radius):
+            self.radius = radius
+
+        def area(self):
+            return 3.14159 * self.radius * self.radius
@@ -0,0 +1,40 @@
+# A small module: a few constants, functions and a class.
+
+import os, string
+
+VERSION = '0.3'
+DEFAULT_WIDTH = 72
+
+def words(text):
+    return string.split(string.strip(text))
+
+def fill(text, width=DEFAULT_WIDTH):
+    lines = []
+    line = ''
+    for word in words(text):
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        elif line:
+            line = line + ' ' + word
+        else:
+            line = word
+    if line:
+        lines.append(line)
+    return string.join(lines, '\n')
+
+class Counter:
+
+    def __init__(self, start=0):
+        self.count = start
+
+    def next(self):
+        self.count = self.count + 1
+        return self.count
+
+def relative(path, base=os.curdir):
+    path = os.path.abspath(path)
+    base = os.path.abspath(base)
+    if path[:len(base)] == base:
+        return path[len(base) + 1:]
+    return path
@@ -0,0 +1,759 @@
+# Big literal tables: a keyword table, a lookup dictionary and rows
+# of mixed constants.
+
+KEYWORDS = (
+    'alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot',
+    'golf', 'hotel', 'india', 'juliet', 'kilo', 'lima',
+    'mike', 'november', 'oscar', 'papa', 'quebec', 'romeo',
+    'sierra', 'tango', 'uniform', 'victor', 'whiskey', 'xray',
+    'yankee', 'zulu',
+)
+
+CODES = {
+    'alpha0': 19818,
+    'bravo1': 34056,
+    'charlie2': 13305,
+    'delta3': 42916,
+    'echo4': 22200,
+    'foxtrot5': 3536,
+    'golf6': 53939,
+    'hotel7': 53312,
+    'india8': 9831,
+    'juliet9': 13532,
+    'kilo10': 16394,
+    'lima11': 41830,
+    'mike12': 62181,
+    'november13': 58903,
+    'oscar14': 53999,
+    'papa15': 27348,
+    'quebec16': 26190,
+    'romeo17': 41537,
+    'sierra18': 43983,
+    'tango19': 43088,
+    'uniform20': 56016,
+    'victor21': 12153,
+    'whiskey22': 64502,
+    'xray23': 53075,
+    'yankee24': 10677,
+    'zulu25': 27045,
+    'alpha26': 31803,
+    'bravo27': 4600,
+    'charlie28': 26452,
+    'delta29': 12389,
+    'echo30': 10977,
+    'foxtrot31': 24947,
+    'golf32': 33216,
+    'hotel33': 37155,
+    'india34': 39985,
+    'juliet35': 33657,
+    'kilo36': 21410,
+    'lima37': 15426,
+    'mike38': 3059,
+    'november39': 35068,
+    'oscar40': 30665,
+    'papa41': 28792,
+    'quebec42': 31138,
+    'romeo43': 7341,
+    'sierra44': 1701,
+    'tango45': 39419,
+    'uniform46': 36621,
+    'victor47': 17940,
+    'whiskey48': 44021,
+    'xray49': 58640,
+    'yankee50': 20055,
+    'zulu51': 35887,
+    'alpha52': 56741,
+    'bravo53': 20542,
+    'charlie54': 21583,
+    'delta55': 53185,
+    'echo56': 15864,
+    'foxtrot57': 16408,
+    'golf58': 56170,
+    'hotel59': 45190,
+    'india60': 29363,
+    'juliet61': 15250,
+    'kilo62': 6793,
+    'lima63': 25348,
+    'mike64': 57204,
+    'november65': 22587,
+    'oscar66': 22587,
+    'papa67': 10616,
+    'quebec68': 15051,
+    'romeo69': 38466,
+    'sierra70': 262,
+    'tango71': 41330,
+    'uniform72': 52703,
+    'victor73': 59952,
+    'whiskey74': 7125,
+    'xray75': 21508,
+    'yankee76': 15406,
+    'zulu77': 59667,
+    'alpha78': 43716,
+    'bravo79': 1661,
+    'charlie80': 9581,
+    'delta81': 14234,
+    'echo82': 12224,
+    'foxtrot83': 43618,
+    'golf84': 33726,
+    'hotel85': 11261,
+    'india86': 39453,
+    'juliet87': 5809,
+    'kilo88': 3557,
+    'lima89': 25480,
+    'mike90': 28788,
+    'november91': 1592,
+    'oscar92': 20521,
+    'papa93': 3117,
+    'quebec94': 17711,
+    'romeo95': 40906,
+    'sierra96': 16519,
+    'tango97': 54916,
+    'uniform98': 36050,
+    'victor99': 14316,
+    'whiskey100': 50861,
+    'xray101': 12928,
+    'yankee102': 28573,
+    'zulu103': 31431,
+    'alpha104': 25891,
+    'bravo105': 29673,
+    'charlie106': 12741,
+    'delta107': 39507,
+    'echo108': 16433,
+    'foxtrot109': 51086,
+    'golf110': 18281,
+    'hotel111': 10845,
+    'india112': 58788,
+    'juliet113': 63881,
+    'kilo114': 424,
+    'lima115': 23431,
+    'mike116': 24715,
+    'november117': 40801,
+    'oscar118': 53093,
+    'papa119': 12451,
+    'quebec120': 38860,
+    'romeo121': 27135,
+    'sierra122': 47774,
+    'tango123': 39088,
+    'uniform124': 18853,
+    'victor125': 12933,
+    'whiskey126': 636,
+    'xray127': 36205,
+    'yankee128': 8099,
+    'zulu129': 50785,
+    'alpha130': 48920,
+    'bravo131': 37031,
+    'charlie132': 51891,
+    'delta133': 60623,
+    'echo134': 13025,
+    'foxtrot135': 8730,
+    'golf136': 61511,
+    'hotel137': 27696,
+    'india138': 1313,
+    'juliet139': 9173,
+    'kilo140': 44671,
+    'lima141': 2034,
+    'mike142': 23456,
+    'november143': 36386,
+    'oscar144': 38536,
+    'papa145': 13092,
+    'quebec146': 319,
+    'romeo147': 5405,
+    'sierra148': 27697,
+    'tango149': 27127,
+    'uniform150': 53226,
+    'victor151': 10250,
+    'whiskey152': 47148,
+    'xray153': 37087,
+    'yankee154': 58036,
+    'zulu155': 6537,
+    'alpha156': 18048,
+    'bravo157': 49276,
+    'charlie158': 52076,
+    'delta159': 51649,
+    'echo160': 33340,
+    'foxtrot161': 477,
+    'golf162': 60146,
+    'hotel163': 12019,
+    'india164': 64488,
+    'juliet165': 41831,
+    'kilo166': 30170,
+    'lima167': 26350,
+    'mike168': 38395,
+    'november169': 59058,
+    'oscar170': 44125,
+    'papa171': 49830,
+    'quebec172': 27074,
+    'romeo173': 6866,
+    'sierra174': 45638,
+    'tango175': 17680,
+    'uniform176': 11959,
+    'victor177': 48150,
+    'whiskey178': 2645,
+    'xray179': 15459,
+    'yankee180': 62525,
+    'zulu181': 31399,
+    'alpha182': 18570,
+    'bravo183': 38786,
+    'charlie184': 875,
+    'delta185': 18314,
+    'echo186': 47634,
+    'foxtrot187': 45863,
+    'golf188': 19222,
+    'hotel189': 2479,
+    'india190': 30109,
+    'juliet191': 56704,
+    'kilo192': 58847,
+    'lima193': 32400,
+    'mike194': 51270,
+    'november195': 50874,
+    'oscar196': 38091,
+    'papa197': 38863,
+    'quebec198': 10904,
+    'romeo199': 64665,
+    'sierra200': 35213,
+    'tango201': 46204,
+    'uniform202': 16468,
+    'victor203': 60963,
+    'whiskey204': 30902,
+    'xray205': 63499,
+    'yankee206': 16985,
+    'zulu207': 46337,
+    'alpha208': 42952,
+    'bravo209': 18532,
+    'charlie210': 16152,
+    'delta211': 35146,
+    'echo212': 5111,
+    'foxtrot213': 24835,
+    'golf214': 48557,
+    'hotel215': 51214,
+    'india216': 28039,
+    'juliet217': 40245,
+    'kilo218': 61722,
+    'lima219': 23504,
+    'mike220': 17888,
+    'november221': 16886,
+    'oscar222': 36003,
+    'papa223': 3306,
+    'quebec224': 10066,
+    'romeo225': 22391,
+    'sierra226': 44525,
+    'tango227': 35994,
+    'uniform228': 32162,
+    'victor229': 41662,
+    'whiskey230': 11144,
+    'xray231': 19136,
+    'yankee232': 34595,
+    'zulu233': 33965,
+    'alpha234': 12570,
+    'bravo235': 17350,
+    'charlie236': 39875,
+    'delta237': 9929,
+    'echo238': 64917,
+    'foxtrot239': 5170,
+    'golf240': 5810,
+    'hotel241': 62336,
+    'india242': 61936,
+    'juliet243': 51302,
+    'kilo244': 12487,
+    'lima245': 17655,
+    'mike246': 40709,
+    'november247': 54903,
+    'oscar248': 22421,
+    'papa249': 59715,
+    'quebec250': 58069,
+    'romeo251': 63393,
+    'sierra252': 20090,
+    'tango253': 23362,
+    'uniform254': 24895,
+    'victor255': 26377,
+    'whiskey256': 37960,
+    'xray257': 15427,
+    'yankee258': 24945,
+    'zulu259': 58463,
+    'alpha260': 52558,
+    'bravo261': 61314,
+    'charlie262': 8916,
+    'delta263': 40183,
+    'echo264': 15015,
+    'foxtrot265': 28496,
+    'golf266': 27057,
+    'hotel267': 40034,
+    'india268': 27138,
+    'juliet269': 37868,
+    'kilo270': 57110,
+    'lima271': 62041,
+    'mike272': 12430,
+    'november273': 47715,
+    'oscar274': 32087,
+    'papa275': 24087,
+    'quebec276': 48771,
+    'romeo277': 38315,
+    'sierra278': 19770,
+    'tango279': 1408,
+    'uniform280': 43939,
+    'victor281': 49505,
+    'whiskey282': 19278,
+    'xray283': 37373,
+    'yankee284': 16866,
+    'zulu285': 8696,
+    'alpha286': 23402,
+    'bravo287': 4817,
+    'charlie288': 15255,
+    'delta289': 36701,
+    'echo290': 54742,
+    'foxtrot291': 11749,
+    'golf292': 25168,
+    'hotel293': 57924,
+    'india294': 58255,
+    'juliet295': 53401,
+    'kilo296': 5692,
+    'lima297': 22988,
+    'mike298': 22740,
+    'november299': 12528,
+}
+
+ROWS = [
+    (0, 'papa', 704.194, -1, None),
+    (1, 'foxtrot', 243.068, -1, None),
+    (2, 'hotel', 117.285, 0x7f, None),
+    (3, 'november', 335.877, 0, None),
+    (4, 'romeo', 730.382, 1, None),
+    (5, 'oscar', 88.416, 1, None),
+    (6, 'juliet', 30.812, -1, None),
+    (7, 'yankee', 358.181, -1, None),
+    (8, 'romeo', 402.231, 1, None),
+    (9, 'victor', 865.661, 1, None),
+    (10, 'bravo', 577.875, 0, None),
+    (11, 'foxtrot', 228.754, 1, None),
+    (12, 'xray', 441.37, 1, None),
+    (13, 'alpha', 601.742, 0, None),
+    (14, 'mike', 540.283, 0x7f, None),
+    (15, 'charlie', 286.51, 0x7f, None),
+    (16, 'whiskey', 858.196, -1, None),
+    (17, 'kilo', 104.763, 0, None),
+    (18, 'echo', 621.84, 1, None),
+    (19, 'xray', 34.434, -1, None),
+    (20, 'foxtrot', 663.03, 0, None),
+    (21, 'hotel', 292.784, 1, None),
+    (22, 'bravo', 979.84, 0x7f, None),
+    (23, 'quebec', 635.599, 0x7f, None),
+    (24, 'victor', 276.334, -1, None),
+    (25, 'uniform', 780.545, 0, None),
+    (26, 'kilo', 883.589, 1, None),
+    (27, 'alpha', 855.765, 0x7f, None),
+    (28, 'foxtrot', 826.526, 0, None),
+    (29, 'romeo', 983.429, -1, None),
+    (30, 'echo', 147.563, -1, None),
+    (31, 'zulu', 100.393, -1, None),
+    (32, 'oscar', 203.216, 1, None),
+    (33, 'delta', 154.737, 0, None),
+    (34, 'quebec', 751.349, -1, None),
+    (35, 'juliet', 364.952, 1, None),
+    (36, 'india', 717.655, 0x7f, None),
+    (37, 'alpha', 318.635, -1, None),
+    (38, 'whiskey', 470.076, 0x7f, None),
+    (39, 'zulu', 310.708, 1, None),
+    (40, 'bravo', 84.644, -1, None),
+    (41, 'november', 280.206, -1, None),
+    (42, 'charlie', 813.199, 0x7f, None),
+    (43, 'whiskey', 70.759, 0x7f, None),
+    (44, 'yankee', 15.941, 1, None),
+    (45, 'yankee', 927.109, 1, None),
+    (46, 'victor', 959.006, -1, None),
+    (47, 'xray', 101.867, 0x7f, None),
+    (48, 'delta', 333.781, 1, None),
+    (49, 'xray', 12.102, 1, None),
+    (50, 'sierra', 994.078, 1, None),
+    (51, 'tango', 229.642, 0, None),
+    (52, 'lima', 371.818, 1, None),
+    (53, 'whiskey', 522.639, 1, None),
+    (54, 'whiskey', 65.094, -1, None),
+    (55, 'sierra', 449.91, 0x7f, None),
+    (56, 'papa', 44.044, 1, None),
+    (57, 'zulu', 865.387, 0x7f, None),
+    (58, 'charlie', 181.75, 0, None),
+    (59, 'sierra', 522.375, 0, None),
+    (60, 'romeo', 621.317, 0, None),
+    (61, 'golf', 238.493, 1, None),
+    (62, 'echo', 924.354, 0x7f, None),
+    (63, 'xray', 314.156, 0x7f, None),
+    (64, 'alpha', 918.841, 1, None),
+    (65, 'lima', 737.3, -1, None),
+    (66, 'yankee', 861.472, 0, None),
+    (67, 'bravo', 865.128, 0, None),
+    (68, 'india', 179.647, 1, None),
+    (69, 'yankee', 503.745, 1, None),
+    (70, 'golf', 106.368, 0x7f, None),
+    (71, 'quebec', 272.995, 1, None),
+    (72, 'november', 958.242, -1, None),
+    (73, 'zulu', 978.692, -1, None),
+    (74, 'juliet', 245.498, 0x7f, None),
+    (75, 'november', 670.969, 0, None),
+    (76, 'golf', 886.387, 0x7f, None),
+    (77, 'oscar', 832.103, -1, None),
+    (78, 'echo', 456.247, 0x7f, None),
+    (79, 'charlie', 25.19, 0, None),
+    (80, 'papa', 217.893, 1, None),
+    (81, 'papa', 716.492, 1, None),
+    (82, 'delta', 512.616, 1, None),
+    (83, 'hotel', 118.538, 1, None),
+    (84, 'echo', 923.712, 1, None),
+    (85, 'hotel', 388.013, 1, None),
+    (86, 'romeo', 343.069, -1, None),
+    (87, 'uniform', 723.366, -1, None),
+    (88, 'kilo', 217.565, 0, None),
+    (89, 'november', 48.031, 1, None),
+    (90, 'quebec', 236.894, 0x7f, None),
+    (91, 'kilo', 421.072, -1, None),
+    (92, 'charlie', 968.916, 0x7f, None),
+    (93, 'papa', 179.286, 0, None),
+    (94, 'charlie', 971.621, 0, None),
+    (95, 'bravo', 136.672, 0, None),
+    (96, 'delta', 593.165, 1, None),
+    (97, 'golf', 90.876, 0, None),
+    (98, 'bravo', 488.153, 0, None),
+    (99, 'whiskey', 843.648, 0x7f, None),
+    (100, 'delta', 459.514, 0, None),
+    (101, 'bravo', 318.899, 1, None),
+    (102, 'november', 443.081, 0x7f, None),
+    (103, 'romeo', 124.088, 0, None),
+    (104, 'sierra', 832.164, 0, None),
+    (105, 'kilo', 95.358, 1, None),
+    (106, 'golf', 5.182, 1, None),
+    (107, 'kilo', 912.378, 0x7f, None),
+    (108, 'kilo', 50.24, 0, None),
+    (109, 'india', 301.413, -1, None),
+    (110, 'delta', 327.814, 0, None),
+    (111, 'uniform', 582.607, 0, None),
+    (112, 'juliet', 13.862, 0, None),
+    (113, 'mike', 838.657, 1, None),
+    (114, 'golf', 90.414, 0x7f, None),
+    (115, 'mike', 895.173, 0x7f, None),
+    (116, 'golf', 135.139, 0, None),
+    (117, 'mike', 484.368, 1, None),
+    (118, 'sierra', 455.302, 1, None),
+    (119, 'mike', 321.79, 1, None),
+    (120, 'tango', 784.953, 0, None),
+    (121, 'golf', 40.093, 0, None),
+    (122, 'echo', 30.682, 0, None),
+    (123, 'india', 475.842, -1, None),
+    (124, 'foxtrot', 778.737, 0x7f, None),
+    (125, 'yankee', 185.75, 0, None),
+    (126, 'bravo', 193.244, -1, None),
+    (127, 'oscar', 966.094, -1, None),
+    (128, 'xray', 856.846, -1, None),
+    (129, 'kilo', 829.084, 0x7f, None),
+    (130, 'delta', 887.991, 1, None),
+    (131, 'whiskey', 752.811, 0, None),
+    (132, 'charlie', 635.277, 0x7f, None),
+    (133, 'romeo', 126.855, -1, None),
+    (134, 'tango', 745.211, 0x7f, None),
+    (135, 'tango', 188.154, 0, None),
+    (136, 'lima', 44.744, 0, None),
+    (137, 'uniform', 302.454, -1, None),
+    (138, 'whiskey', 603.722, 1, None),
+    (139, 'uniform', 557.039, 0x7f, None),
+    (140, 'papa', 52.825, 1, None),
+    (141, 'alpha', 660.481, 0x7f, None),
+    (142, 'tango', 639.613, -1, None),
+    (143, 'romeo', 907.96, 0, None),
+    (144, 'mike', 79.086, 0x7f, None),
+    (145, 'kilo', 569.77, 0, None),
+    (146, 'victor', 973.277, 0x7f, None),
+    (147, 'victor', 97.745, 0x7f, None),
+    (148, 'charlie', 888.758, 1, None),
+    (149, 'zulu', 857.464, 0, None),
+    (150, 'november', 396.348, -1, None),
+    (151, 'echo', 570.946, -1, None),
+    (152, 'zulu', 664.758, -1, None),
+    (153, 'lima', 993.8, 0, None),
+    (154, 'november', 369.99, -1, None),
+    (155, 'golf', 241.985, 1, None),
+    (156, 'alpha', 856.414, 0x7f, None),
+    (157, 'echo', 339.283, 0, None),
+    (158, 'sierra', 830.854, -1, None),
+    (159, 'xray', 576.635, 0, None),
+    (160, 'sierra', 334.935, -1, None),
+    (161, 'zulu', 445.13, 1, None),
+    (162, 'echo', 260.358, 1, None),
+    (163, 'juliet', 210.394, 1, None),
+    (164, 'whiskey', 719.236, -1, None),
+    (165, 'papa', 137.15, 1, None),
+    (166, 'bravo', 34.986, -1, None),
+    (167, 'india', 154.884, 0, None),
+    (168, 'kilo', 632.562, 1, None),
+    (169, 'uniform', 830.931, 1, None),
+    (170, 'india', 429.01, 0x7f, None),
+    (171, 'bravo', 627.043, 1, None),
+    (172, 'echo', 645.576, 0, None),
+    (173, 'xray', 680.147, 0, None),
+    (174, 'whiskey', 910.77, 1, None),
+    (175, 'mike', 275.795, 1, None),
+    (176, 'hotel', 56.706, 0, None),
+    (177, 'bravo', 101.514, -1, None),
+    (178, 'juliet', 147.411, 1, None),
+    (179, 'juliet', 594.451, 0x7f, None),
+    (180, 'delta', 223.535, 1, None),
+    (181, 'foxtrot', 865.807, 1, None),
+    (182, 'november', 708.321, 0x7f, None),
+    (183, 'alpha', 700.028, 0x7f, None),
+    (184, 'lima', 399.069, 0, None),
+    (185, 'sierra', 130.641, 1, None),
+    (186, 'zulu', 253.673, -1, None),
+    (187, 'alpha', 305.36, 0x7f, None),
+    (188, 'yankee', 835.848, -1, None),
+    (189, 'romeo', 620.819, -1, None),
+    (190, 'tango', 247.193, 1, None),
+    (191, 'foxtrot', 272.15, 0, None),
+    (192, 'india', 706.544, 0x7f, None),
+    (193, 'uniform', 297.764, -1, None),
+    (194, 'hotel', 79.313, 1, None),
+    (195, 'juliet', 82.8, 0, None),
+    (196, 'sierra', 468.711, -1, None),
+    (197, 'november', 63.382, -1, None),
+    (198, 'zulu', 470.877, 1, None),
+    (199, 'echo', 948.141, 0x7f, None),
+    (200, 'victor', 281.836, 1, None),
+    (201, 'whiskey', 259.866, 0, None),
+    (202, 'oscar', 423.395, -1, None),
+    (203, 'victor', 297.802, 1, None),
+    (204, 'lima', 589.988, 0, None),
+    (205, 'xray', 362.289, 1, None),
+    (206, 'oscar', 444.196, 0x7f, None),
+    (207, 'tango', 583.715, 0x7f, None),
+    (208, 'oscar', 498.239, -1, None),
+    (209, 'xray', 799.849, 1, None),
+    (210, 'delta', 806.288, -1, None),
+    (211, 'alpha', 91.376, -1, None),
+    (212, 'echo', 544.814, 0, None),
+    (213, 'echo', 979.947, 0, None),
+    (214, 'sierra', 996.822, 1, None),
+    (215, 'papa', 630.862, -1, None),
+    (216, 'india', 625.896, 0, None),
+    (217, 'echo', 215.694, 0x7f, None),
+    (218, 'uniform', 656.435, 0, None),
+    (219, 'tango', 83.954, 0x7f, None),
+    (220, 'november', 408.021, 0, None),
+    (221, 'november', 12.097, 1, None),
+    (222, 'india', 844.95, -1, None),
+    (223, 'bravo', 808.617, 1, None),
+    (224, 'oscar', 178.208, 0x7f, None),
+    (225, 'india', 305.841, -1, None),
+    (226, 'golf', 649.908, 1, None),
+    (227, 'tango', 878.467, 1, None),
+    (228, 'golf', 850.803, -1, None),
+    (229, 'charlie', 39.983, -1, None),
+    (230, 'echo', 853.182, 0, None),
+    (231, 'uniform', 457.069, 0x7f, None),
+    (232, 'november', 30.553, -1, None),
+    (233, 'oscar', 393.735, 1, None),
+    (234, 'xray', 948.173, -1, None),
+    (235, 'golf', 852.345, -1, None),
+    (236, 'hotel', 781.315, 0x7f, None),
+    (237, 'delta', 305.382, -1, None),
+    (238, 'juliet', 389.307, 0x7f, None),
+    (239, 'romeo', 455.822, -1, None),
+    (240, 'zulu', 58.608, -1, None),
+    (241, 'charlie', 86.525, 0x7f, None),
+    (242, 'tango', 983.793, -1, None),
+    (243, 'foxtrot', 630.235, -1, None),
+    (244, 'november', 298.446, 0x7f, None),
+    (245, 'victor', 463.559, 0x7f, None),
+    (246, 'tango', 196.069, 1, None),
+    (247, 'bravo', 407.243, 1, None),
+    (248, 'sierra', 280.813, 1, None),
+    (249, 'sierra', 772.667, 0, None),
+    (250, 'xray', 109.484, 0, None),
+    (251, 'echo', 15.746, 1, None),
+    (252, 'alpha', 823.517, 0, None),
+    (253, 'lima', 838.701, 0, None),
+    (254, 'sierra', 210.539, -1, None),
+    (255, 'oscar', 262.321, 1, None),
+    (256, 'mike', 108.544, 0, None),
+    (257, 'november', 863.913, 0, None),
+    (258, 'delta', 773.473, -1, None),
+    (259, 'quebec', 700.8, -1, None),
+    (260, 'yankee', 366.36, -1, None),
+    (261, 'zulu', 487.629, 0, None),
+    (262, 'november', 498.633, 0x7f, None),
+    (263, 'juliet', 92.032, 1, None),
+    (264, 'foxtrot', 531.316, -1, None),
+    (265, 'november', 825.532, -1, None),
+    (266, 'bravo', 119.963, 0x7f, None),
+    (267, 'foxtrot', 422.15, 1, None),
+    (268, 'india', 762.062, -1, None),
+    (269, 'lima', 115.45, 0, None),
+    (270, 'victor', 303.532, 0, None),
+    (271, 'romeo', 628.674, 0, None),
+    (272, 'quebec', 906.149, 0x7f, None),
+    (273, 'uniform', 499.392, 0x7f, None),
+    (274, 'november', 955.848, 1, None),
+    (275, 'foxtrot', 464.209, 1, None),
+    (276, 'golf', 234.435, 0x7f, None),
+    (277, 'uniform', 627.98, 0, None),
+    (278, 'sierra', 962.521, 0, None),
+    (279, 'hotel', 399.142, 1, None),
+    (280, 'sierra', 630.122, 0, None),
+    (281, 'juliet', 2.546, 0, None),
+    (282, 'delta', 305.973, 0x7f, None),
+    (283, 'echo', 339.236, 0, None),
+    (284, 'november', 138.726, 1, None),
+    (285, 'kilo', 811.04, 0x7f, None),
+    (286, 'lima', 887.742, 0x7f, None),
+    (287, 'victor', 77.554, -1, None),
+    (288, 'alpha', 809.249, 1, None),
+    (289, 'india', 512.033, 1, None),
+    (290, 'juliet', 917.233, 0, None),
+    (291, 'juliet', 52.61, 0, None),
+    (292, 'foxtrot', 936.453, -1, None),
+    (293, 'xray', 858.227, 0, None),
+    (294, 'quebec', 426.086, 0x7f, None),
+    (295, 'echo', 180.709, 1, None),
+    (296, 'victor', 809.87, -1, None),
+    (297, 'bravo', 930.671, 1, None),
+    (298, 'mike', 376.068, 1, None),
+    (299, 'alpha', 530.223, 0x7f, None),
+    (300, 'tango', 253.722, 0, None),
+    (301, 'foxtrot', 647.802, 0, None),
+    (302, 'zulu', 688.417, 0, None),
+    (303, 'oscar', 466.586, -1, None),
+    (304, 'xray', 688.921, 0x7f, None),
+    (305, 'bravo', 470.207, 0x7f, None),
+    (306, 'charlie', 122.893, 1, None),
+    (307, 'whiskey', 229.356, 0, None),
+    (308, 'hotel', 388.933, 1, None),
+    (309, 'mike', 6.833, 0x7f, None),
+    (310, 'kilo', 209.692, -1, None),
+    (311, 'whiskey', 979.656, -1, None),
+    (312, 'hotel', 175.721, -1, None),
+    (313, 'hotel', 656.813, 0x7f, None),
+    (314, 'lima', 704.059, 0x7f, None),
+    (315, 'quebec', 873.274, 0, None),
+    (316, 'sierra', 390.967, 0x7f, None),
+    (317, 'lima', 94.317, -1, None),
+    (318, 'xray', 503.96, -1, None),
+    (319, 'foxtrot', 424.123, 1, None),
+    (320, 'romeo', 571.525, 0, None),
+    (321, 'whiskey', 921.424, 0, None),
+    (322, 'romeo', 269.532, -1, None),
+    (323, 'lima', 31.091, 0, None),
+    (324, 'whiskey', 394.371, 0, None),
+    (325, 'charlie', 570.096, 0, None),
+    (326, 'uniform', 957.82, -1, None),
+    (327, 'november', 757.252, 0x7f, None),
+    (328, 'kilo', 576.719, -1, None),
+    (329, 'victor', 104.579, 1, None),
+    (330, 'foxtrot', 355.264, -1, None),
+    (331, 'tango', 917.512, -1, None),
+    (332, 'hotel', 216.528, 0x7f, None),
+    (333, 'uniform', 751.33, 0, None),
+    (334, 'tango', 550.309, -1, None),
+    (335, 'alpha', 512.317, 0x7f, None),
+    (336, 'delta', 89.458, 0x7f, None),
+    (337, 'mike', 941.867, -1, None),
+    (338, 'romeo', 127.635, 0x7f, None),
+    (339, 'delta', 448.95, 0, None),
+    (340, 'mike', 488.866, 0x7f, None),
+    (341, 'hotel', 261.183, 1, None),
+    (342, 'india', 760.6, 0, None),
+    (343, 'india', 957.491, 0x7f, None),
+    (344, 'alpha', 860.804, 0, None),
+    (345, 'yankee', 282.501, 0, None),
+    (346, 'delta', 945.563, 0, None),
+    (347, 'xray', 13.897, -1, None),
+    (348, 'alpha', 605.058, 0x7f, None),
+    (349, 'zulu', 217.862, 0, None),
+    (350, 'victor', 482.116, 0x7f, None),
+    (351, 'foxtrot', 359.742, 0, None),
+    (352, 'alpha', 510.683, 1, None),
+    (353, 'india', 57.333, 1, None),
+    (354, 'india', 33.231, 1, None),
+    (355, 'echo', 83.114, 0, None),
+    (356, 'papa', 506.674, 0x7f, None),
+    (357, 'papa', 863.958, 0x7f, None),
+    (358, 'romeo', 632.287, 1, None),
+    (359, 'hotel', 211.777, 0, None),
+    (360, 'yankee', 36.784, 0x7f, None),
+    (361, 'delta', 484.436, 0, None),
+    (362, 'mike', 479.013, 1, None),
+    (363, 'lima', 389.891, 0, None),
+    (364, 'uniform', 728.104, 1, None),
+    (365, 'quebec', 911.088, 0x7f, None),
+    (366, 'kilo', 349.414, -1, None),
+    (367, 'tango', 249.418, 0x7f, None),
+    (368, 'zulu', 327.551, 0, None),
+    (369, 'whiskey', 692.788, -1, None),
+    (370, 'foxtrot', 57.573, 1, None),
+    (371, 'quebec', 721.801, 1, None),
+    (372, 'kilo', 591.108, 1, None),
+    (373, 'tango', 455.281, -1, None),
+    (374, 'papa', 866.686, 0x7f, None),
+    (375, 'lima', 571.274, -1, None),
+    (376, 'november', 287.003, -1, None),
+    (377, 'oscar', 594.65, -1, None),
+    (378, 'delta', 115.441, 0, None),
+    (379, 'victor', 814.344, 0x7f, None),
+    (380, 'quebec', 982.839, -1, None),
+    (381, 'echo', 598.085, -1, None),
+    (382, 'uniform', 2.85, 1, None),
+    (383, 'charlie', 622.679, -1, None),
+    (384, 'november', 340.082, 0, None),
+    (385, 'delta', 784.974, 0, None),
+    (386, 'hotel', 984.679, 0, None),
+    (387, 'zulu', 738.351, 0x7f, None),
+    (388, 'oscar', 413.538, -1, None),
+    (389, 'charlie', 958.305, 0, None),
+    (390, 'whiskey', 826.42, 1, None),
+    (391, 'hotel', 791.576, 0, None),
+    (392, 'papa', 80.193, -1, None),
+    (393, 'papa', 83.496, -1, None),
+    (394, 'zulu', 0.243, 1, None),
+    (395, 'echo', 141.591, 0, None),
+    (396, 'sierra', 443.879, 0x7f, None),
+    (397, 'papa', 241.437, 0x7f, None),
+    (398, 'oscar', 682.999, 1, None),
+    (399, 'victor', 839.138, 1, None),
+]
+
+MATRIX = (
+    (18, 8, 35, 73, -36, 20, 32, 25, 25, -70, 61, 43, -53, 94, -60, -63),
+    (26, -46, 84, 55, 13, 89, -87, -31, 27, -41, -41, 70, -72, -9, 73, -70),
+    (47, 50, 26, -17, -74, -93, 66, -58, -67, 93, -97, 12, 80, -63, 43, -61),
+    (49, -20, -93, -95, 53, -52, -83, -22, -61, -28, -95, -72, 69, 73, 48, -80),
+    (-29, 99, -38, -57, 11, 81, -95, 70, 0, 14, -41, -62, -80, -98, 37, -53),
+    (91, 42, 12, -64, -45, 95, 38, -28, -10, 81, 59, 35, -70, -86, 84, -79),
+    (-7, 32, -64, -8, 49, -23, -26, -57, -32, 65, -41, -46, 83, -61, 62, 60),
+    (25, -61, 9, 77, 78, 36, -17, -89, 84, -81, 40, 54, 2, -9, -28, 62),
+    (-15, 68, -57, -50, -64, 29, -85, -64, -30, -26, -37, -53, 21, 87, 51, -26),
+    (-24, 5, 62, -50, -79, -9, 2, -99, 77, -86, -66, -63, -27, 51, 68, -55),
+    (30, 91, 20, -48, -16, -73, 87, -73, 8, -71, -3, 14, 18, -81, 81, 9),
+    (-48, 19, 53, -16, 67, -68, 40, 8, -85, -49, 87, 12, -67, 2, 50, 56),
+    (-29, 33, 2, -88, -25, -32, 72, -81, -8, 84, 93, 27, 62, 99, -34, -69),
+    (40, 5, -26, -57, 8, 21, -89, -55, 80, 77, -1, 25, -96, 34, -81, -95),
+    (-95, 41, 8, -76, -19, 95, -63, -43, 0, -97, -5, -72, 57, 47, 20, 16),
+    (10, 26, -31, -41, 64, -26, 10, -36, -30, -97, 36, -4, 93, -16, 10, 64),
+    (77, 56, -55, 83, 59, 19, -83, 87, 25, -96, -38, -70, -15, -99, 46, -21),
+    (60, 38, -98, 80, -79, 58, 31, -59, -19, -56, -2, 44, -92, -50, -52, -75),
+    (79, 36, -52, -53, -99, 13, 87, 88, 78, -63, 12, -62, 74, -17, 95, -91),
+    (3, -97, 5, -38, -11, -34, -64, -55, -12, 20, 30, -81, 84, -89, -73, -98),
+    (-65, -16, 8, 68, 27, -15, -72, 20, 96, 93, 73, 21, -28, 71, 35, 70),
+    (57, -19, 82, 28, -80, -43, -28, 85, -93, 58, -21, -58, 20, -98, -28, -77),
+    (-13, -35, 82, 31, -24, -99, 91, 28, -50, -58, -20, -71, -18, 39, -85, -11),
+    (-59, -79, -24, -43, 73, 75, -51, -88, -17, -88, 18, -85, -86, -32, -35, 13),
+    (-63, 65, -93, 68, 82, -93, 29, 56, -18, -68, 12, 74, -42, 12, -30, -45),
+    (61, -62, -51, 56, 70, 15, -85, 59, 50, 44, 99, -11, 44, -26, 89, -89),
+    (-19, 79, -60, -10, -64, -72, -44, -93, -9, -87, 88, -68, -70, 6, -22, 34),
+    (21, 20, 72, 28, -43, 49, -87, 69, 64, -40, -22, -85, -95, -30, -55, -6),
+    (82, -87, 67, -31, -51, 74, -51, 50, -32, -81, 51, 24, -55, 50, -40, 67),
+    (66, -30, -11, -17, -42, 47, -35, 13, 65, -29, -22, 29, 83, -98, 78, 70),
+    (-75, 95, 50, -90, -21, -20, -41, 37, -52, -48, -50, -71, 9, -38, 84, -44),
+    (74, 0, 74, -69, -56, 97, -66, 0, -58, -80, -2, -24, 0, -49, -27, -6),
+    (79, -58, 21, 19, -35, -29, 25, -65, -3, -45, -2, -60, -36, 67, -56, -85),
+    (-69, -43, -74, 8, -97, 56, 73, 67, -31, -45, -69, -27, -97, 99, -40, -74),
+    (80, -73, 28, 65, -11, -55, -72, -92, 62, 14, 37, 57, -5, -45, -74, 81),
+    (-51, 40, -17, 10, 54, -46, 60, 41, 8, 51, 1, -60, -26, -36, 22, 81),
+    (44, 3, -6, -15, 17, -27, 23, 21, -14, 91, 47, -62, 31, 69, -94, 69),
+    (86, -34, -62, -29, 73, -96, -83, 69, -88, 49, 44, -87, 0, 96, 56, 20),
+    (-18, 54, -33, 89, -57, -12, 53, 7, 41, 88, 6, -19, 30, -33, 8, 64),
+    (40, 18, -21, -61, -62, 14, -97, -65, -35, -68, -3, -62, -85, 60, -32, 51),
+)
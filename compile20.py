@@ -0,0 +1,1141 @@
+#
+# compile20.py - compile source to Python 2.0 bytecode
+#
+# The Decompiler reads 1.5.2 and 2.0 bytecode, which no Python that can
+# run decompile.py compiles any more.  This module compiles source, from
+# the syntax trees of the compiler package, to the code objects that
+# Python 2.0's compiler makes, so that the self test, the round trips of
+# --verify, the tests and the benchmarks can make 2.0 bytecode on any
+# Python from 2.6 on:
+#
+#     code = compile20.compile_source(source, filename)
+#
+# It follows 2.0's compile.c: a SET_LINENO starts each line of simple
+# statements and each compound statement, nothing is folded, names are
+# mangled in classes, and a function's names are looked up by LOAD_FAST
+# or LOAD_GLOBAL unless it has an exec or "from ... import *".  Syntax
+# that came after 2.0, and list comprehensions, which the Decompiler
+# doesn't handle, raise SyntaxError.
+#
+# dumps() writes a code object in the marshal format of 2.0, which
+# decompile.OldUnmarshaller reads, and write_pyc() a .pyc file.  Run as
+# a script, it compiles each file named to a .pyc beside it:
+#
+#     python compile20.py file.py ...
+#
+
+import parser, string, struct, symbol, sys, token, types
+
+from compiler import ast, transformer
+
+import decompile
+
+OPTIMIZED = 1
+NEWLOCALS = decompile.NEWLOCALS
+VARARGS = decompile.VARARGS
+KWARGS = decompile.KWARGS
+
+MAGIC = '\x87\xc6\r\n'
+
+opmap = decompile.opmap
+HAVE_ARGUMENT = decompile.HAVE_ARGUMENT
+
+BINARY = {
+    'Add': 'BINARY_ADD', 'Sub': 'BINARY_SUBTRACT',
+    'Mul': 'BINARY_MULTIPLY', 'Div': 'BINARY_DIVIDE',
+    'Mod': 'BINARY_MODULO', 'Power': 'BINARY_POWER',
+    'LeftShift': 'BINARY_LSHIFT', 'RightShift': 'BINARY_RSHIFT',
+    'Bitand': 'BINARY_AND', 'Bitor': 'BINARY_OR', 'Bitxor': 'BINARY_XOR',
+}
+
+AUGMENTED = {
+    '+=': 'INPLACE_ADD', '-=': 'INPLACE_SUBTRACT',
+    '*=': 'INPLACE_MULTIPLY', '/=': 'INPLACE_DIVIDE',
+    '%=': 'INPLACE_MODULO', '**=': 'INPLACE_POWER',
+    '<<=': 'INPLACE_LSHIFT', '>>=': 'INPLACE_RSHIFT',
+    '&=': 'INPLACE_AND', '^=': 'INPLACE_XOR', '|=': 'INPLACE_OR',
+}
+
+# the syntax trees of what 2.0 doesn't have, or can't be decompiled
+UNSUPPORTED = {
+    'Decorators': 'decorators', 'With': 'with statements',
+    'Yield': 'yield', 'IfExp': 'conditional expressions',
+    'GenExpr': 'generator expressions', 'ListComp': 'list comprehensions',
+    'SetComp': 'set comprehensions', 'DictComp': 'dict comprehensions',
+    'Set': 'set displays', 'FloorDiv': 'the // operator',
+}
+
+# the change in the depth of the stack made by each instruction that
+# doesn't depend on its operand
+STACK_EFFECTS = {
+    'POP_TOP': -1, 'DUP_TOP': 1, 'BINARY_SUBSCR': -1,
+    'STORE_SUBSCR': -3, 'DELETE_SUBSCR': -2,
+    'PRINT_EXPR': -1, 'PRINT_ITEM': -1, 'PRINT_ITEM_TO': -2,
+    'PRINT_NEWLINE_TO': -1, 'LOAD_LOCALS': 1, 'RETURN_VALUE': -1,
+    'IMPORT_STAR': -1, 'EXEC_STMT': -3, 'END_FINALLY': -3,
+    'BUILD_CLASS': -2, 'STORE_NAME': -1, 'STORE_ATTR': -2,
+    'DELETE_ATTR': -1, 'STORE_GLOBAL': -1, 'LOAD_CONST': 1,
+    'LOAD_NAME': 1, 'BUILD_MAP': 1, 'COMPARE_OP': -1, 'IMPORT_FROM': 1,
+    'FOR_LOOP': 1, 'LOAD_GLOBAL': 1, 'LOAD_FAST': 1, 'STORE_FAST': -1,
+}
+
+def stack_effect(name, arg):
+    if STACK_EFFECTS.has_key(name):
+        return STACK_EFFECTS[name]
+    if name[:7] == 'BINARY_' or name[:8] == 'INPLACE_':
+        return -1
+    if name[:5] == 'SLICE':
+        k = int(name[-1])
+        return -((k & 1) + (k >> 1))
+    if name[:11] == 'STORE_SLICE':
+        k = int(name[-1])
+        return -2 - ((k & 1) + (k >> 1))
+    if name[:12] == 'DELETE_SLICE':
+        k = int(name[-1])
+        return -1 - ((k & 1) + (k >> 1))
+    if name == 'UNPACK_SEQUENCE':
+        return arg - 1
+    if name in ('BUILD_TUPLE', 'BUILD_LIST', 'BUILD_SLICE'):
+        return 1 - arg
+    if name == 'DUP_TOPX':
+        return arg
+    if name in ('RAISE_VARARGS', 'MAKE_FUNCTION'):
+        return -arg
+    if name[:13] == 'CALL_FUNCTION':
+        effect = -((arg & 0xff) + 2 * (arg >> 8))
+        if name[-3:] == 'VAR' or name[-6:] == 'VAR_KW':
+            effect = effect - 1
+        if name[-2:] == 'KW':
+            effect = effect - 1
+        return effect
+    return 0
+
+def mangle(name, private):
+    # __spam in the body of class Ham is _Ham__spam, as in 2.0
+    if private is None or name[:2] != '__' or name[-2:] == '__' or \
+       len(name) + 2 >= 256:
+        return name
+    while private[:1] == '_':
+        private = private[1:]
+    if not private:
+        return name
+    return '_' + private + name
+
+def first_line(node):
+    # the line of the first token of a node of the parse tree
+    while node[0] >= token.NT_OFFSET:
+        node = node[1]
+    return node[2]
+
+def first_statement_line(nodelist):
+    # the line of the first statement among the nodes of a parse tree
+    for node in nodelist:
+        if node[0] in (symbol.stmt, symbol.simple_stmt):
+            return first_line(node)
+    return None
+
+class Transformer(transformer.Transformer):
+
+    # The syntax tree of the compiler package, with the lines that 2.0's
+    # compiler gives to SET_LINENO instructions which the tree doesn't
+    # have: the first statement of each line of simple statements, and
+    # each compound statement, get a setlineno attribute, and the
+    # nodes with an elif, except clause, finally clause or docstring
+    # get the lines of those.
+
+    def simple_stmt(self, nodelist):
+        stmts = transformer.Transformer.simple_stmt(self, nodelist)
+        stmts.nodes[0].setlineno = first_line(nodelist[0])
+        return stmts
+
+    def compound_stmt(self, nodelist):
+        stmts = transformer.Transformer.compound_stmt(self, nodelist)
+        stmts.nodes[0].setlineno = first_line(nodelist[0])
+        return stmts
+
+    def file_input(self, nodelist):
+        node = transformer.Transformer.file_input(self, nodelist)
+        node.docline = first_statement_line(nodelist)
+        return node
+
+    def funcdef(self, nodelist):
+        node = transformer.Transformer.funcdef(self, nodelist)
+        node.docline = first_statement_line(nodelist[-1][1:])
+        return node
+
+    def classdef(self, nodelist):
+        node = transformer.Transformer.classdef(self, nodelist)
+        node.docline = first_statement_line(nodelist[-1][1:])
+        return node
+
+    def if_stmt(self, nodelist):
+        node = transformer.Transformer.if_stmt(self, nodelist)
+        node.testlines = map(lambda i, nodelist=nodelist:
+                             first_line(nodelist[i + 1]),
+                             range(0, len(nodelist) - 3, 4))
+        return node
+
+    def com_try_except_finally(self, nodelist):
+        node = transformer.Transformer.com_try_except_finally(self, nodelist)
+        if nodelist[3][0] == token.NAME:
+            node.finallyline = nodelist[3][2]
+            return node
+        if isinstance(node, ast.TryFinally):
+            raise SyntaxError, ('try statements with both except and '
+                                'finally are not in Python 2.0',
+                                (None, nodelist[0][2], None, None))
+        node.handlerlines = []
+        for i in range(3, len(nodelist), 3):
+            clause = nodelist[i]
+            if clause[0] == symbol.except_clause:
+                if len(clause) > 4 and clause[3][1] == 'as':
+                    raise SyntaxError, ('"except ... as" is not in Python '
+                                        '2.0', (None, clause[1][2],
+                                                None, None))
+                node.handlerlines.append(clause[1][2])
+        return node
+
+class CodeGenerator:
+
+    # Compiles the body of one code object: a module, class, function or
+    # lambda.  The instructions are kept as a list of bytes, and each
+    # forward jump is added to a list, its anchor, until backpatch()
+    # points all the jumps in an anchor at the next instruction, as in
+    # 2.0's compiler.  Each kind of node in the syntax tree is compiled
+    # by the method of the same name.
+
+    def __init__(self, filename, name, private=None):
+        self.filename = filename
+        self.name = name
+        self.private = private
+        self.code = []
+        self.consts = []
+        self.constindex = {}
+        self.names = []
+        self.nameindex = {}
+        self.varnames = []
+        self.locals = {}
+        self.globals = {}
+        self.argcount = 0
+        self.flags = 0
+        self.infunction = 0
+        self.unoptimized = 0
+        # (offset, name) of the *_NAME instructions that a function's
+        # optimize() may make *_FAST or LOAD_GLOBAL
+        self.namerefs = []
+        # the line table, built as by com_set_lineno
+        self.lineno = 0
+        self.firstlineno = 0
+        self.lastline = 0
+        self.lastaddr = 0
+        self.lnotab = []
+        # the blocks set up and not yet popped, the number of loops
+        # that break may leave, and the offset continue jumps to
+        self.blocks = []
+        self.loops = 0
+        self.begin = 0
+
+    def error(self, message, node=None):
+        lineno = getattr(node, 'lineno', None) or self.lineno
+        raise SyntaxError, (message, (self.filename, lineno, None, None))
+
+    # instructions
+
+    def set_lineno(self, lineno):
+        self.lineno = lineno
+        if self.firstlineno == 0:
+            self.firstlineno = self.lastline = lineno
+            return
+        incr_addr = len(self.code) - self.lastaddr
+        incr_line = lineno - self.lastline
+        while incr_addr > 0 or incr_line > 0:
+            trunc_addr = min(incr_addr, 255)
+            trunc_line = min(incr_line, 255)
+            self.lnotab.append(trunc_addr)
+            self.lnotab.append(trunc_line & 0xff)
+            incr_addr = incr_addr - trunc_addr
+            incr_line = incr_line - trunc_line
+        self.lastaddr = len(self.code)
+        self.lastline = lineno
+
+    def emit(self, opname, arg=None):
+        op = opmap[opname]
+        if opname in ('IMPORT_STAR', 'EXEC_STMT'):
+            self.unoptimized = 1
+        if op < HAVE_ARGUMENT:
+            self.code.append(op)
+            return
+        if opname == 'SET_LINENO':
+            self.set_lineno(arg)
+        if arg > 0xffff:
+            self.emit('EXTENDED_ARG', arg >> 16)
+            arg = arg & 0xffff
+        self.code.extend([op, arg & 0xff, arg >> 8])
+
+    def const(self, value):
+        # the index of a constant, the same for equal values of a type
+        key = (type(value), value)
+        index = self.constindex.get(key)
+        if index is None:
+            index = len(self.consts)
+            self.consts.append(value)
+            self.constindex[key] = index
+        return index
+
+    def load_const(self, value):
+        self.emit('LOAD_CONST', self.const(value))
+
+    def name_op(self, opname, name):
+        name = mangle(name, self.private)
+        if self.globals.has_key(name) and \
+           opname in ('LOAD_NAME', 'STORE_NAME', 'DELETE_NAME'):
+            opname = opname[:-5] + '_GLOBAL'
+        index = self.nameindex.get(name)
+        if index is None:
+            index = len(self.names)
+            self.names.append(name)
+            self.nameindex[name] = index
+        self.emit(opname, index)
+        if opname in ('LOAD_NAME', 'STORE_NAME', 'DELETE_NAME'):
+            self.namerefs.append((len(self.code) - 3, name))
+
+    def newlocal(self, name):
+        if not self.locals.has_key(name):
+            self.locals[name] = len(self.varnames)
+            self.varnames.append(name)
+
+    def fwref(self, opname, anchor):
+        anchor.append(len(self.code))
+        self.emit(opname, 0)
+
+    def backpatch(self, anchor):
+        target = len(self.code)
+        for offset in anchor:
+            distance = target - (offset + 3)
+            if distance > 0xffff:
+                self.error('com_backpatch: offset too large')
+            self.code[offset + 1] = distance & 0xff
+            self.code[offset + 2] = distance >> 8
+
+    def optimize(self):
+        # As 2.0 does for a function: the names stored or deleted are
+        # locals, after the arguments, and their instructions are made
+        # *_FAST; other names are loaded by LOAD_GLOBAL, unless an exec
+        # or import * means that the locals are only known when it runs.
+        self.flags = self.flags | OPTIMIZED
+        code = self.code
+        store, delete = opmap['STORE_NAME'], opmap['DELETE_NAME']
+        for offset, name in self.namerefs:
+            if code[offset] in (store, delete):
+                self.newlocal(name)
+        if self.unoptimized:
+            self.flags = self.flags & ~OPTIMIZED
+        fast = {
+            opmap['LOAD_NAME']: opmap['LOAD_FAST'],
+            store: opmap['STORE_FAST'],
+            delete: opmap['DELETE_FAST'],
+        }
+        extended_arg = opmap['EXTENDED_ARG']
+        for offset, name in self.namerefs:
+            index = self.locals.get(name)
+            if index is not None:
+                code[offset] = fast[code[offset]]
+                code[offset + 1] = index & 0xff
+                code[offset + 2] = (index >> 8) & 0xff
+                if offset >= 3 and code[offset - 3] == extended_arg:
+                    code[offset - 2] = code[offset - 1] = 0
+            elif code[offset] == opmap['LOAD_NAME'] and \
+                 self.flags & OPTIMIZED:
+                code[offset] = opmap['LOAD_GLOBAL']
+
+    def stacksize(self):
+        # the deepest the stack gets on any path through the code
+        code = self.code
+        opname = decompile.opname
+        depths = {}
+        deepest = 0
+        todo = [(0, 0)]
+        while todo:
+            i, depth = todo.pop()
+            while i < len(code) and depths.get(i, -1) < depth:
+                depths[i] = depth
+                op = code[i]
+                if op < HAVE_ARGUMENT:
+                    arg = None
+                    next = i + 1
+                else:
+                    arg = code[i + 1] + (code[i + 2] << 8)
+                    next = i + 3
+                name = opname[op]
+                before = depth
+                depth = depth + stack_effect(name, arg)
+                deepest = max(deepest, depth)
+                if op in decompile.hasjrel or op in decompile.hasjabs:
+                    if op in decompile.hasjrel:
+                        target = next + arg
+                    else:
+                        target = arg
+                    if name in ('SETUP_EXCEPT', 'SETUP_FINALLY'):
+                        todo.append((target, before + 3))
+                    elif name == 'FOR_LOOP':
+                        todo.append((target, before - 2))
+                    else:
+                        todo.append((target, depth))
+                if name in ('JUMP_FORWARD', 'JUMP_ABSOLUTE', 'RETURN_VALUE',
+                            'RAISE_VARARGS', 'BREAK_LOOP'):
+                    break
+                i = next
+        return deepest
+
+    def assemble(self):
+        return types.CodeType(
+            self.argcount, len(self.varnames), self.stacksize(), self.flags,
+            string.join(map(chr, self.code), ''), tuple(self.consts),
+            tuple(self.names), tuple(self.varnames), self.filename,
+            self.name, self.firstlineno,
+            string.join(map(chr, self.lnotab), ''))
+
+    # code objects
+
+    def module(self, node):
+        self.emit('SET_LINENO', 0)
+        if node.doc is not None:
+            self.load_const(node.doc)
+            self.name_op('STORE_NAME', '__doc__')
+            self.emit('SET_LINENO', node.docline)
+        self.visit(node.node)
+        self.load_const(None)
+        self.emit('RETURN_VALUE')
+        return self.assemble()
+
+    def function(self, node):
+        self.infunction = 1
+        self.const(node.doc)
+        self.emit('SET_LINENO', getattr(node, 'setlineno', node.lineno))
+        self.arguments(node.argnames, len(node.defaults), node.flags)
+        if node.doc is not None:
+            self.emit('SET_LINENO', node.docline)
+        self.visit(node.code)
+        self.load_const(None)
+        self.emit('RETURN_VALUE')
+        self.optimize()
+        self.flags = self.flags | NEWLOCALS
+        return self.assemble()
+
+    def lambda_(self, node):
+        self.infunction = 1
+        self.const(None)
+        self.emit('SET_LINENO', node.lineno)
+        self.arguments(node.argnames, len(node.defaults), node.flags)
+        self.visit(node.code)
+        self.emit('RETURN_VALUE')
+        self.optimize()
+        self.flags = self.flags | NEWLOCALS
+        return self.assemble()
+
+    def class_(self, node):
+        self.emit('SET_LINENO', getattr(node, 'setlineno', node.lineno))
+        if node.doc is not None:
+            self.load_const(node.doc)
+            self.name_op('STORE_NAME', '__doc__')
+            self.emit('SET_LINENO', node.docline)
+        else:
+            self.const(None)
+        self.visit(node.code)
+        self.emit('LOAD_LOCALS')
+        self.emit('RETURN_VALUE')
+        self.flags = self.flags | NEWLOCALS
+        return self.assemble()
+
+    def arguments(self, argnames, ndefaults, flags):
+        # The arguments are the first locals.  A tuple argument is named
+        # by its position in the parse tree, and unpacked first thing.
+        nstars = (flags & VARARGS and 1 or 0) + (flags & KWARGS and 1 or 0)
+        positional = argnames[:len(argnames) - nstars]
+        firstdefault = len(positional) - ndefaults
+        child = 0
+        for i in range(len(positional)):
+            if type(positional[i]) is types.TupleType:
+                self.newlocal('.%d' % child)
+            else:
+                self.newlocal(positional[i])
+            child = child + 2
+            if i >= firstdefault:
+                child = child + 2
+        self.argcount = len(positional)
+        for name in argnames[len(positional):]:
+            self.newlocal(name)
+        self.flags = self.flags | (flags & (VARARGS | KWARGS))
+        for i in range(len(positional)):
+            if type(positional[i]) is types.TupleType:
+                self.emit('LOAD_FAST', i)
+                self.unpack_argument(positional[i])
+
+    def unpack_argument(self, arg):
+        if type(arg) is types.TupleType:
+            self.emit('UNPACK_SEQUENCE', len(arg))
+            for item in arg:
+                self.unpack_argument(item)
+        else:
+            self.name_op('STORE_NAME', arg)
+
+    # nodes
+
+    def visit(self, node):
+        kind = node.__class__.__name__
+        method = getattr(self, kind, None)
+        if method is None or UNSUPPORTED.has_key(kind):
+            what = UNSUPPORTED.get(kind, kind)
+            self.error("can't compile %s for Python 2.0" % what, node)
+        lineno = getattr(node, 'setlineno', None)
+        if lineno is not None:
+            self.emit('SET_LINENO', lineno)
+        method(node)
+
+    def Stmt(self, node):
+        for child in node.nodes:
+            self.visit(child)
+
+    def Pass(self, node):
+        pass
+
+    def Global(self, node):
+        for name in node.names:
+            self.globals[name] = 1
+
+    def Discard(self, node):
+        # a string on its own, like a docstring, is left out
+        if isinstance(node.expr, ast.Const) and \
+           type(node.expr.value) in (types.StringType, types.UnicodeType):
+            return
+        self.visit(node.expr)
+        self.emit('POP_TOP')
+
+    def Assign(self, node):
+        self.visit(node.expr)
+        for i in range(len(node.nodes)):
+            if i < len(node.nodes) - 1:
+                self.emit('DUP_TOP')
+            self.assign(node.nodes[i])
+
+    def assign(self, node):
+        # store the value on top of the stack in a target
+        kind = node.__class__.__name__
+        if kind == 'AssName':
+            self.name_op('STORE_NAME', node.name)
+        elif kind == 'AssAttr':
+            self.visit(node.expr)
+            self.name_op('STORE_ATTR', node.attrname)
+        elif kind in ('AssTuple', 'AssList'):
+            self.emit('UNPACK_SEQUENCE', len(node.nodes))
+            for child in node.nodes:
+                self.assign(child)
+        elif kind == 'Subscript':
+            self.visit(node.expr)
+            self.subscripts(node.subs)
+            self.emit('STORE_SUBSCR')
+        elif kind == 'Slice':
+            self.emit('STORE_SLICE+%d' % self.slice_bounds(node))
+        else:
+            self.error("can't assign to %s" % kind, node)
+
+    # a del statement is its targets
+    def AssName(self, node):
+        self.name_op('DELETE_NAME', node.name)
+
+    def AssAttr(self, node):
+        self.visit(node.expr)
+        self.name_op('DELETE_ATTR', node.attrname)
+
+    def AssTuple(self, node):
+        for child in node.nodes:
+            self.visit(child)
+
+    AssList = AssTuple
+
+    def AugAssign(self, node):
+        op = AUGMENTED.get(node.op)
+        if op is None:
+            self.error("can't compile %s for Python 2.0" % node.op, node)
+        target = node.node
+        kind = target.__class__.__name__
+        if kind == 'Name':
+            self.name_op('LOAD_NAME', target.name)
+            self.visit(node.expr)
+            self.emit(op)
+            self.name_op('STORE_NAME', target.name)
+        elif kind == 'Getattr':
+            self.visit(target.expr)
+            self.emit('DUP_TOP')
+            self.name_op('LOAD_ATTR', target.attrname)
+            self.visit(node.expr)
+            self.emit(op)
+            self.emit('ROT_TWO')
+            self.name_op('STORE_ATTR', target.attrname)
+        elif kind == 'Subscript':
+            self.visit(target.expr)
+            self.subscripts(target.subs)
+            self.emit('DUP_TOPX', 2)
+            self.emit('BINARY_SUBSCR')
+            self.visit(node.expr)
+            self.emit(op)
+            self.emit('ROT_THREE')
+            self.emit('STORE_SUBSCR')
+        else:
+            k = self.slice_bounds(target)
+            count = 1 + (k & 1) + (k >> 1)
+            if count == 1:
+                self.emit('DUP_TOP')
+            else:
+                self.emit('DUP_TOPX', count)
+            self.emit('SLICE+%d' % k)
+            self.visit(node.expr)
+            self.emit(op)
+            self.emit(('ROT_TWO', 'ROT_THREE', 'ROT_FOUR')[count - 1])
+            self.emit('STORE_SLICE+%d' % k)
+
+    def Print(self, node):
+        for child in node.nodes:
+            self.visit(child)
+            if node.dest is None:
+                self.emit('PRINT_ITEM')
+            else:
+                # 2.0 evaluates the file for each item
+                self.visit(node.dest)
+                self.emit('PRINT_ITEM_TO')
+
+    def Printnl(self, node):
+        self.Print(node)
+        if node.dest is None:
+            self.emit('PRINT_NEWLINE')
+        else:
+            self.visit(node.dest)
+            self.emit('PRINT_NEWLINE_TO')
+
+    def Return(self, node):
+        if not self.infunction:
+            self.error("'return' outside function", node)
+        self.visit(node.value)
+        self.emit('RETURN_VALUE')
+
+    def Raise(self, node):
+        count = 0
+        for child in (node.expr1, node.expr2, node.expr3):
+            if child is not None:
+                self.visit(child)
+                count = count + 1
+        self.emit('RAISE_VARARGS', count)
+
+    def Break(self, node):
+        if not self.loops:
+            self.error("'break' outside loop", node)
+        self.emit('BREAK_LOOP')
+
+    def Continue(self, node):
+        if not self.blocks or self.blocks[-1] != 'SETUP_LOOP':
+            if 'SETUP_LOOP' in self.blocks:
+                self.error("'continue' not supported inside 'try' clause",
+                           node)
+            self.error("'continue' not properly in loop", node)
+        self.emit('JUMP_ABSOLUTE', self.begin)
+
+    def Exec(self, node):
+        self.visit(node.expr)
+        if node.locals is None:
+            self.load_const(None)
+        else:
+            # the tree calls the first mapping locals
+            self.visit(node.locals)
+        if node.globals is None:
+            self.emit('DUP_TOP')
+        else:
+            self.visit(node.globals)
+        self.emit('EXEC_STMT')
+
+    def Assert(self, node):
+        skip = []
+        self.name_op('LOAD_GLOBAL', '__debug__')
+        self.fwref('JUMP_IF_FALSE', skip)
+        self.emit('POP_TOP')
+        self.visit(node.test)
+        self.fwref('JUMP_IF_TRUE', skip)
+        self.emit('POP_TOP')
+        self.name_op('LOAD_GLOBAL', 'AssertionError')
+        if node.fail is None:
+            self.emit('RAISE_VARARGS', 1)
+        else:
+            self.visit(node.fail)
+            self.emit('RAISE_VARARGS', 2)
+        self.backpatch(skip)
+        self.emit('POP_TOP')
+
+    def Import(self, node):
+        for name, asname in node.names:
+            self.load_const(None)
+            self.name_op('IMPORT_NAME', name)
+            parts = string.split(name, '.')
+            if asname is None:
+                self.name_op('STORE_NAME', parts[0])
+            else:
+                for part in parts[1:]:
+                    self.name_op('LOAD_ATTR', part)
+                self.name_op('STORE_NAME', asname)
+
+    def From(self, node):
+        if node.level:
+            self.error('relative imports are not in Python 2.0', node)
+        self.load_const(tuple(map(lambda pair: pair[0], node.names)))
+        self.name_op('IMPORT_NAME', node.modname)
+        if node.names[0][0] == '*':
+            self.emit('IMPORT_STAR')
+            return
+        for name, asname in node.names:
+            self.name_op('IMPORT_FROM', name)
+            self.name_op('STORE_NAME', asname or name)
+        self.emit('POP_TOP')
+
+    def If(self, node):
+        end = []
+        for i in range(len(node.tests)):
+            test, body = node.tests[i]
+            if i:
+                self.emit('SET_LINENO', node.testlines[i])
+            self.visit(test)
+            after = []
+            self.fwref('JUMP_IF_FALSE', after)
+            self.emit('POP_TOP')
+            self.visit(body)
+            self.fwref('JUMP_FORWARD', end)
+            self.backpatch(after)
+            self.emit('POP_TOP')
+        if node.else_ is not None:
+            self.visit(node.else_)
+        self.backpatch(end)
+
+    def While(self, node):
+        loop = []
+        self.fwref('SETUP_LOOP', loop)
+        self.blocks.append('SETUP_LOOP')
+        begin = self.begin
+        self.begin = len(self.code)
+        self.emit('SET_LINENO', node.lineno)
+        self.visit(node.test)
+        after = []
+        self.fwref('JUMP_IF_FALSE', after)
+        self.emit('POP_TOP')
+        self.loops = self.loops + 1
+        self.visit(node.body)
+        self.loops = self.loops - 1
+        self.emit('JUMP_ABSOLUTE', self.begin)
+        self.begin = begin
+        self.backpatch(after)
+        self.emit('POP_TOP')
+        self.emit('POP_BLOCK')
+        del self.blocks[-1]
+        if node.else_ is not None:
+            self.visit(node.else_)
+        self.backpatch(loop)
+
+    def For(self, node):
+        loop = []
+        self.fwref('SETUP_LOOP', loop)
+        self.blocks.append('SETUP_LOOP')
+        self.visit(node.list)
+        self.load_const(0)
+        begin = self.begin
+        self.begin = len(self.code)
+        self.emit('SET_LINENO', node.lineno)
+        after = []
+        self.fwref('FOR_LOOP', after)
+        self.assign(node.assign)
+        self.loops = self.loops + 1
+        self.visit(node.body)
+        self.loops = self.loops - 1
+        self.emit('JUMP_ABSOLUTE', self.begin)
+        self.begin = begin
+        self.backpatch(after)
+        self.emit('POP_BLOCK')
+        del self.blocks[-1]
+        if node.else_ is not None:
+            self.visit(node.else_)
+        self.backpatch(loop)
+
+    def TryExcept(self, node):
+        handler = []
+        else_ = []
+        end = []
+        self.fwref('SETUP_EXCEPT', handler)
+        self.blocks.append('SETUP_EXCEPT')
+        self.visit(node.body)
+        self.emit('POP_BLOCK')
+        del self.blocks[-1]
+        self.fwref('JUMP_FORWARD', else_)
+        self.backpatch(handler)
+        for i in range(len(node.handlers)):
+            type, target, body = node.handlers[i]
+            if handler is None:
+                self.error("default 'except:' must be last", body)
+            self.emit('SET_LINENO', node.handlerlines[i])
+            if type is not None:
+                handler = []
+                self.emit('DUP_TOP')
+                self.visit(type)
+                self.emit('COMPARE_OP',
+                          list(decompile.cmp_op).index('exception match'))
+                self.fwref('JUMP_IF_FALSE', handler)
+                self.emit('POP_TOP')
+            else:
+                handler = None
+            self.emit('POP_TOP')
+            if target is None:
+                self.emit('POP_TOP')
+            else:
+                self.assign(target)
+            self.emit('POP_TOP')
+            self.visit(body)
+            self.fwref('JUMP_FORWARD', end)
+            if handler:
+                self.backpatch(handler)
+                self.emit('POP_TOP')
+        self.emit('END_FINALLY')
+        self.backpatch(else_)
+        if node.else_ is not None:
+            self.visit(node.else_)
+        self.backpatch(end)
+
+    def TryFinally(self, node):
+        final = []
+        self.fwref('SETUP_FINALLY', final)
+        self.blocks.append('SETUP_FINALLY')
+        self.visit(node.body)
+        self.emit('POP_BLOCK')
+        self.blocks[-1] = 'END_FINALLY'
+        self.load_const(None)
+        self.backpatch(final)
+        self.emit('SET_LINENO', node.finallyline)
+        self.visit(node.final)
+        self.emit('END_FINALLY')
+        del self.blocks[-1]
+
+    def Function(self, node):
+        if node.decorators is not None:
+            self.visit(node.decorators)
+        generator = CodeGenerator(self.filename, node.name, self.private)
+        index = self.const(generator.function(node))
+        for default in node.defaults:
+            self.visit(default)
+        self.emit('LOAD_CONST', index)
+        self.emit('MAKE_FUNCTION', len(node.defaults))
+        self.name_op('STORE_NAME', node.name)
+
+    def Lambda(self, node):
+        generator = CodeGenerator(self.filename, '<lambda>', self.private)
+        index = self.const(generator.lambda_(node))
+        for default in node.defaults:
+            self.visit(default)
+        self.emit('LOAD_CONST', index)
+        self.emit('MAKE_FUNCTION', len(node.defaults))
+
+    def Class(self, node):
+        if node.decorators is not None:
+            self.visit(node.decorators)
+        self.load_const(node.name)
+        for base in node.bases:
+            self.visit(base)
+        self.emit('BUILD_TUPLE', len(node.bases))
+        generator = CodeGenerator(self.filename, node.name, node.name)
+        self.load_const(generator.class_(node))
+        self.emit('MAKE_FUNCTION', 0)
+        self.emit('CALL_FUNCTION', 0)
+        self.emit('BUILD_CLASS')
+        self.name_op('STORE_NAME', node.name)
+
+    # expressions
+
+    def Const(self, node):
+        self.load_const(node.value)
+
+    def Name(self, node):
+        self.name_op('LOAD_NAME', node.name)
+
+    def Getattr(self, node):
+        self.visit(node.expr)
+        self.name_op('LOAD_ATTR', node.attrname)
+
+    def Ellipsis(self, node):
+        self.load_const(Ellipsis)
+
+    def Tuple(self, node):
+        for child in node.nodes:
+            self.visit(child)
+        self.emit('BUILD_TUPLE', len(node.nodes))
+
+    def List(self, node):
+        for child in node.nodes:
+            self.visit(child)
+        self.emit('BUILD_LIST', len(node.nodes))
+
+    def Dict(self, node):
+        self.emit('BUILD_MAP', 0)
+        for key, value in node.items:
+            self.emit('DUP_TOP')
+            self.visit(value)
+            self.emit('ROT_TWO')
+            self.visit(key)
+            self.emit('STORE_SUBSCR')
+
+    def Backquote(self, node):
+        self.visit(node.expr)
+        self.emit('UNARY_CONVERT')
+
+    def UnaryAdd(self, node):
+        self.visit(node.expr)
+        self.emit('UNARY_POSITIVE')
+
+    def UnarySub(self, node):
+        self.visit(node.expr)
+        self.emit('UNARY_NEGATIVE')
+
+    def Invert(self, node):
+        self.visit(node.expr)
+        self.emit('UNARY_INVERT')
+
+    def Not(self, node):
+        self.visit(node.expr)
+        self.emit('UNARY_NOT')
+
+    def binary(self, node):
+        # the left operands of a chain like a + b + ... + z are compiled
+        # in a loop, since the chain can be longer than the recursion
+        # limit
+        chain = []
+        while BINARY.has_key(node.__class__.__name__) and \
+              hasattr(node, 'left'):
+            chain.append(node)
+            node = node.left
+        self.visit(node)
+        chain.reverse()
+        for node in chain:
+            self.visit(node.right)
+            self.emit(BINARY[node.__class__.__name__])
+
+    Add = Sub = Mul = Div = Mod = Power = LeftShift = RightShift = binary
+
+    def bitwise(self, node):
+        self.visit(node.nodes[0])
+        for child in node.nodes[1:]:
+            self.visit(child)
+            self.emit(BINARY[node.__class__.__name__])
+
+    Bitand = Bitor = Bitxor = bitwise
+
+    def logical(self, nodes, jump):
+        end = []
+        for child in nodes[:-1]:
+            self.visit(child)
+            self.fwref(jump, end)
+            self.emit('POP_TOP')
+        self.visit(nodes[-1])
+        self.backpatch(end)
+
+    def And(self, node):
+        self.logical(node.nodes, 'JUMP_IF_FALSE')
+
+    def Or(self, node):
+        self.logical(node.nodes, 'JUMP_IF_TRUE')
+
+    def Compare(self, node):
+        # all but the last comparison of a chain keep their right
+        # operand for the next, and jump out if they are false
+        cmp_op = list(decompile.cmp_op)
+        self.visit(node.expr)
+        ops = node.ops
+        cleanup = []
+        for i in range(len(ops)):
+            op, child = ops[i]
+            self.visit(child)
+            if op == '<>':
+                op = '!='
+            if i < len(ops) - 1:
+                self.emit('DUP_TOP')
+                self.emit('ROT_THREE')
+                self.emit('COMPARE_OP', cmp_op.index(op))
+                self.fwref('JUMP_IF_FALSE', cleanup)
+                self.emit('POP_TOP')
+            else:
+                self.emit('COMPARE_OP', cmp_op.index(op))
+        if cleanup:
+            end = []
+            self.fwref('JUMP_FORWARD', end)
+            self.backpatch(cleanup)
+            self.emit('ROT_TWO')
+            self.emit('POP_TOP')
+            self.backpatch(end)
+
+    def CallFunc(self, node):
+        self.visit(node.node)
+        positional = keywords = 0
+        for arg in node.args:
+            if isinstance(arg, ast.Keyword):
+                self.load_const(arg.name)
+                self.visit(arg.expr)
+                keywords = keywords + 1
+            else:
+                self.visit(arg)
+                positional = positional + 1
+        opname = 'CALL_FUNCTION'
+        if node.star_args is not None or node.dstar_args is not None:
+            opname = opname + '_'
+        if node.star_args is not None:
+            self.visit(node.star_args)
+            opname = opname + 'VAR'
+        if node.dstar_args is not None:
+            self.visit(node.dstar_args)
+            if node.star_args is not None:
+                opname = opname + '_'
+            opname = opname + 'KW'
+        self.emit(opname, positional | (keywords << 8))
+
+    def subscripts(self, subs):
+        for sub in subs:
+            self.visit(sub)
+        if len(subs) > 1:
+            self.emit('BUILD_TUPLE', len(subs))
+
+    def Subscript(self, node):
+        self.visit(node.expr)
+        self.subscripts(node.subs)
+        if node.flags == 'OP_DELETE':
+            self.emit('DELETE_SUBSCR')
+        else:
+            self.emit('BINARY_SUBSCR')
+
+    def Sliceobj(self, node):
+        for child in node.nodes:
+            self.visit(child)
+        self.emit('BUILD_SLICE', len(node.nodes))
+
+    def slice_bounds(self, node):
+        # push the sliced object and the bounds given, and return the
+        # number to add to SLICE+0 and the like
+        self.visit(node.expr)
+        k = 0
+        if node.lower is not None:
+            self.visit(node.lower)
+            k = k + 1
+        if node.upper is not None:
+            self.visit(node.upper)
+            k = k + 2
+        return k
+
+    def Slice(self, node):
+        k = self.slice_bounds(node)
+        if node.flags == 'OP_DELETE':
+            self.emit('DELETE_SLICE+%d' % k)
+        else:
+            self.emit('SLICE+%d' % k)
+
+def compile_source(source, filename='<string>'):
+    # the 2.0 code object of a module's source
+    source = string.replace(source, '\r\n', '\n')
+    if source[-1:] != '\n':
+        source = source + '\n'
+    tree = Transformer().parsesuite(source)
+    return CodeGenerator(filename, '?').module(tree)
+
+def write_object(out, value):
+    kind = type(value)
+    if value is None:
+        out.append('N')
+    elif value is Ellipsis:
+        out.append('.')
+    elif kind is types.IntType:
+        if -0x80000000 <= value <= 0x7fffffff:
+            out.append('i' + struct.pack('<i', value))
+        else:
+            out.append('I' + struct.pack('<q', value))
+    elif kind is types.LongType:
+        # base 2**15 digits, the sign in that of the count
+        digits = []
+        n = abs(value)
+        while n:
+            digits.append(struct.pack('<h', int(n & 0x7fff)))
+            n = n >> 15
+        count = len(digits)
+        if value < 0:
+            count = -count
+        out.append('l' + struct.pack('<i', count) + string.join(digits, ''))
+    elif kind is types.FloatType:
+        text = repr(value)
+        out.append('f' + chr(len(text)) + text)
+    elif kind is types.ComplexType:
+        real = repr(value.real)
+        imag = repr(value.imag)
+        out.append('x' + chr(len(real)) + real + chr(len(imag)) + imag)
+    elif kind is types.StringType:
+        out.append('s' + struct.pack('<i', len(value)) + value)
+    elif kind is types.UnicodeType:
+        data = value.encode('utf-8')
+        out.append('u' + struct.pack('<i', len(data)) + data)
+    elif kind in (types.TupleType, types.ListType):
+        out.append({types.TupleType: '(', types.ListType: '['}[kind] +
+                   struct.pack('<i', len(value)))
+        for item in value:
+            write_object(out, item)
+    elif kind is types.DictType:
+        out.append('{')
+        for key, item in value.items():
+            write_object(out, key)
+            write_object(out, item)
+        out.append('0')
+    elif kind is types.CodeType:
+        out.append('c' + struct.pack('<hhhh', value.co_argcount,
+                                     value.co_nlocals, value.co_stacksize,
+                                     value.co_flags))
+        for item in (value.co_code, value.co_consts, value.co_names,
+                     value.co_varnames, value.co_filename, value.co_name):
+            write_object(out, item)
+        out.append(struct.pack('<h', value.co_firstlineno))
+        write_object(out, value.co_lnotab)
+    else:
+        raise ValueError, "can't marshal %s for Python 2.0" % kind.__name__
+
+def dumps(value):
+    # a value in the marshal format of Python 2.0
+    out = []
+    write_object(out, value)
+    return string.join(out, '')
+
+def write_pyc(code, filename, mtime=0):
+    f = open(filename, 'wb')
+    try:
+        f.write(MAGIC + struct.pack('<i', mtime) + dumps(code))
+    finally:
+        f.close()
+
+def main(args):
+    if not args:
+        sys.stderr.write('usage: compile20.py file.py ...\n')
+        return 2
+    import os
+    failed = 0
+    for filename in args:
+        try:
+            f = open(filename, 'rU')
+            try:
+                source = f.read()
+            finally:
+                f.close()
+            code = compile_source(source, filename)
+            write_pyc(code, os.path.splitext(filename)[0] + '.pyc',
+                      int(os.stat(filename).st_mtime))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            sys.stderr.write('%s: %s\n' % (filename,
+                                           decompile.describe_error()))
+            failed = failed + 1
+    return failed and 1 or 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -40,8 +40,9 @@
 
 __version__ = '0.9'
 
-import dis, string, sys, types
+import array, bisect, os, string, sys, time, types
 
+NEWLOCALS = 2
 VARARGS = 4
 KWARGS = 8
 
@@ -65,6 +66,175 @@ PRECEDENCE_ARG = PRECEDENCE_LAMBDA
 PRECEDENCE_COMMA = 1
 PRECEDENCE_NONE = 0
 
+# The opcodes of Python 2.0 bytecode, laid out as in its dis module.
+# These, rather than the tables of the running Python's dis module, are
+# used to read the bytecode, since the Decompiler only handles 1.5.2
+# and 2.0 bytecode, and later versions renumbered some of the same
+# names.  1.5.2 bytecode uses the same numbers, except that it has
+# UNPACK_TUPLE where 2.0 has UNPACK_SEQUENCE, which does the same for
+# tuples, and UNPACK_LIST, which 2.0 dropped.
+
+cmp_op = ('<', '<=', '==', '!=', '>', '>=', 'in', 'not in', 'is',
+          'is not', 'exception match', 'BAD')
+
+hasconst = []
+hasname = []
+hasjrel = []
+hasjabs = []
+haslocal = []
+hascompare = []
+
+opname = map(lambda op: '<%d>' % op, range(256))
+opmap = {}
+
+def def_op(name, op):
+    opname[op] = name
+    opmap[name] = op
+
+def name_op(name, op):
+    def_op(name, op)
+    hasname.append(op)
+
+def jrel_op(name, op):
+    def_op(name, op)
+    hasjrel.append(op)
+
+def jabs_op(name, op):
+    def_op(name, op)
+    hasjabs.append(op)
+
+def_op('STOP_CODE', 0)
+def_op('POP_TOP', 1)
+def_op('ROT_TWO', 2)
+def_op('ROT_THREE', 3)
+def_op('DUP_TOP', 4)
+def_op('ROT_FOUR', 5)
+
+def_op('UNARY_POSITIVE', 10)
+def_op('UNARY_NEGATIVE', 11)
+def_op('UNARY_NOT', 12)
+def_op('UNARY_CONVERT', 13)
+
+def_op('UNARY_INVERT', 15)
+
+def_op('BINARY_POWER', 19)
+
+def_op('BINARY_MULTIPLY', 20)
+def_op('BINARY_DIVIDE', 21)
+def_op('BINARY_MODULO', 22)
+def_op('BINARY_ADD', 23)
+def_op('BINARY_SUBTRACT', 24)
+def_op('BINARY_SUBSCR', 25)
+
+def_op('SLICE+0', 30)
+def_op('SLICE+1', 31)
+def_op('SLICE+2', 32)
+def_op('SLICE+3', 33)
+
+def_op('STORE_SLICE+0', 40)
+def_op('STORE_SLICE+1', 41)
+def_op('STORE_SLICE+2', 42)
+def_op('STORE_SLICE+3', 43)
+
+def_op('DELETE_SLICE+0', 50)
+def_op('DELETE_SLICE+1', 51)
+def_op('DELETE_SLICE+2', 52)
+def_op('DELETE_SLICE+3', 53)
+
+def_op('INPLACE_ADD', 55)
+def_op('INPLACE_SUBTRACT', 56)
+def_op('INPLACE_MULTIPLY', 57)
+def_op('INPLACE_DIVIDE', 58)
+def_op('INPLACE_MODULO', 59)
+def_op('STORE_SUBSCR', 60)
+def_op('DELETE_SUBSCR', 61)
+
+def_op('BINARY_LSHIFT', 62)
+def_op('BINARY_RSHIFT', 63)
+def_op('BINARY_AND', 64)
+def_op('BINARY_XOR', 65)
+def_op('BINARY_OR', 66)
+def_op('INPLACE_POWER', 67)
+
+def_op('PRINT_EXPR', 70)
+def_op('PRINT_ITEM', 71)
+def_op('PRINT_NEWLINE', 72)
+def_op('PRINT_ITEM_TO', 73)
+def_op('PRINT_NEWLINE_TO', 74)
+def_op('INPLACE_LSHIFT', 75)
+def_op('INPLACE_RSHIFT', 76)
+def_op('INPLACE_AND', 77)
+def_op('INPLACE_XOR', 78)
+def_op('INPLACE_OR', 79)
+def_op('BREAK_LOOP', 80)
+
+def_op('LOAD_LOCALS', 82)
+def_op('RETURN_VALUE', 83)
+def_op('IMPORT_STAR', 84)
+def_op('EXEC_STMT', 85)
+
+def_op('POP_BLOCK', 87)
+def_op('END_FINALLY', 88)
+def_op('BUILD_CLASS', 89)
+
+HAVE_ARGUMENT = 90              # Opcodes from here have an argument:
+
+name_op('STORE_NAME', 90)       # Index in name list
+name_op('DELETE_NAME', 91)      # ""
+def_op('UNPACK_SEQUENCE', 92)   # Number of tuple items
+def_op('UNPACK_LIST', 93)       # Number of list items, 1.5.2 only
+
+name_op('STORE_ATTR', 95)       # Index in name list
+name_op('DELETE_ATTR', 96)      # ""
+name_op('STORE_GLOBAL', 97)     # ""
+name_op('DELETE_GLOBAL', 98)    # ""
+def_op('DUP_TOPX', 99)          # number of items to duplicate
+def_op('LOAD_CONST', 100)       # Index in const list
+hasconst.append(100)
+name_op('LOAD_NAME', 101)       # Index in name list
+def_op('BUILD_TUPLE', 102)      # Number of tuple items
+def_op('BUILD_LIST', 103)       # Number of list items
+def_op('BUILD_MAP', 104)        # Always zero for now
+name_op('LOAD_ATTR', 105)       # Index in name list
+def_op('COMPARE_OP', 106)       # Comparison operator
+hascompare.append(106)
+name_op('IMPORT_NAME', 107)     # Index in name list
+name_op('IMPORT_FROM', 108)     # Index in name list
+
+jrel_op('JUMP_FORWARD', 110)    # Number of bytes to skip
+jrel_op('JUMP_IF_FALSE', 111)   # ""
+jrel_op('JUMP_IF_TRUE', 112)    # ""
+jabs_op('JUMP_ABSOLUTE', 113)   # Target byte offset from beginning of code
+jrel_op('FOR_LOOP', 114)        # Number of bytes to skip
+
+name_op('LOAD_GLOBAL', 116)     # Index in name list
+
+jrel_op('SETUP_LOOP', 120)      # Distance to target address
+jrel_op('SETUP_EXCEPT', 121)    # ""
+jrel_op('SETUP_FINALLY', 122)   # ""
+
+def_op('LOAD_FAST', 124)        # Local variable number
+haslocal.append(124)
+def_op('STORE_FAST', 125)       # Local variable number
+haslocal.append(125)
+def_op('DELETE_FAST', 126)      # Local variable number
+haslocal.append(126)
+
+def_op('SET_LINENO', 127)       # Current line number
+
+def_op('RAISE_VARARGS', 130)    # Number of raise arguments (1, 2, or 3)
+def_op('CALL_FUNCTION', 131)    # #args + (#kwargs << 8)
+def_op('MAKE_FUNCTION', 132)    # Number of args with default values
+def_op('BUILD_SLICE', 133)      # Number of items
+
+def_op('CALL_FUNCTION_VAR', 140)     # #args + (#kwargs << 8)
+def_op('CALL_FUNCTION_KW', 141)      # #args + (#kwargs << 8)
+def_op('CALL_FUNCTION_VAR_KW', 142)  # #args + (#kwargs << 8)
+
+def_op('EXTENDED_ARG', 143)
+
+del def_op, name_op, jrel_op, jabs_op
+
 def current_line(code, i):
     tab = code.co_lnotab
     line = code.co_firstlineno
@@ -77,76 +247,265 @@ def current_line(code, i):
         line = line + ord(tab[i+1])
     return line
 
-class Expression:
+def line_table(code):
+    # Decode co_lnotab once into two parallel arrays: the strictly
+    # increasing addresses at which the line number changes, and the
+    # line number from that address onwards.  The line for an address
+    # is then found by bisection instead of rescanning co_lnotab.
+    tab = code.co_lnotab
+    addrs = array.array('i', [0])
+    lines = array.array('i', [code.co_firstlineno])
+    addr = 0
+    line = code.co_firstlineno
+    for i in range(0, len(tab), 2):
+        addr = addr + ord(tab[i])
+        line = line + ord(tab[i+1])
+        if addr == addrs[-1]:
+            lines[-1] = line
+        else:
+            addrs.append(addr)
+            lines.append(line)
+    return addrs, lines
+
+def split_format(format, cache={}):
+    # Split an Expression format into the literal text around its %s
+    # conversions.
+    parts = cache.get(format)
+    if parts is None:
+        parts = []
+        for part in string.split(format, '%s'):
+            parts.append(string.replace(part, '%%', '%'))
+        cache[format] = parts
+    return parts
+
+def render(expr):
+    # Turn an expression tree into text in one pass.  The nodes push
+    # their pieces onto an explicit stack, so that long chains of
+    # operators do not recurse, and the text is joined once at the end.
+    out = []
+    pieces = [expr]
+    while pieces:
+        piece = pieces.pop()
+        if isinstance(piece, Node):
+            piece.Expand(pieces)
+        else:
+            out.append(piece)
+    return string.join(out, '')
 
-    def __init__(self, value, precedence):
-        self.value = value
-        self.precedence = precedence
+class Node(object):
 
-    def __repr__(self):
-        return 'Expression(%s, %s)' % (`self.value`, `self.precedence`)
+    # Base class of the expression nodes.  A node is allocated for every
+    # load and every operator, so the classes use __slots__ to keep
+    # instances small.
+
+    __slots__ = ()
 
     def __str__(self):
-        return str(self.value)
+        return render(self)
 
     def Precedence(self):
         return self.precedence
 
     def Value(self):
-        return self.value
+        return str(self)
 
     def GetString(self, precedence):
+        # Return this expression as an operand needing at least the given
+        # precedence, parenthesized if necessary.
         if self.Precedence() < precedence:
-            return '(%s)' % self
+            return Expression('(%s)', PRECEDENCE_ATOM, self)
         else:
-            return str(self)
+            return self
+
+class Expression(Node):
+
+    # An expression is kept as a tree of nodes until its text is needed,
+    # usually when the statement containing it is added.  A node has a
+    # format string and the operands, either nodes or strings, for its
+    # %s conversions.  Parentheses are added as operands are taken for
+    # larger expressions, according to their precedence.
+
+    __slots__ = ('format', 'precedence', 'operands')
+
+    def __init__(self, format, precedence, *operands):
+        self.format = format
+        self.precedence = precedence
+        self.operands = operands
+
+    def __repr__(self):
+        return 'Expression(%s, %s)' % (`str(self)`, `self.precedence`)
+
+    def Expand(self, pieces):
+        # Push the pieces of the text onto a render stack, last first.
+        parts = split_format(self.format)
+        operands = self.operands
+        i = len(operands)
+        pieces.append(parts[i])
+        while i:
+            i = i - 1
+            pieces.append(operands[i])
+            pieces.append(parts[i])
+
+class Sequence(Node):
 
-class Atom(Expression):
+    # comma separated expressions, such as an argument list
+
+    __slots__ = ('values',)
+
+    precedence = PRECEDENCE_COMMA
+
+    def __init__(self, values):
+        self.values = values
+
+    def __repr__(self):
+        return 'Sequence(%s)' % `self.values`
+
+    def Expand(self, pieces):
+        values = self.values
+        i = len(values)
+        while i:
+            i = i - 1
+            pieces.append(values[i])
+            if i:
+                pieces.append(', ')
+
+class Atom(Node):
+
+    __slots__ = ('value',)
+
+    precedence = PRECEDENCE_ATOM
 
     def __init__(self, value):
-        Expression.__init__(self, value, PRECEDENCE_ATOM)
+        self.value = value
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, `self.value`)
+
+    def __str__(self):
+        return str(self.value)
+
+    def Value(self):
+        return self.value
+
+    def Expand(self, pieces):
+        pieces.append(str(self))
 
 class Constant(Atom):
 
+    # A Decompiler makes one node for each constant table entry it loads,
+    # shared by every load of it in the module, and the text of the
+    # constant is made the first time it's needed and kept, since a large
+    # constant can take much longer to repr than the rest of its
+    # statement.  The items of a tuple have nodes of their own, so a
+    # string in many tuples is turned into text once, and the text of the
+    # tuple is the text of its items, joined with commas in parentheses.
+    # None is loaded so often that every Decompiler shares CONSTANT_NONE
+    # for it.
+
+    __slots__ = ('text', 'items')
+
+    def __init__(self, value):
+        self.value = value
+        self.text = None
+        self.items = None
+
     def __str__(self):
+        text = self.text
+        if text is None:
+            items = self.items
+            if items is not None:
+                text = string.join(map(lambda item: item.Repr(), items),
+                                   ', ')
+                if len(items) == 1:
+                    text = text + ','
+                text = '(' + text + ')'
+            elif self.value is Ellipsis:
+                # loaded on its own, only for a subscript
+                text = '...'
+            else:
+                text = repr(self.value)
+            self.text = text
+        return text
+
+    def Repr(self):
+        # the text of the value as an item of a tuple
         if self.value is Ellipsis:
-            return '...'
-        else:
-            return repr(self.value)
+            return 'Ellipsis'
+        return str(self)
+
+CONSTANT_NONE = Constant(None)
 
-class Local(Atom):
-    pass
+# the types of constants keyed by value
+value_keyed = (types.StringType, types.UnicodeType, types.IntType,
+               types.LongType)
 
-class Global(Atom):
-    pass
+def constant_key(value):
+    # The key of the Constant node for a value in Decompiler.constants:
+    # its type and value, so that equal constants in different code
+    # objects share a node but 1 and 1.0 don't.  A float or complex is
+    # keyed by its repr, since 0.0 == -0.0.  Any other value, such as a
+    # code object, is keyed by its id, which isn't reused while the node
+    # holds the value.
+    kind = type(value)
+    if kind is types.TupleType:
+        return kind, tuple(map(constant_key, value))
+    if kind is types.FloatType or kind is types.ComplexType:
+        return kind, repr(value)
+    if kind in value_keyed:
+        return kind, value
+    return kind, id(value)
+
+class Name(Atom):
+
+    # Names are interned by the Decompiler, so that every load of the
+    # same name of the same kind in a module shares one node.
+
+    __slots__ = ()
+
+class Local(Name):
+    __slots__ = ()
+
+class Global(Name):
+    __slots__ = ()
 
 class Map(Atom):
 
+    __slots__ = ()
+
     def __init__(self):
         Atom.__init__(self, [])
 
     def __str__(self):
-        return '{%s}' % string.join(self.value, ', ')
+        return render(self)
 
     def SetAttr(self, name, value):
-        self.value.append("%s: %s" % (name, value))
+        self.value.append(Expression('%s: %s', PRECEDENCE_NONE, name, value))
+
+    def Expand(self, pieces):
+        pieces.append('}')
+        Sequence(self.value).Expand(pieces)
+        pieces.append('{')
 
 class Tuple(Atom):
 
-    def __init__(self, values):
-        Atom.__init__(self, values)
+    __slots__ = ()
 
     def __str__(self):
-        values = self.Value()
+        return render(self)
+
+    def Expand(self, pieces):
+        values = self.value
         if len(values) == 0:
-            return '()'
+            pieces.append('()')
         elif len(values) == 1:
             # This doesn't need the parens immediately, but
             # it emphasises the prescence of the comma, and
             # confirms that it is a 1-tuple
-            return '(%s,)' % values[0]
+            pieces.append(',)')
+            pieces.append(values[0])
+            pieces.append('(')
         else:
-            return string.join(values, ', ')
+            Sequence(values).Expand(pieces)
 
     def Precedence(self):
         if len(self.value) <= 1:
@@ -159,22 +518,32 @@ class Tuple(Atom):
 
 class CodeCursor:
 
-    def __init__(self, code):
+    def __init__(self, code, lines=None):
         self.code = code  # code object
         self.i = 0        # instruction pointer
         self.extend = 0   # extended opcodes
         self.lineno = 1   # minimum possible line number
         self.lastop = 0   # pointer to last operator read
         self.stopi = [len(code.co_code)]
+        # line table, shared by all decompilers working on this cursor,
+        # as from line_table unless it was found beforehand
+        if lines is None:
+            lines = line_table(code)
+        self.lineaddrs, self.linenos = lines
+        self.flow = None  # ControlFlow, made when first needed
 
     def GetPosition(self):
         return self.i
 
+    def SetPosition(self, i):
+        self.i = i
+
     def AtEnd(self):
         return self.i == self.stopi[0]
 
     def GetLine(self):
-        return max(self.lineno, current_line(self.code, self.lastop))
+        k = bisect.bisect_right(self.lineaddrs, self.lastop)
+        return max(self.lineno, self.linenos[k-1])
 
     def SetLine(self, lineno):
         assert lineno >= self.lineno, `lineno, self.lineno`
@@ -190,7 +559,7 @@ class CodeCursor:
         if self.i < self.stopi[-1]:
             c = self.code.co_code[self.i]
             op = ord(c)
-            opcode = dis.opname[op]
+            opcode = opname[op]
             if opcode == 'EXTENDED_ARG':
                 self.i = self.i + 1
                 self.extend = self.ReadOperand()
@@ -199,6 +568,12 @@ class CodeCursor:
             opcode = None
         return opcode
 
+    def NextOp(self):
+        # as NextOpcode, but returns the opcode number
+        if self.NextOpcode() is None:
+            return None
+        return ord(self.code.co_code[self.i])
+
     def ReadOpcode(self, *args):
         opcode = self.NextOpcode()
         assert opcode is not None
@@ -228,64 +603,1258 @@ class CodeCursor:
         assert n < len(self.code.co_names), `n, self.code.co_names`
         return self.code.co_names[n]
 
+    def NestedCursor(self, code):
+        # cursor of the same kind for a code object found in co_consts
+        return self.__class__(code)
+
+    def Flow(self):
+        if self.flow is None:
+            self.flow = ControlFlow(self.code)
+        return self.flow
+
+    def JumpTarget(self):
+        # the offset that the instruction just read jumps to
+        return self.Flow().targets[self.lastop]
+
+class InstructionStream:
+
+    # The instructions of a code object, decoded once into parallel
+    # arrays.  Instruction k starts at byte offset offsets[k] (after any
+    # EXTENDED_ARG prefix), has opcode opcodes[k] (name opnames[k]) and
+    # operand operands[k], with EXTENDED_ARG already applied, and the
+    # next instruction starts at nexts[k].  index maps a byte offset to
+    # the instruction starting there, or -1 inside an instruction.
+
+    def __init__(self, code):
+        co_code = array.array('B', code.co_code)
+        n = len(co_code)
+        have_argument = HAVE_ARGUMENT
+        extended_arg = opmap['EXTENDED_ARG']
+        index = [-1] * (n + 1)
+        offsets = []
+        opcodes = []
+        operands = []
+        nexts = []
+        i = 0
+        start = 0
+        extend = 0
+        while i < n:
+            op = co_code[i]
+            if op >= have_argument:
+                assert i + 2 < n, `i, n`
+                operand = co_code[i+1] + co_code[i+2]*256 + (extend << 16)
+                next = i + 3
+            else:
+                operand = 0
+                next = i + 1
+            if op == extended_arg:
+                extend = operand
+            else:
+                index[start] = index[i] = len(offsets)
+                offsets.append(i)
+                opcodes.append(op)
+                operands.append(operand)
+                nexts.append(next)
+                extend = 0
+                start = next
+            i = next
+        self.offsets = array.array('i', offsets)
+        self.opcodes = array.array('B', opcodes)
+        self.operands = array.array('l', operands)
+        self.nexts = array.array('i', nexts)
+        self.opnames = map(opname.__getitem__, opcodes)
+        self.index = array.array('i', index)
+
+def jump_targets(stream):
+    # Two parallel arrays: the offsets of the instructions of an
+    # InstructionStream that have a jump operand, in order, and the
+    # offsets they jump to.
+    offsets = array.array('i')
+    targets = array.array('i')
+    for k in range(len(stream.offsets)):
+        op = stream.opcodes[k]
+        if op in hasjrel:
+            targets.append(stream.nexts[k] + stream.operands[k])
+        elif op in hasjabs:
+            targets.append(stream.operands[k])
+        else:
+            continue
+        offsets.append(stream.offsets[k])
+    return offsets, targets
+
+def disassemble_lines(code):
+    # Return a dictionary mapping each source line of a code object to
+    # a list of its instructions as text, for a commented disassembly.
+    stream = InstructionStream(code)
+    addrs, linenos = line_table(code)
+    lines = {}
+    for k in range(len(stream.offsets)):
+        name = stream.opnames[k]
+        if name == 'SET_LINENO':
+            continue
+        offset = stream.offsets[k]
+        op = stream.opcodes[k]
+        arg = stream.operands[k]
+        if op < HAVE_ARGUMENT:
+            text = '%d %s' % (offset, name)
+        else:
+            if op in hasconst:
+                const = code.co_consts[arg]
+                if type(const) is types.CodeType:
+                    argtext = '<code %s>' % const.co_name
+                else:
+                    argtext = `const`
+                    if len(argtext) > 40:
+                        argtext = argtext[:37] + '...'
+            elif op in hasname:
+                argtext = code.co_names[arg]
+            elif op in haslocal:
+                argtext = code.co_varnames[arg]
+            elif op in hascompare:
+                argtext = cmp_op[arg]
+            elif op in hasjrel:
+                argtext = 'to %d' % (stream.nexts[k] + arg)
+            elif op in hasjabs:
+                argtext = 'to %d' % arg
+            else:
+                argtext = str(arg)
+            text = '%d %s %s' % (offset, name, argtext)
+        lineno = linenos[bisect.bisect_right(addrs, offset) - 1]
+        if lines.has_key(lineno):
+            lines[lineno].append(text)
+        else:
+            lines[lineno] = [text]
+    return lines
+
+def disassembly(code):
+    # the instructions of a code object as text, by source line
+    lines = disassemble_lines(code)
+    linenos = lines.keys()
+    linenos.sort()
+    out = []
+    for lineno in linenos:
+        out.append('%5d %s' % (lineno,
+                               string.join(lines[lineno], '\n      ')))
+    return string.join(out, '\n')
+
+def describe_error(info=None):
+    # the current exception, or an exc_info tuple, as one line of text
+    if info is None:
+        info = sys.exc_info()
+    exc_type, exc_value = info[:2]
+    text = '%s: %s' % (getattr(exc_type, '__name__', exc_type), exc_value)
+    return string.join(string.split(text, '\n'), ' ')
+
+def fallback_lines(code, error, header=None):
+    # Lines standing in for a code object that could not be decompiled:
+    # a commented disassembly of each source line, with a pass statement
+    # and the error on the first.  Instructions on the line of the
+    # header of the definition, if any, are moved to the line after it,
+    # so the header keeps a body.
+    disassembly = disassemble_lines(code)
+    if header is not None and disassembly.has_key(header):
+        later = filter(lambda lineno, header=header: lineno > header,
+                       disassembly.keys())
+        if later:
+            first = min(later)
+            disassembly[first] = disassembly[header] + disassembly[first]
+            del disassembly[header]
+    lines = {}
+    for lineno, instructions in disassembly.items():
+        lines[lineno] = '# ' + string.join(instructions, '; ')
+    if lines:
+        first = min(lines.keys())
+    else:
+        first = code.co_firstlineno
+        lines[first] = '#'
+    lines[first] = 'pass  # could not decompile (%s): %s' % (
+        error, lines[first][2:])
+    return lines
+
+JUMPS = ('JUMP_FORWARD', 'JUMP_ABSOLUTE', 'CONTINUE_LOOP')
+EXITS = ('RETURN_VALUE', 'RAISE_VARARGS', 'BREAK_LOOP')
+SETUPS = ('SETUP_LOOP', 'SETUP_EXCEPT', 'SETUP_FINALLY')
+
+class ControlFlow:
+
+    # The control flow graph of a code object, found in one pass over
+    # its InstructionStream and one over its jumps, as from jump_targets
+    # unless they were found beforehand.
+    #
+    # targets maps the offset of each instruction with a jump operand
+    # (jumps, FOR_LOOP and the SETUP_ instructions) to the offset it
+    # jumps to, and sources maps each such target to the offsets of the
+    # instructions that jump there.
+    #
+    # The basic blocks are numbered in order.  Block b runs from offset
+    # starts[b] up to ends[b], and control can pass from it to the blocks
+    # in successors[b].  Block finds the block of an offset by bisection;
+    # blocks, which maps every byte offset to its block and the end of
+    # the code to len(starts), is only made if it is used.
+    #
+    # regions lists a (kind, setup, start, exit) tuple for each
+    # SETUP_LOOP, SETUP_EXCEPT and SETUP_FINALLY: its name, its offset,
+    # the offset of the first instruction it covers, and the offset it
+    # jumps to, which is where a loop's break goes, or a try statement's
+    # handler.  regionat maps the offset of the setup to its region.
+    # A BREAK_LOOP leads to the exit of the innermost loop.
+
+    def __init__(self, code, stream=None, jumps=None):
+        if stream is None:
+            stream = InstructionStream(code)
+        if jumps is None:
+            jumps = jump_targets(stream)
+        self.stream = stream
+        offsets = stream.offsets
+        nexts = stream.nexts
+        opnames = stream.opnames
+        index = stream.index
+        n = len(code.co_code)
+        targets = {}
+        sources = {}
+        leaders = {0: 1}
+        jumpoffsets, jumptargets = jumps
+        for j in range(len(jumpoffsets)):
+            offset = jumpoffsets[j]
+            target = jumptargets[j]
+            targets[offset] = target
+            if sources.has_key(target):
+                sources[target].append(offset)
+            else:
+                sources[target] = [offset]
+            leaders[target] = 1
+            leaders[nexts[index[offset]]] = 1
+        regions = []
+        regionat = {}
+        loops = []   # exits of the loops open at each instruction
+        blockstack = []
+        breaks = {}
+        for k in range(len(offsets)):
+            name = opnames[k]
+            offset = offsets[k]
+            if name in SETUPS:
+                target = targets[offset]
+                region = (name, offset, nexts[k], target)
+                regions.append(region)
+                regionat[offset] = region
+                blockstack.append(region)
+                if name == 'SETUP_LOOP':
+                    loops.append(target)
+            elif name == 'POP_BLOCK':
+                if blockstack:
+                    region = blockstack.pop()
+                    if region[0] == 'SETUP_LOOP':
+                        loops.pop()
+            elif name in EXITS:
+                leaders[nexts[k]] = 1
+                if name == 'BREAK_LOOP' and loops:
+                    breaks[offset] = loops[-1]
+        starts = filter(lambda offset, n=n: offset < n, leaders.keys())
+        starts.sort()
+        ends = starts[1:] + [n]
+        # every jump target starts a block
+        numbers = {n: len(starts)}
+        for b in range(len(starts)):
+            numbers[starts[b]] = b
+        successors = []
+        for b in range(len(starts)):
+            # the last instruction in the block decides where it goes
+            if ends[b] < n:
+                k = index[ends[b]] - 1
+            else:
+                k = len(offsets) - 1
+            name = opnames[k]
+            offset = offsets[k]
+            following = []
+            if name == 'BREAK_LOOP':
+                if breaks.has_key(offset):
+                    following.append(numbers[breaks[offset]])
+            elif name not in EXITS:
+                if targets.has_key(offset):
+                    following.append(numbers[targets[offset]])
+                if name not in JUMPS and ends[b] < n and \
+                   b + 1 not in following:
+                    following.append(b + 1)
+            successors.append(following)
+        self.targets = targets
+        self.sources = sources
+        self.starts = array.array('i', starts)
+        self.ends = array.array('i', ends)
+        self.size = n
+        self.successors = successors
+        self.regions = regions
+        self.regionat = regionat
+
+    def IsTarget(self, offset):
+        return self.sources.has_key(offset)
+
+    def __getattr__(self, name):
+        if name != 'blocks':
+            raise AttributeError, name
+        blocks = array.array('i', [0]) * (self.size + 1)
+        for b in range(len(self.starts)):
+            start = self.starts[b]
+            end = self.ends[b]
+            blocks[start:end] = array.array('i', [b]) * (end - start)
+        blocks[self.size] = len(self.starts)
+        self.blocks = blocks
+        return blocks
+
+    def Block(self, offset):
+        # the number of the basic block containing offset
+        assert 0 <= offset <= self.size, `offset`
+        if offset == self.size:
+            return len(self.starts)
+        return bisect.bisect_right(self.starts, offset) - 1
+
+    def Region(self, offset):
+        # the (kind, setup, start, exit) of the SETUP_ instruction at offset
+        return self.regionat[offset]
+
+class DecodedCodeCursor(CodeCursor):
+
+    # A CodeCursor reading from an InstructionStream instead of co_code,
+    # so that peeking at or reading an instruction costs a lookup rather
+    # than a decode.  Positions are still byte offsets.  Decoding the
+    # stream costs more than the lookups save, so this only pays when the
+    # stream was decoded beforehand, as by a Prescan; decompile_file uses
+    # a plain CodeCursor.
+
+    def __init__(self, code, stream=None, lines=None):
+        CodeCursor.__init__(self, code, lines)
+        if stream is None:
+            stream = InstructionStream(code)
+        self.stream = stream
+        self.k = 0   # index of the instruction at or before self.i
+
+    def Flow(self):
+        if self.flow is None:
+            self.flow = ControlFlow(self.code, self.stream)
+        return self.flow
+
+    def NextOpcode(self):
+        if self.i < self.stopi[-1]:
+            self.k = k = self.stream.index[self.i]
+            assert k >= 0, `self.i`
+            # skip any EXTENDED_ARG prefix
+            self.i = self.stream.offsets[k]
+            return self.stream.opnames[k]
+        else:
+            return None
+
+    def NextOp(self):
+        if self.i < self.stopi[-1]:
+            self.k = k = self.stream.index[self.i]
+            assert k >= 0, `self.i`
+            self.i = self.stream.offsets[k]
+            return self.stream.opcodes[k]
+        else:
+            return None
+
+    def ReadOperand(self):
+        # self.k was set when ReadOpcode peeked at the instruction
+        assert self.lastop + 1 == self.i, `self.i, self.lastop`
+        k = self.k
+        self.i = self.stream.nexts[k]
+        return self.stream.operands[k]
+
+def dispatch_table(klass):
+    # Return the table, indexed by opcode number, of the functions that
+    # handle each opcode for a Decompiler class.  The table is built the
+    # first time it is asked for and kept in the class's own __dict__, so
+    # subclasses that add or override handlers get a table of their own.
+    # A class with a wrap_handler(opname, function) static method has its
+    # handlers wrapped, so that the loop over the table is the same.
+    table = klass.__dict__.get('_dispatch')
+    if table is None:
+        wrap = getattr(klass, 'wrap_handler', None)
+        table = []
+        for opcode in opname:
+            method = getattr(klass, string.replace(opcode, '+', '_'), None)
+            function = getattr(method, 'im_func', method)
+            if function is not None and wrap is not None:
+                function = wrap(opcode, function)
+            table.append(function)
+        klass._dispatch = table
+    return table
+
+def makedirs(dirname):
+    # os.makedirs, when another process may be creating the same directory
+    if dirname and not os.path.isdir(dirname):
+        try:
+            os.makedirs(dirname)
+        except OSError:
+            if not os.path.isdir(dirname):
+                raise
+
+def relative_code(code, base):
+    # co_code with the operands of any SET_LINENO instructions taken
+    # relative to line base, so that code which has only moved compares
+    # equal.
+    set_lineno = opmap.get('SET_LINENO')
+    if set_lineno is None or chr(set_lineno) not in code.co_code:
+        return code.co_code
+    stream = InstructionStream(code)
+    co_code = array.array('B', code.co_code)
+    for k in range(len(stream.offsets)):
+        if stream.opcodes[k] == set_lineno:
+            i = stream.offsets[k]
+            lineno = (stream.operands[k] - base) & 0xffff
+            co_code[i+1] = lineno & 0xff
+            co_code[i+2] = lineno >> 8
+    return co_code.tostring()
+
+def code_key(code, base):
+    # The parts of a code object that affect its decompiled lines, for
+    # code_digest.  Nested code objects also contribute the attributes
+    # used in the definitions made from them, and their line numbers
+    # relative to base.  They are lists, which can't be constants.
+    consts = []
+    for const in code.co_consts:
+        if type(const) is types.CodeType:
+            consts.append([const.co_name, const.co_argcount, const.co_flags,
+                           const.co_firstlineno - base,
+                           code_key(const, base)])
+        else:
+            consts.append(const)
+    return (relative_code(code, base), tuple(consts), code.co_names,
+            code.co_varnames, code.co_lnotab)
+
+def code_digest(code, version):
+    # A hex digest identifying the decompiled lines of a code object for
+    # a version.  Line numbers are taken relative to co_firstlineno, so
+    # the same code at a different place in a file has the same digest.
+    import hashlib, marshal
+    key = code_key(code, code.co_firstlineno)
+    return hashlib.sha1(marshal.dumps((tuple(version), key))).hexdigest()
+
+class DecompileCache:
+
+    # An on-disk cache of decompiled code objects, keyed by code_digest,
+    # which may be shared by several processes.  Each entry is a marshal
+    # file, written to a temporary name and renamed into place, so a
+    # reader sees either the whole entry or no entry.  Reading an entry
+    # updates its modification time, and when the entries written since
+    # the last check add up to a sixteenth of maxsize, the least recently
+    # used entries are removed until the cache is under three quarters
+    # of maxsize.  A lock file stops two processes evicting at once.
+
+    def __init__(self, directory, maxsize=256*1024*1024):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.written = 0
+        makedirs(directory)
+
+    def filename(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        import marshal
+        filename = self.filename(key)
+        try:
+            f = open(filename, 'rb')
+        except IOError:
+            return None
+        try:
+            try:
+                value = marshal.load(f)
+            except (EOFError, ValueError, TypeError):
+                value = None
+        finally:
+            f.close()
+        if value is not None:
+            try:
+                os.utime(filename, None)
+            except OSError:
+                # evicted while we were reading it
+                pass
+        return value
+
+    def put(self, key, value):
+        import marshal, tempfile
+        data = marshal.dumps(value)
+        filename = self.filename(key)
+        dirname = os.path.dirname(filename)
+        makedirs(dirname)
+        fd, tmpname = tempfile.mkstemp('', '.tmp', dirname)
+        try:
+            f = os.fdopen(fd, 'wb')
+            try:
+                f.write(data)
+            finally:
+                f.close()
+            os.rename(tmpname, filename)
+        except (IOError, OSError):
+            # another process got there first, or evicted our temporary
+            # file, or the disk is full: the entry is just not cached
+            try:
+                os.remove(tmpname)
+            except OSError:
+                pass
+            return
+        self.written = self.written + len(data)
+        if self.written * 16 > self.maxsize:
+            self.evict()
+
+    def evict(self):
+        import time
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        lock = open(os.path.join(self.directory, 'lock'), 'a')
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except IOError:
+                    # another process is evicting
+                    return
+            self.written = 0
+            now = time.time()
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                dirname = os.path.join(self.directory, name)
+                if not os.path.isdir(dirname):
+                    continue
+                for name in os.listdir(dirname):
+                    filename = os.path.join(dirname, name)
+                    try:
+                        st = os.stat(filename)
+                    except OSError:
+                        continue
+                    if name[:1] == '.' and st.st_mtime > now - 3600:
+                        # a temporary file that may still be being written
+                        continue
+                    entries.append((st.st_mtime, st.st_size, filename))
+                    total = total + st.st_size
+            if total <= self.maxsize:
+                return
+            entries.sort()
+            for mtime, size, filename in entries:
+                if total * 4 <= self.maxsize * 3:
+                    break
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+                total = total - size
+        finally:
+            lock.close()
+
+class DecompileMemo:
+
+    # An in-memory memo of decompiled code objects for one run, so that
+    # identical function, class and lambda bodies are decompiled once.
+    # Values are found by code_digest, which is itself remembered for
+    # each code object seen, so a code object met again (when its
+    # enclosing block is decompiled again) is not hashed again.  When
+    # there are more than maxsize values, the least recently used
+    # quarter is dropped.
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.values = {}
+        self.digests = {}
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def digest(self, code, version):
+        # the entry holds a reference to code, so its id isn't reused
+        entry = self.digests.get(id(code))
+        if entry is not None and entry[0] is code and entry[1] == version:
+            return entry[2]
+        if len(self.digests) >= self.maxsize:
+            self.digests.clear()
+        digest = code_digest(code, version)
+        self.digests[id(code)] = code, version, digest
+        return digest
+
+    def get(self, key):
+        entry = self.values.get(key)
+        if entry is None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        self.clock = self.clock + 1
+        entry[0] = self.clock
+        return entry[1]
+
+    def put(self, key, value):
+        self.clock = self.clock + 1
+        self.values[key] = [self.clock, value]
+        if len(self.values) > self.maxsize:
+            entries = map(lambda item: (item[1][0], item[0]),
+                          self.values.items())
+            entries.sort()
+            for used, key in entries[:len(entries) / 4 + 1]:
+                del self.values[key]
+
+class Return(Exception):
+
+    # Raised by a helper generator of a handler, such as build_target,
+    # to end it with a result.  The engine resumes the generator that
+    # yielded the helper with the result.
+
+    def __init__(self, value):
+        self.value = value
+
+class Frame(object):
+
+    # A block being decompiled by the engine: a Decompiler, the cursor
+    # it reads, the opcode numbers it stops at (None to stop when its
+    # generators are done), and the generators of the handler it is
+    # running, innermost last.  onerror, if not None, is called with
+    # the exc_info of a failure, and returns a Decompiler to use instead.
+    # key and count are for storing a whole code object in the memo or
+    # cache.
+
+    __slots__ = ('decompiler', 'code', 'stops', 'onerror', 'generators',
+                 'dispatch', 'key', 'count')
+
+    def __init__(self, decompiler, code, stops, onerror):
+        self.decompiler = decompiler
+        self.code = code
+        self.stops = stops
+        self.onerror = onerror
+        self.generators = []
+        self.dispatch = dispatch_table(decompiler.__class__)
+        self.key = None
+        self.count = 0
+
+def run_engine(frames):
+    # The decompilation engine, which runs the Frames on an explicit
+    # stack rather than by recursion, so that the depth of nesting is
+    # only limited by memory.  Handlers of simple opcodes return None.
+    # A handler that needs a nested block decompiled is a generator,
+    # which yields a request made by Decompiler.block or code_request,
+    # and is resumed with the Decompiler holding the result when the
+    # block is done.  It may also yield a helper generator, and is
+    # resumed with the value of the Return that ends it.  An exception
+    # is thrown into the generator waiting for the block that raised it.
+    value = error = None
+    while frames:
+        frame = frames[-1]
+        generators = frame.generators
+        if generators:
+            generator = generators[-1]
+            try:
+                if error is None:
+                    request = generator.send(value)
+                else:
+                    info = error
+                    error = None
+                    request = generator.throw(info[0], info[1], info[2])
+            except StopIteration:
+                del generators[-1]
+                value = None
+                if not generators and frame.stops is None:
+                    del frames[-1]
+                continue
+            except Return, result:
+                del generators[-1]
+                value = result.value
+                continue
+            except:
+                del generators[-1]
+                error = sys.exc_info()
+                if generators:
+                    continue
+            else:
+                value = None
+                if type(request) is types.GeneratorType:
+                    generators.append(request)
+                else:
+                    d, code, termop, onerror = request
+                    child = d.begin(code, termop, onerror)
+                    if child is None:
+                        value = d
+                    else:
+                        frames.append(child)
+                continue
+        else:
+            d = frame.decompiler
+            code = frame.code
+            stops = frame.stops
+            dispatch = frame.dispatch
+            try:
+                if d.chained:
+                    # the block ended at an elif, whose else clause is
+                    # left to the enclosing if statement
+                    op = None
+                else:
+                    op = code.NextOp()
+                while op is not None and op not in stops:
+                    handler = dispatch[op]
+                    if handler is None:
+                        # raises AttributeError naming the opcode
+                        getattr(d, string.replace(opname[op], '+', '_'))
+                    generator = handler(d, code)
+                    if generator is not None:
+                        generators.append(generator)
+                        break
+                    op = code.NextOp()
+                else:
+                    del frames[-1]
+                    d.finish(frame)
+                    value = d
+                    continue
+                value = None
+                continue
+            except:
+                error = sys.exc_info()
+        # the frame failed, with error
+        del frames[-1]
+        d = frame.decompiler
+        if d.faults is None:
+            print disassembly(frame.code.code)
+            print
+        if frame.onerror is not None and \
+           not issubclass(error[0], (KeyboardInterrupt, SystemExit,
+                                     MemoryError)):
+            value = frame.onerror(error)
+            error = None
+    if error is not None:
+        raise error[0], error[1], error[2]
+
+def render_lines(records, root, indent=0, sourcemap=None):
+    # Turn the records of a line store into a dictionary mapping line
+    # numbers to lines.  The statements on a line are joined in the order
+    # they were added, and the line is indented by the depth of the level
+    # of its first statement below the level root, plus indent.  The
+    # spans of the records noted in a SourceMap are placed in the lines.
+    depths = {id(root): indent}
+    lines = {}
+    for lineno, level, text in records:
+        line = lines.get(lineno)
+        if line is not None:
+            line.append(text)
+            continue
+        depth = depths.get(id(level))
+        if depth is None:
+            # find the nearest enclosing level of known depth
+            levels = []
+            while depth is None:
+                levels.append(level)
+                level = level[0]
+                depth = depths.get(id(level))
+            while levels:
+                level = levels.pop()
+                depth = depth + level[1]
+                depths[id(level)] = depth
+        lines[lineno] = [depth, text]
+    if sourcemap is not None:
+        sourcemap.place(records, lines)
+    for lineno, line in lines.items():
+        lines[lineno] = '    ' * line[0] + string.join(line[1:], '; ')
+    return lines
+
+class SourceMap:
+
+    # The source map of a module: for each code object, the ranges of
+    # byte offsets of its instructions that each statement was decompiled
+    # from, and the line and columns of the statement in the output, so
+    # that an offset such as f_lasti can be looked up without decompiling
+    # again.  A Decompiler with a SourceMap notes the offsets of each
+    # record as it adds it, by how far from the end of the text the
+    # statement starts, since headers and 'el' are only ever put in
+    # front; the columns are known when the lines are rendered.  Code
+    # objects found in a memo or cache aren't mapped.
+    #
+    # The map is saved as JSON, with a table of sorted parallel arrays
+    # for each code object:
+    #
+    #     {"codes": [{"name": "f", "firstlineno": 3,
+    #                 "offsets": [0, 12], "ends": [12, 20],
+    #                 "lines": [4, 5], "columns": [4, 4],
+    #                 "colends": [13, 15]}, ...]}
+
+    def __init__(self):
+        self.spans = {}    # id(record) -> (record, spans noted for it)
+        self.items = {}    # id(code) -> (code, [start, end, line, column,
+                           #                     end column] items)
+        self.recent = {}   # line -> the items placed by the last render
+        self.tables = []
+        self.index = {}    # (name, firstlineno) -> tables
+
+    def note(self, record, code, start, end, fromend, width):
+        # the statement of width characters, starting fromend characters
+        # from the end of a record's text, was decompiled from the
+        # instructions of code from offset start up to end
+        spans = self.spans.get(id(record))
+        if spans is None:
+            spans = self.spans[id(record)] = (record, [])
+        spans[1].append((code, start, end, fromend, width))
+
+    def place(self, records, lines):
+        # Turn the spans noted for records into items, given the lines
+        # they are rendered on, as [depth, text, ...] lists.
+        self.recent = {}
+        columns = {}
+        for record in records:
+            lineno, level, text = record
+            column = columns.get(lineno)
+            if column is None:
+                column = 4 * lines[lineno][0]
+            columns[lineno] = column + len(text) + 2
+            spans = self.spans.get(id(record))
+            if spans is None:
+                continue
+            del self.spans[id(record)]
+            for code, start, end, fromend, width in spans[1]:
+                entry = self.items.get(id(code))
+                if entry is None:
+                    entry = self.items[id(code)] = (code, [])
+                left = column + len(text) - fromend
+                item = [start, end, lineno, left, left + width]
+                entry[1].append(item)
+                self.recent.setdefault(lineno, []).append(item)
+
+    def move(self, lineno, actual):
+        # the last lines rendered on line lineno were written on line
+        # actual instead
+        for item in self.recent.get(lineno, []):
+            item[2] = actual
+
+    def clear(self):
+        self.__init__()
+
+    def finish(self):
+        # Turn the items placed so far into tables.  A nested code object
+        # with no statements of its own, such as a lambda, is mapped as a
+        # whole to the statement that loads it.
+        tables = []
+        for code, items in self.items.values():
+            items.sort()
+            table = self.table(code, items)
+            self.add(table)
+            tables.append((code, table))
+        for code, table in tables:
+            self.enclose(code, table)
+        self.items = {}
+        self.recent = {}
+
+    def table(self, code, items):
+        return {
+            'name': code.co_name,
+            'firstlineno': code.co_firstlineno,
+            'offsets': map(lambda item: item[0], items),
+            'ends': map(lambda item: item[1], items),
+            'lines': map(lambda item: item[2], items),
+            'columns': map(lambda item: item[3], items),
+            'colends': map(lambda item: item[4], items),
+            }
+
+    def enclose(self, code, table):
+        # add tables for the unmapped code objects loaded by code, whose
+        # table is given
+        stream = None
+        load_const = opmap['LOAD_CONST']
+        for n in range(len(code.co_consts)):
+            const = code.co_consts[n]
+            if type(const) is not types.CodeType or \
+               self.items.has_key(id(const)):
+                continue
+            if stream is None:
+                stream = InstructionStream(code)
+            for k in range(len(stream.offsets)):
+                if stream.opcodes[k] == load_const and \
+                   stream.operands[k] == n:
+                    found = table_lookup(table, stream.offsets[k])
+                    if found is not None:
+                        line, column, colend = found
+                        inner = self.table(const, [[0, len(const.co_code),
+                                                    line, column, colend]])
+                        self.add(inner)
+                        self.enclose(const, inner)
+                    break
+
+    def add(self, table):
+        self.tables.append(table)
+        key = table['name'], table['firstlineno']
+        self.index.setdefault(key, []).append(table)
+
+    def lookup(self, name, firstlineno, offset):
+        # Return (line, column, end column) of the statement decompiled
+        # from the instruction at offset in the code object with a name
+        # and first line, or None.  Two code objects can only share both
+        # if they are lambdas on one line, which are each tried.
+        if self.items:
+            self.finish()
+        for table in self.index.get((name, firstlineno), []):
+            found = table_lookup(table, offset)
+            if found is not None:
+                return found
+        return None
+
+    def dump(self, file):
+        import json
+        if self.items:
+            self.finish()
+        tables = self.tables[:]
+        tables.sort(lambda a, b: cmp((a['firstlineno'], a['name']),
+                                     (b['firstlineno'], b['name'])))
+        json.dump({'codes': tables}, file, sort_keys=True)
+        file.write('\n')
+
+def table_lookup(table, offset):
+    # (line, column, end column) for an offset in a SourceMap table
+    k = bisect.bisect_right(table['offsets'], offset) - 1
+    if k >= 0 and offset < table['ends'][k]:
+        return table['lines'][k], table['columns'][k], table['colends'][k]
+    return None
+
+def load_sourcemap(file):
+    # a SourceMap read from a file written by SourceMap.dump
+    import json
+    sourcemap = SourceMap()
+    for table in json.load(file)['codes']:
+        table['name'] = str(table['name'])
+        sourcemap.add(table)
+    return sourcemap
+
 class Decompiler:
 
-    def __init__(self, version):
+    # The lines of a code object are kept in one store, a list of
+    # [lineno, level, text] records shared by the Decompilers of its
+    # blocks, each of which adds its statements once.  The level of a
+    # block is a list holding the level of the block enclosing it and
+    # how much deeper it is, so the depth of each line is only counted
+    # when the source is taken, and a block with all the blocks in it
+    # can be moved to another depth in one step.  top is the record of
+    # the first statement on the lowest line a Decompiler has added,
+    # directly or through its clauses, and last the highest line.  A
+    # nested code object has a store of its own, which is added to the
+    # enclosing store with its definition.
+
+    def __init__(self, version, cache=None, memo=None, faults=None):
         self.version = version
+        self.cache = cache  # DecompileCache of whole code objects
+        self.memo = memo    # DecompileMemo of whole code objects
+        # With a list of faults, a nested code object that can't be
+        # decompiled is replaced by fallback_lines, and a dictionary
+        # describing the failure is appended to the list.  A failure in
+        # a block replaces the whole code object the block is in, since
+        # the stack and cursor of the block's enclosing statement can't
+        # be trusted after it.
+        self.faults = faults
         self.stack = []
-        self.lines = {}
+        self.records = []
+        self.level = [None, 0]
+        self.top = None
+        self.last = 0
         self.global_decl = {}
         self.loop = None
+        # With a SourceMap, each statement added is noted in it with the
+        # instructions from mark, where the statements of the block
+        # started or the last one ended, and start is where the block
+        # started.
+        self.sourcemap = None
+        self.start = self.mark = None
+        # for the else clause of an if or elif: its line and end, and
+        # whether it is an elif, ending after the elif's if clause and
+        # leaving its own else clause to the enclosing if statement
+        self.chain = None
+        self.chained = 0
+        # the Constant node of each constant loaded, by its constant_key,
+        # and the Local or Global node of each name, by its class
+        # and name, shared with the subdecompilers
+        self.constants = {}
+        self.names = {}
+
+    def subdecompiler(self):
+        # a Decompiler for a nested block, sharing our settings, constants
+        # and line store
+        d = self.__class__(self.version, self.cache, self.memo, self.faults)
+        d.constants = self.constants
+        d.names = self.names
+        d.records = self.records
+        d.level = [self.level, 1]
+        d.sourcemap = self.sourcemap
+        return d
+
+    def constant(self, value):
+        # the shared Constant node for a value from a constant table
+        if value is None:
+            return CONSTANT_NONE
+        key = constant_key(value)
+        node = self.constants.get(key)
+        if node is None:
+            node = Constant(value)
+            if type(value) is types.TupleType:
+                node.items = map(self.constant, value)
+            self.constants[key] = node
+        return node
+
+    def name(self, klass, name):
+        # the shared node of a kind of Name, Local or Global, for a name
+        node = self.names.get((klass, name))
+        if node is None:
+            node = klass(name)
+            self.names[(klass, name)] = node
+        return node
+
+    def faultcount(self):
+        if self.faults is None:
+            return 0
+        return len(self.faults)
+
+    def lookup(self, co, suffix=''):
+        # Return the key for a code object, and its value from the memo
+        # or cache, or None.
+        if self.memo is not None:
+            key = self.memo.digest(co, self.version) + suffix
+            value = self.memo.get(key)
+            if value is not None:
+                return key, value
+        else:
+            key = code_digest(co, self.version) + suffix
+        value = None
+        if self.cache is not None:
+            value = self.cache.get(key)
+            if value is not None and self.memo is not None:
+                self.memo.put(key, value)
+        return key, value
+
+    def store(self, key, value):
+        if self.memo is not None:
+            self.memo.put(key, value)
+        if self.cache is not None:
+            self.cache.put(key, value)
+
+    def code_request(self, code, co, header):
+        # Return a request for the engine to decompile the nested code
+        # object co, whose definition starts on line header.  When
+        # isolating faults, a failure gives a Decompiler holding its
+        # fallback lines instead, and any faults inside co are dropped
+        # with it.
+        d = self.subdecompiler()
+        d.records = []
+        cursor = code.NestedCursor(co)
+        if self.faults is None:
+            return d, cursor, (), None
+        count = len(self.faults)
+        def fallback(error, self=self, co=co, cursor=cursor, header=header,
+                     count=count):
+            error = describe_error(error)
+            del self.faults[count:]
+            self.faults.append({
+                'name': co.co_name,
+                'line': co.co_firstlineno,
+                'offset': cursor.GetPosition(),
+                'size': len(co.co_code),
+                'error': error,
+                })
+            d = self.subdecompiler()
+            d.code = cursor
+            d.setlines(fallback_lines(co, error, header))
+            return d
+        return d, cursor, (), fallback
+
+    def block(self, code, *termop):
+        # Return a request for the engine to have this Decompiler
+        # decompile code until one of the termop opcodes, or the end.
+        return self, code, termop, None
 
     def decompile(self, code, *termop):
-        try:
-            self.code = code
-            opcode = code.NextOpcode()
-            while opcode is not None and opcode not in termop:
-                opcode = string.replace(opcode, '+', '_')
-                method = getattr(self, opcode)
-                apply(method, (code,))
-                opcode = code.NextOpcode()
-        except:
-            dis.dis(code.code)
-            print
-            raise
+        frame = self.begin(code, termop, None)
+        if frame is not None:
+            run_engine([frame])
+
+    def begin(self, code, termop, onerror):
+        # Start decompiling code, returning the engine's Frame for it, or
+        # None if there's nothing to do: the request was made with no
+        # cursor, or was for a whole code object found in the memo or
+        # cache.
+        if code is None:
+            return None
+        self.code = code
+        frame = Frame(self, code, map(opmap.get, termop), onerror)
+        if (self.cache is not None or self.memo is not None) and \
+           not termop and code.GetPosition() == 0 and not self.records:
+            # a whole code object
+            key, lines = self.lookup(code.code)
+            base = code.code.co_firstlineno
+            if lines is not None:
+                for lineno, line in lines.items():
+                    self.addline(base + lineno, line)
+                code.SetPosition(code.stopi[-1])
+                return None
+            frame.key = key
+            frame.count = self.faultcount()
+        self.start = self.mark = code.GetPosition()
+        return frame
+
+    def finish(self, frame):
+        # lines with fallbacks aren't stored, so that a later run
+        # records the faults again
+        if frame.key is not None and self.records and not self.stack and \
+           self.faultcount() == frame.count:
+            base = frame.code.code.co_firstlineno
+            lines = {}
+            for lineno, line in render_lines(self.records,
+                                             self.level).items():
+                lines[lineno - base] = line
+            self.store(frame.key, lines)
+
+    def complete(self, code, generator):
+        # Run a handler that returned a generator, and the blocks it asks
+        # for, to the end.
+        frame = Frame(self, code, None, None)
+        frame.generators.append(generator)
+        run_engine([frame])
+
+    def iterdecompile(self, code):
+        # Decompile a whole code object, generating (lineno, line) pairs
+        # in line order.  A line is generated as soon as a top-level
+        # statement on a later line is finished, so only the statement
+        # being decompiled is held in the line store.
+        self.code = code
+        remember = self.cache is not None or self.memo is not None
+        if remember:
+            # the lines are collected to be stored as well
+            key, lines = self.lookup(code.code)
+            base = code.code.co_firstlineno
+            if lines is not None:
+                keys = lines.keys()
+                keys.sort()
+                for lineno in keys:
+                    yield base + lineno, lines[lineno]
+                code.SetPosition(code.stopi[-1])
+                return
+            lines = {}
+            count = self.faultcount()
+        self.start = self.mark = code.GetPosition()
+        dispatch = dispatch_table(self.__class__)
+        emitted = 0
+        op = code.NextOp()
+        while op is not None:
+            handler = dispatch[op]
+            if handler is None:
+                getattr(self, string.replace(opname[op], '+', '_'))
+            generator = handler(self, code)
+            if generator is not None:
+                self.complete(code, generator)
+            if not self.stack and self.top is not None and \
+               self.top[0] < self.last:
+                # the last line may still get more statements
+                for lineno, line in self.flushlines(self.last):
+                    emitted = emitted + 1
+                    if remember:
+                        lines[lineno - base] = line
+                    yield lineno, line
+            op = code.NextOp()
+        if not emitted and not self.records:
+            self.addline(code.GetLine(), 'pass')
+        for lineno, line in self.flushlines(None):
+            if remember:
+                lines[lineno - base] = line
+            yield lineno, line
+        if remember and self.faultcount() == count:
+            self.store(key, lines)
+
+    def flushlines(self, limit):
+        # Remove and return, in order, the lines before line limit, or all
+        # lines if limit is None.
+        records = self.records
+        if limit is None:
+            keep = []
+        else:
+            keep = filter(lambda record, limit=limit: record[0] >= limit,
+                          records)
+            records = filter(lambda record, limit=limit: record[0] < limit,
+                             records)
+        lines = render_lines(records, self.level, 0, self.sourcemap)
+        self.records[:] = keep
+        self.top = None
+        for record in keep:
+            if self.top is None or record[0] < self.top[0]:
+                self.top = record
+        items = lines.items()
+        items.sort()
+        return items
 
     def getstack(self):
         return self.stack
 
     def getsource(self, indent):
+        # Return the lines of the code, as a dictionary mapping line
+        # numbers to lines indented by indent levels.
         assert not self.stack, `self.stack`
-        lines = {}
-        if not self.lines:
-            self.lines[self.code.GetLine()] = 'pass'
-        for key, value in self.lines.items():
-            lines[key] = '    ' * indent + value
-        return lines
-
-    def addline(self, lineno, line):
+        if self.top is None:
+            self.addline(self.code.GetLine(), 'pass')
+        return render_lines(self.records, self.level, indent, self.sourcemap)
+
+    def addline(self, lineno, line, end=None):
+        # Add a statement.  The statements on a line are joined once, when
+        # the source is taken, so that many statements on one line don't
+        # make it quadratic.  For the source map, the statement was
+        # decompiled from the instructions up to end, by default the
+        # current position.
         assert type(line) == type(''), `line`
-        prev = self.lines.get(lineno)
-        if prev is None:
-            self.lines[lineno] = line
-        else:
-            self.lines[lineno] = '%s; %s' % (prev, line)
+        record = [lineno, self.level, line]
+        self.records.append(record)
+        if self.top is None or lineno < self.top[0]:
+            self.top = record
+        if lineno > self.last:
+            self.last = lineno
+        if self.sourcemap is not None:
+            self.note(record, len(line), len(line), end)
+
+    def note(self, record, fromend, width, end):
+        # note the instructions from mark up to end in the source map, as
+        # the statement fromend characters from the end of a record
+        if self.mark is None:
+            # fallback lines, or a body that was not decompiled
+            return
+        if end is None:
+            end = self.code.GetPosition()
+        if end > self.mark:
+            self.sourcemap.note(record, self.code.code, self.mark, end,
+                                fromend, width)
+            self.mark = end
+
+    def setlines(self, lines):
+        # add a dictionary of whole lines, such as fallback_lines
+        for lineno, line in lines.items():
+            self.addline(lineno, line)
 
     def addclause(self, lineno, head, body):
-        if body.has_key(lineno):
-            if 0:
-                assert len(body) == 1, `body`
-                self.addline(lineno, "%s %s" % (head, string.strip(body[lineno])))
-            else:
-                line = body[lineno]
-                self.addline(lineno, "%s %s" % (head, string.strip(line)))
-                del body[lineno]
-                self.lines.update(body)
-                body[lineno] = line
+        # Add a clause whose header is on line lineno, and whose body was
+        # decompiled by the Decompiler body.  A body starting on the line
+        # of the header follows it there.
+        if body.top is None:
+            body.addline(body.code.GetLine(), 'pass')
+        # the header was decompiled from the instructions before the
+        # body, or before this position for a nested code object
+        end = None
+        if body.records is not self.records:
+            # a nested code object
+            self.records.extend(body.records)
+        elif self.sourcemap is not None:
+            end = body.start
+        top = body.top
+        if top[0] == lineno:
+            top[1] = self.level
+            top[2] = '%s %s' % (head, top[2])
+            if self.sourcemap is not None:
+                self.note(top, len(top[2]), len(head), end)
         else:
-            self.addline(lineno, head)
-            self.lines.update(body)
-        self.code.SetLine(max(body.keys()) + 1)
+            self.addline(lineno, head, end)
+        self.merge(body)
+        self.code.SetLine(body.last + 1)
+
+    def merge(self, body):
+        # note the lines of a nested block, which are already in the store
+        if self.top is None or body.top[0] < self.top[0]:
+            self.top = body.top
+        if body.last > self.last:
+            self.last = body.last
+        if self.sourcemap is not None and self.mark is not None:
+            # the instructions of the block are its own
+            self.mark = self.code.GetPosition()
 
     def SET_LINENO(self, code):
         code.ReadOpcode('SET_LINENO')
@@ -295,43 +1864,43 @@ class Decompiler:
         code.ReadOpcode('BINARY_ADD')
         y = self.stack.pop().GetString(PRECEDENCE_ADD+1)
         x = self.stack.pop().GetString(PRECEDENCE_ADD)
-        self.stack.append(Expression('%s + %s' % (x, y), PRECEDENCE_ADD))
+        self.stack.append(Expression('%s + %s', PRECEDENCE_ADD, x, y))
 
     def BINARY_AND(self, code):
         code.ReadOpcode('BINARY_AND')
         y = self.stack.pop().GetString(PRECEDENCE_BAND+1)
         x = self.stack.pop().GetString(PRECEDENCE_BAND)
-        self.stack.append(Expression('%s & %s' % (x, y), PRECEDENCE_BAND))
+        self.stack.append(Expression('%s & %s', PRECEDENCE_BAND, x, y))
 
     def BINARY_DIVIDE(self, code):
         code.ReadOpcode('BINARY_DIVIDE')
         y = self.stack.pop().GetString(PRECEDENCE_MULT+1)
         x = self.stack.pop().GetString(PRECEDENCE_MULT)
-        self.stack.append(Expression('%s / %s' % (x, y), PRECEDENCE_MULT))
+        self.stack.append(Expression('%s / %s', PRECEDENCE_MULT, x, y))
 
     def BINARY_LSHIFT(self, code):
         code.ReadOpcode('BINARY_LSHIFT')
         y = self.stack.pop().GetString(PRECEDENCE_SHIFT+1)
         x = self.stack.pop().GetString(PRECEDENCE_SHIFT)
-        self.stack.append(Expression('%s << %s' % (x, y), PRECEDENCE_SHIFT))
+        self.stack.append(Expression('%s << %s', PRECEDENCE_SHIFT, x, y))
 
     def BINARY_MODULO(self, code):
         code.ReadOpcode('BINARY_MODULO')
         y = self.stack.pop().GetString(PRECEDENCE_MULT+1)
         x = self.stack.pop().GetString(PRECEDENCE_MULT)
-        self.stack.append(Expression('%s %% %s' % (x, y), PRECEDENCE_MULT))
+        self.stack.append(Expression('%s %% %s', PRECEDENCE_MULT, x, y))
 
     def BINARY_MULTIPLY(self, code):
         code.ReadOpcode('BINARY_MULTIPLY')
         y = self.stack.pop().GetString(PRECEDENCE_MULT+1)
         x = self.stack.pop().GetString(PRECEDENCE_MULT)
-        self.stack.append(Expression('%s * %s' % (x, y), PRECEDENCE_MULT))
+        self.stack.append(Expression('%s * %s', PRECEDENCE_MULT, x, y))
 
     def BINARY_OR(self, code):
         code.ReadOpcode('BINARY_OR')
         y = self.stack.pop().GetString(PRECEDENCE_BOR+1)
         x = self.stack.pop().GetString(PRECEDENCE_BOR)
-        self.stack.append(Expression('%s | %s' % (x, y), PRECEDENCE_BOR))
+        self.stack.append(Expression('%s | %s', PRECEDENCE_BOR, x, y))
 
     def BINARY_POWER(self, code):
         code.ReadOpcode('BINARY_POWER')
@@ -343,31 +1912,31 @@ class Decompiler:
         else:
             y = y.GetString(PRECEDENCE_UNARY)
         x = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('%s ** %s' % (x, y), PRECEDENCE_POWER))
+        self.stack.append(Expression('%s ** %s', PRECEDENCE_POWER, x, y))
 
     def BINARY_RSHIFT(self, code):
         code.ReadOpcode()
         y = self.stack.pop().GetString(PRECEDENCE_SHIFT+1)
         x = self.stack.pop().GetString(PRECEDENCE_SHIFT)
-        self.stack.append(Expression('%s >> %s' % (x, y), PRECEDENCE_SHIFT))
+        self.stack.append(Expression('%s >> %s', PRECEDENCE_SHIFT, x, y))
 
     def BINARY_SUBSCR(self, code):
         code.ReadOpcode()
         y = self.stack.pop().GetString(PRECEDENCE_NONE)
         x = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('%s[%s]' % (x, y), PRECEDENCE_ATOM))
+        self.stack.append(Expression('%s[%s]', PRECEDENCE_ATOM, x, y))
 
     def BINARY_SUBTRACT(self, code):
         code.ReadOpcode()
         y = self.stack.pop().GetString(PRECEDENCE_ADD+1)
         x = self.stack.pop().GetString(PRECEDENCE_ADD)
-        self.stack.append(Expression('%s - %s' % (x, y), PRECEDENCE_ADD))
+        self.stack.append(Expression('%s - %s', PRECEDENCE_ADD, x, y))
 
     def BINARY_XOR(self, code):
         code.ReadOpcode()
         y = self.stack.pop().GetString(PRECEDENCE_BXOR+1)
         x = self.stack.pop().GetString(PRECEDENCE_BXOR)
-        self.stack.append(Expression('%s ^ %s' % (x, y), PRECEDENCE_BXOR))
+        self.stack.append(Expression('%s ^ %s', PRECEDENCE_BXOR, x, y))
 
     def BREAK_LOOP(self, code):
         code.ReadOpcode('BREAK_LOOP')
@@ -378,13 +1947,11 @@ class Decompiler:
         oparg = code.ReadOperand()
         values = []
         for i in range(oparg):
-            value = self.stack.pop()
-            if value.Precedence() < PRECEDENCE_ARG:
-                value = '(%s)' % value
-            values.append(str(value))
+            value = self.stack.pop().GetString(PRECEDENCE_ARG)
+            values.append(value)
         values.reverse()
-        valuelist = string.join(values, ', ')
-        self.stack.append(Expression('[%s]' % valuelist, PRECEDENCE_ATOM))
+        self.stack.append(Expression('[%s]', PRECEDENCE_ATOM,
+                                     Sequence(values)))
 
     def BUILD_MAP(self, code):
         code.ReadOpcode('BUILD_MAP')
@@ -410,7 +1977,7 @@ class Decompiler:
         else:
             x = x.GetString(PRECEDENCE_ARG)
         # always goes into BINARY_SUBSCR, so precedence is irrelevant
-        self.stack.append(Expression('%s:%s:%s' % (x, y, z), PRECEDENCE_NONE))
+        self.stack.append(Expression('%s:%s:%s', PRECEDENCE_NONE, x, y, z))
 
     def BUILD_TUPLE(self, code):
         code.ReadOpcode()
@@ -430,22 +1997,21 @@ class Decompiler:
         args = []
         if opcode in ('CALL_FUNCTION_KW', 'CALL_FUNCTION_VAR_KW'):
             name = self.stack.pop()
-            args.append('**%s' % name)
+            args.append(Expression('**%s', PRECEDENCE_ARG, name))
         if opcode in ('CALL_FUNCTION_VAR', 'CALL_FUNCTION_VAR_KW'):
             name = self.stack.pop()
-            args.append('*%s' % name)
+            args.append(Expression('*%s', PRECEDENCE_ARG, name))
         for i in range(nkw):
             value = self.stack.pop().GetString(PRECEDENCE_ARG)
             name = self.stack.pop().Value()
-            args.append('%s=%s' % (name, value))
+            args.append(Expression('%s=%s', PRECEDENCE_ARG, name, value))
         for i in range(nargs):
             arg = self.stack.pop().GetString(PRECEDENCE_ARG)
-            args.append(str(arg))
+            args.append(arg)
         args.reverse()
-        arglist = string.join(args, ', ')
         func = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('%s(%s)' % (func, arglist),
-                                     PRECEDENCE_ATOM))
+        self.stack.append(Expression('%s(%s)', PRECEDENCE_ATOM, func,
+                                     Sequence(args)))
 
     CALL_FUNCTION_VAR = CALL_FUNCTION
     CALL_FUNCTION_KW = CALL_FUNCTION
@@ -460,7 +2026,7 @@ class Decompiler:
         else:
             y = self.stack.pop()
             x = self.stack.pop()
-        op = dis.cmp_op[oparg]
+        op = cmp_op[oparg]
         if op[0] in '!<=>':
             prec = PRECEDENCE_CMP
         elif op[-2:] == 'in':
@@ -468,14 +2034,12 @@ class Decompiler:
         else:
             assert op[:2] == 'is', `op`
             prec = PRECEDENCE_IS
-        if y.Precedence() <= prec:
-            y = '(%s)' % y
+        y = y.GetString(prec+1)
         if x is None:
             self.stack.append(Chain('%s %s' % (op, y)))
         else:
-            if x.Precedence() < prec:
-                x = '(%s)' % x
-            self.stack.append(Expression('%s %s %s' % (x, op, y), prec))
+            x = x.GetString(prec)
+            self.stack.append(Expression('%s %s %s', prec, x, op, y))
 
     def DELETE_ATTR(self, code):
         code.ReadOpcode()
@@ -570,16 +2134,17 @@ class Decompiler:
 
     def FOR_LOOP(self, code):
         code.ReadOpcode('FOR_LOOP')
-        leap = code.ReadOperand()
-        loopcleanup = code.GetPosition() + leap
+        code.ReadOperand()
+        loopcleanup = code.JumpTarget()
         self.stack.pop()  # sequence index
         forlist = self.stack.pop()
-        forvar = self.build_target(code).GetString(PRECEDENCE_NONE)
+        forvar = yield self.build_target(code)
+        forvar = forvar.GetString(PRECEDENCE_NONE)
         head = "for %s in %s:" % (forvar, forlist)
         lineno = code.GetLine()
-        d = Decompiler(self.version)
-        d.decompile(code, 'JUMP_ABSOLUTE')
-        self.addclause(lineno, head, d.getsource(1))
+        d = self.subdecompiler()
+        yield d.block(code, 'JUMP_ABSOLUTE')
+        self.addclause(lineno, head, d)
         code.ReadOpcode('JUMP_ABSOLUTE')
         oparg = code.ReadOperand()  # to FOR_LOOP (or SET_LINENO)
         assert code.GetPosition() == loopcleanup
@@ -589,10 +2154,10 @@ class Decompiler:
         if code.GetPosition() < end:
             lineno = code.GetLine()
             code.PushStop(end)
-            d = Decompiler(self.version)
-            d.decompile(code)
+            d = self.subdecompiler()
+            yield d.block(code)
             code.PopStop()
-            self.addclause(lineno, "else:", d.getsource(1))
+            self.addclause(lineno, "else:", d)
         assert code.GetPosition() == end
 
     def IMPORT_NAME(self, code):
@@ -715,17 +2280,17 @@ class Decompiler:
 
     def JUMP_IF_FALSE(self, code):
         code.ReadOpcode('JUMP_IF_FALSE')
-        leap = code.ReadOperand()
-        endcond = code.GetPosition() + leap
+        code.ReadOperand()
+        endcond = code.JumpTarget()
         opcode = code.ReadOpcode('POP_TOP')
         assert opcode == 'POP_TOP', `opcode`
         lineno = code.GetLine()
         code.PushStop(endcond)
-        d = Decompiler(self.version)
+        d = self.subdecompiler()
         if self.loop is None:
-            d.decompile(code, 'JUMP_FORWARD')
+            yield d.block(code, 'JUMP_FORWARD')
         else:
-            d.decompile(code, 'JUMP_ABSOLUTE')
+            yield d.block(code, 'JUMP_ABSOLUTE')
         code.PopStop()
         stack = d.getstack()
         if stack:
@@ -735,7 +2300,7 @@ class Decompiler:
                 x = self.stack.pop().GetString(PRECEDENCE_AND+1)
                 y = stack.pop().GetString(PRECEDENCE_AND)
                 self.stack.append(
-                    Expression('%s and %s' % (x, y), PRECEDENCE_AND))
+                    Expression('%s and %s', PRECEDENCE_AND, x, y))
             else:
                 # assert
                 self.stack.pop()
@@ -749,42 +2314,43 @@ class Decompiler:
                 code.ReadOpcode('POP_TOP')
         else:
             condition = self.stack.pop()
-            body = d.getsource(1)
             if self.loop is None:
                 # if
-                self.addclause(lineno, 'if %s:' % condition, body)
+                first = self.top is None
+                self.addclause(lineno, 'if %s:' % condition, d)
                 code.ReadOpcode('JUMP_FORWARD')
-                leap = code.ReadOperand()
-                end = code.GetPosition() + leap
+                code.ReadOperand()
+                end = code.JumpTarget()
                 code.ReadOpcode('POP_TOP')
+                if first and self.chain == (lineno, end):
+                    # This if is an elif: it starts the else clause we
+                    # are decompiling, on its line, and ends with it.
+                    # Our block stops here, and the enclosing if
+                    # statement decompiles our else clause as its next
+                    # one, so a chain of elifs is decompiled in a loop
+                    # rather than each inside the one before.
+                    self.chained = 1
+                    return
                 while code.GetPosition() < end:
                     lineno = code.GetLine()
                     code.PushStop(end)
-                    d = Decompiler(self.version)
-                    d.decompile(code, 'JUMP_FORWARD')
+                    d = self.subdecompiler()
+                    d.chain = lineno, end
+                    yield d.block(code, 'JUMP_FORWARD')
                     code.PopStop()
-                    body = d.getsource(1)
-                    if body.has_key(lineno):
-                        if body[lineno][-1] == ':':
-                            # elif
-                            body = d.getsource(0)
-                            body[lineno] = 'el' + body[lineno]
-                            self.lines.update(body)
-                        else:
-                            #assert len(body) == 1, `body`
-                            line = body[lineno]
-                            self.addline(lineno, "else: %s" %
-                                         string.strip(line))
-                            del body[lineno]
-                            self.lines.update(body)
-                            body[lineno] = line
+                    if d.chained:
+                        # elif, with the lines of the else clause moved
+                        # up to our level
+                        top = d.top
+                        top[2] = 'el' + top[2]
+                        d.level[1] = 0
+                        self.merge(d)
+                        code.SetLine(d.last + 1)
                     else:
-                        self.addline(lineno, "else:")
-                        self.lines.update(body)
-                    code.SetLine(max(body.keys()) + 1)
+                        self.addclause(lineno, "else:", d)
             else:
                 # while
-                self.addclause(lineno, "while %s:" % condition, body)
+                self.addclause(lineno, "while %s:" % condition, d)
                 code.ReadOpcode('JUMP_ABSOLUTE')
                 oparg = code.ReadOperand()
                 assert oparg == self.loop[0], `(oparg, self.loop)`
@@ -795,20 +2361,20 @@ class Decompiler:
                 if code.GetPosition() < end:
                     lineno = code.GetLine()
                     code.PushStop(end)
-                    d = Decompiler(self.version)
-                    d.decompile(code)
+                    d = self.subdecompiler()
+                    yield d.block(code)
                     code.PopStop()
-                    self.addclause(lineno, "else:", d.getsource(1))
+                    self.addclause(lineno, "else:", d)
             assert code.GetPosition() == end
 
     def JUMP_IF_TRUE(self, code):
         code.ReadOpcode('JUMP_IF_TRUE')
-        leap = code.ReadOperand()
-        end = code.GetPosition() + leap
+        code.ReadOperand()
+        end = code.JumpTarget()
         code.ReadOpcode('POP_TOP')
         code.PushStop(end)
-        d = Decompiler(self.version)
-        d.decompile(code, 'RAISE_VARARGS')
+        d = self.subdecompiler()
+        yield d.block(code, 'RAISE_VARARGS')
         code.PopStop()
         stack = d.getstack()
         assert stack
@@ -816,7 +2382,7 @@ class Decompiler:
             # or expression
             x = self.stack.pop().GetString(PRECEDENCE_OR+1)
             y = stack.pop().GetString(PRECEDENCE_OR)
-            self.stack.append(Expression('%s or %s' % (x, y), PRECEDENCE_OR))
+            self.stack.append(Expression('%s or %s', PRECEDENCE_OR, x, y))
         else:
             # raise AssertionError, exp
             test = self.stack.pop()
@@ -835,34 +2401,32 @@ class Decompiler:
         code.ReadOpcode('LOAD_ATTR')
         oparg = code.ReadOperand()
         attr = code.GetName(oparg)
-        x = self.stack.pop()
-        if x.Precedence() < PRECEDENCE_ATOM:
-            x = '(%s)' % x
-        self.stack.append(Expression('%s.%s' % (x, attr), PRECEDENCE_ATOM))
+        x = self.stack.pop().GetString(PRECEDENCE_ATOM)
+        self.stack.append(Expression('%s.%s', PRECEDENCE_ATOM, x, attr))
 
     def LOAD_CONST(self, code):
         code.ReadOpcode('LOAD_CONST')
         oparg = code.ReadOperand()
-        self.stack.append(Constant(code.GetConstant(oparg)))
+        self.stack.append(self.constant(code.GetConstant(oparg)))
 
     def LOAD_FAST(self, code):
         code.ReadOpcode('LOAD_FAST')
         oparg = code.ReadOperand()
-        self.stack.append(Local(code.GetLocal(oparg)))
+        self.stack.append(self.name(Local, code.GetLocal(oparg)))
 
     def LOAD_GLOBAL(self, code):
         code.ReadOpcode('LOAD_GLOBAL')
         oparg = code.ReadOperand()
-        self.stack.append(Global(code.GetName(oparg)))
+        self.stack.append(self.name(Global, code.GetName(oparg)))
 
     def LOAD_LOCALS(self, code):
         code.ReadOpcode('LOAD_LOCALS')
-        self.stack.append(Constant(None))
+        self.stack.append(CONSTANT_NONE)
 
     def LOAD_NAME(self, code):
         code.ReadOpcode('LOAD_NAME')
         oparg = code.ReadOperand()
-        self.stack.append(Local(code.GetName(oparg)))
+        self.stack.append(self.name(Local, code.GetName(oparg)))
 
     def MAKE_FUNCTION(self, code):
         code.ReadOpcode('MAKE_FUNCTION')
@@ -879,7 +2443,8 @@ class Decompiler:
                 if defaultcount:
                     defaultcount = defaultcount - 1
                     default = self.stack.pop().GetString(PRECEDENCE_ARG)
-                    params.append('%s=%s' % (name, default))
+                    params.append(Expression('%s=%s', PRECEDENCE_ARG,
+                                             name, default))
                 else:
                     params.append(name)
             params.reverse()
@@ -889,15 +2454,24 @@ class Decompiler:
                 argcount = argcount + 1
             if co.co_flags & KWARGS:
                 params.append('**' + co.co_varnames[argcount])
-            paramlist = string.join(params, ', ')
+            paramlist = Sequence(params)
             # get the function body
-            d = Decompiler(self.version)
-            d.decompile(CodeCursor(co), 'RETURN_VALUE')
-            stack = d.getstack()
-            assert len(stack) == 1, `stack`
-            y = stack.pop().GetString(PRECEDENCE_LAMBDA)
+            y = None
+            remember = self.cache is not None or self.memo is not None
+            if remember:
+                key, text = self.lookup(co, '-lambda')
+                if text is not None:
+                    y = Expression('%s', PRECEDENCE_LAMBDA, text)
+            if y is None:
+                d = self.subdecompiler()
+                yield d.block(code.NestedCursor(co), 'RETURN_VALUE')
+                stack = d.getstack()
+                assert len(stack) == 1, `stack`
+                y = stack.pop().GetString(PRECEDENCE_LAMBDA)
+                if remember:
+                    self.store(key, str(y))
             self.stack.append(
-                Expression('lambda %s: %s' % (paramlist, y), PRECEDENCE_LAMBDA))
+                Expression('lambda %s: %s', PRECEDENCE_LAMBDA, paramlist, y))
         else:
             opcode = code.ReadOpcode('CALL_FUNCTION', 'STORE_FAST',
                                      'STORE_NAME')
@@ -916,27 +2490,14 @@ class Decompiler:
                     classname = code.GetName(oparg)
                 assert name == classname, `name, classname`
                 if super:
-                    classname = '%s(%s)' % (classname, string.join(super, ', '))
+                    classname = '%s(%s)' % (classname, Sequence(list(super)))
                 lineno = code.GetLine()
-                d = Decompiler(self.version)
-                d.decompile(CodeCursor(co))
-                body = d.getsource(1)
-                if body.has_key(lineno):
-                    if len(body) == 1:
-                        self.addline(lineno, "class %s: %s" % (classname,
-                                      string.strip(body[lineno])))
-                    else:
-                        assert 0
-                        # __doc__ string appears in 0th row
-                        assert not body.has_key(lineno+1), `body`
-                        body[lineno+1] = body[lineno]
-                        del body[lineno]
-                        self.addline(lineno, "class %s:" % classname)
-                        self.lines.update(body)
-                else:
-                    self.addline(lineno, "class %s:" % classname)
-                    self.lines.update(body)
-                code.SetLine(max(body.keys()) + 1)
+                d = yield self.code_request(code, co, lineno)
+                if d.top is not None and d.top[0] == lineno:
+                    # a body on the line of the header is all there is;
+                    # a __doc__ string would appear there as well
+                    assert d.last == lineno, `d.last, lineno`
+                self.addclause(lineno, "class %s:" % classname, d)
             else:
                 assert opcode in ('STORE_FAST', 'STORE_NAME'), `opcode`
                 # def
@@ -970,9 +2531,8 @@ class Decompiler:
                 head = "def %s(%s):" % (funcname, paramlist)
                 # get the function body
                 lineno = code.GetLine()
-                d = Decompiler(self.version)
-                d.decompile(CodeCursor(co))
-                self.addclause(lineno, head, d.getsource(1))
+                d = yield self.code_request(code, co, lineno)
+                self.addclause(lineno, head, d)
 
     def PRINT_ITEM(self, code):
         code.ReadOpcode('PRINT_ITEM')
@@ -1011,7 +2571,7 @@ class Decompiler:
     def POP_TOP(self, code):
         code.ReadOpcode('POP_TOP')
         self.addline(code.GetLine(),
-                     self.stack.pop().GetString(PRECEDENCE_NONE))
+                     str(self.stack.pop().GetString(PRECEDENCE_NONE)))
 
     def RAISE_VARARGS(self, code):
         code.ReadOpcode('RAISE_VARARGS')
@@ -1021,7 +2581,7 @@ class Decompiler:
             arg = self.stack.pop().GetString(PRECEDENCE_ARG)
             args.append(arg)
         args.reverse()
-        self.addline(code.GetLine(), 'raise %s' % string.join(args, ', '))
+        self.addline(code.GetLine(), 'raise %s' % Sequence(args))
 
     def RETURN_VALUE(self, code):
         code.ReadOpcode()
@@ -1041,18 +2601,17 @@ class Decompiler:
         x = self.stack.pop().GetString(PRECEDENCE_CMP+1)
         code.ReadOpcode('COMPARE_OP')
         oparg = code.ReadOperand()
-        op = dis.cmp_op[oparg]
-        chain = '%s %s %s' % (x, op, y)
+        op = cmp_op[oparg]
+        chain = Expression('%s %s %s', PRECEDENCE_CMP, x, op, y)
         opcode = code.ReadOpcode('JUMP_IF_FALSE')
-        leap = code.ReadOperand()
-        stop1 = code.GetPosition() + leap
+        code.ReadOperand()
+        stop1 = code.JumpTarget()
         while opcode == 'JUMP_IF_FALSE':
-            assert code.GetPosition() + leap == stop1, \
-                   `code.GetPosition(), leap, stop1`
+            assert code.JumpTarget() == stop1, `code.JumpTarget(), stop1`
             code.ReadOpcode('POP_TOP')
             code.PushStop(stop1 - 6)
-            d = Decompiler(self.version)
-            d.decompile(code, 'ROT_THREE')
+            d = self.subdecompiler()
+            yield d.block(code, 'ROT_THREE')
             code.PopStop()
             stack = d.getstack()
             y = stack.pop().GetString(PRECEDENCE_CMP+1)
@@ -1060,15 +2619,16 @@ class Decompiler:
             if opcode == 'ROT_THREE':
                 opcode = code.ReadOpcode('COMPARE_OP')
             oparg = code.ReadOperand()
-            op = dis.cmp_op[oparg]
-            chain = '%s %s %s' % (chain, op, y)
+            op = cmp_op[oparg]
+            chain = Expression('%s %s %s', PRECEDENCE_CMP, chain, op, y)
             opcode = code.ReadOpcode('JUMP_IF_FALSE', 'JUMP_FORWARD')
-            leap = code.ReadOperand()
-        assert leap == 2, `leap`
+            code.ReadOperand()
+        assert code.JumpTarget() == code.GetPosition() + 2, \
+               `code.JumpTarget(), code.GetPosition()`
         assert code.GetPosition() == stop1, `code.GetPosition(), stop1`
         code.ReadOpcode('ROT_TWO')
         code.ReadOpcode('POP_TOP')
-        self.stack.append(Expression(chain, PRECEDENCE_CMP))
+        self.stack.append(chain)
 
     def ROT_TWO(self, code):
         code.ReadOpcode('ROT_TWO')
@@ -1084,16 +2644,16 @@ class Decompiler:
             opcode = code.ReadOpcode('DUP_TOP', 'POP_TOP')
         lineno = code.GetLine()
         if opcode == 'DUP_TOP':
-            d = Decompiler(self.version)
-            d.decompile(code, 'COMPARE_OP')
+            d = self.subdecompiler()
+            yield d.block(code, 'COMPARE_OP')
             stack = d.getstack()
             exc_type = stack.pop().GetString(PRECEDENCE_ARG)
             code.ReadOpcode('COMPARE_OP')
             oparg = code.ReadOperand()
             assert oparg == 10, `oparg`  # 10 -> exception match
             code.ReadOpcode('JUMP_IF_FALSE')
-            leap = code.ReadOperand()
-            nextclause = code.GetPosition() + leap
+            code.ReadOperand()
+            nextclause = code.JumpTarget()
             code.ReadOpcode('POP_TOP')  # result of test
             code.ReadOpcode('POP_TOP')  # exc_type
             opcode = code.NextOpcode()
@@ -1101,40 +2661,41 @@ class Decompiler:
                 code.ReadOpcode('POP_TOP')
                 head = 'except %s:' % exc_type
             else:
-                exc_value = self.build_target(code).GetString(PRECEDENCE_ARG)
+                exc_value = yield self.build_target(code)
+                exc_value = exc_value.GetString(PRECEDENCE_ARG)
                 head = 'except %s, %s:' % (exc_type, exc_value)
         else:
             code.ReadOpcode('POP_TOP')  # exc_value
             head = 'except:'
             nextclause = None
         code.ReadOpcode('POP_TOP')  # exc_tb
-        d = Decompiler(self.version)
-        d.decompile(code, 'JUMP_FORWARD')
-        self.addclause(lineno, head, d.getsource(1))
+        d = self.subdecompiler()
+        yield d.block(code, 'JUMP_FORWARD')
+        self.addclause(lineno, head, d)
         code.ReadOpcode('JUMP_FORWARD')
-        leap = code.ReadOperand()
-        end = code.GetPosition() + leap
+        code.ReadOperand()
+        end = code.JumpTarget()
         if nextclause is not None:
             assert code.GetPosition() == nextclause
             code.ReadOpcode('POP_TOP')
-        return end
+        raise Return(end)
 
     def SETUP_EXCEPT(self, code):
         code.ReadOpcode('SETUP_EXCEPT')
-        leap = code.ReadOperand()
-        firstexceptclause = code.GetPosition() + leap
+        code.ReadOperand()
+        firstexceptclause = code.JumpTarget()
         lineno = code.GetLine()
-        d = Decompiler(self.version)
-        d.decompile(code, 'POP_BLOCK')
-        self.addclause(lineno, "try:", d.getsource(1))
+        d = self.subdecompiler()
+        yield d.block(code, 'POP_BLOCK')
+        self.addclause(lineno, "try:", d)
         code.ReadOpcode('POP_BLOCK')
         code.ReadOpcode('JUMP_FORWARD')
-        leap = code.ReadOperand()
-        elseclause = code.GetPosition() + leap
+        code.ReadOperand()
+        elseclause = code.JumpTarget()
         assert code.GetPosition() == firstexceptclause
-        end = self.handle_except_clause(code)
+        end = yield self.handle_except_clause(code)
         while code.NextOpcode() != 'END_FINALLY':
-            end1 = self.handle_except_clause(code)
+            end1 = yield self.handle_except_clause(code)
             assert end1 == end, `end1, end`
         code.ReadOpcode('END_FINALLY')
         assert code.GetPosition() == elseclause, \
@@ -1142,63 +2703,61 @@ class Decompiler:
         if elseclause < end:
             lineno = code.GetLine()
             code.PushStop(end)
-            d = Decompiler(self.version)
-            d.decompile(code)
+            d = self.subdecompiler()
+            yield d.block(code)
             code.PopStop()
-            self.addclause(lineno, "else:", d.getsource(1))
+            self.addclause(lineno, "else:", d)
         assert code.GetPosition() == end
 
     def SETUP_FINALLY(self, code):
         code.ReadOpcode('SETUP_FINALLY')
-        leap = code.ReadOperand()
-        finallyclause = code.GetPosition() + leap
+        code.ReadOperand()
+        finallyclause = code.JumpTarget()
         lineno = code.GetLine()
-        d = Decompiler(self.version)
-        d.decompile(code, 'POP_BLOCK')
-        body = d.getsource(1)
-        self.addclause(lineno, "try:", body)
+        d = self.subdecompiler()
+        yield d.block(code, 'POP_BLOCK')
+        self.addclause(lineno, "try:", d)
         code.ReadOpcode('POP_BLOCK')
         code.ReadOpcode('LOAD_CONST')
         oparg = code.ReadOperand()
         assert oparg == 0, `oparg`
         assert code.GetPosition() == finallyclause
         lineno = code.GetLine()
-        d = Decompiler(self.version)
-        d.decompile(code, 'END_FINALLY')
-        body = d.getsource(1)
-        self.addclause(lineno, "finally:", body)
+        d = self.subdecompiler()
+        yield d.block(code, 'END_FINALLY')
+        self.addclause(lineno, "finally:", d)
         code.ReadOpcode('END_FINALLY')
 
     def SETUP_LOOP(self, code):
         code.ReadOpcode('SETUP_LOOP')
-        leap = code.ReadOperand()
+        code.ReadOperand()
         assert self.loop is None, `self.loop`
-        i = code.GetPosition()
-        self.loop = i, i + leap
+        kind, setup, start, exit = code.Flow().Region(code.lastop)
+        self.loop = start, exit
 
     def SLICE_0(self, code):
         code.ReadOpcode()
         x = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('%s[:]' % x, PRECEDENCE_ATOM))
+        self.stack.append(Expression('%s[:]', PRECEDENCE_ATOM, x))
 
     def SLICE_1(self, code):
         code.ReadOpcode()
         y = self.stack.pop().GetString(PRECEDENCE_ARG)
         x = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('%s[%s:]' % (x, y), PRECEDENCE_ATOM))
+        self.stack.append(Expression('%s[%s:]', PRECEDENCE_ATOM, x, y))
 
     def SLICE_2(self, code):
         code.ReadOpcode()
         z = self.stack.pop().GetString(PRECEDENCE_ARG)
         x = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('%s[:%s]' % (x, z), PRECEDENCE_ATOM))
+        self.stack.append(Expression('%s[:%s]', PRECEDENCE_ATOM, x, z))
 
     def SLICE_3(self, code):
         code.ReadOpcode()
         z = self.stack.pop().GetString(PRECEDENCE_ARG)
         y = self.stack.pop().GetString(PRECEDENCE_ARG)
         x = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('%s[%s:%s]' % (x, y, z), PRECEDENCE_ATOM))
+        self.stack.append(Expression('%s[%s:%s]', PRECEDENCE_ATOM, x, y, z))
 
     def STORE_ATTR(self, code):
         code.ReadOpcode()
@@ -1264,9 +2823,7 @@ class Decompiler:
         obj = self.stack.pop()
         if isinstance(obj, Map):
             value = self.stack.pop().GetString(PRECEDENCE_ARG)
-            if key.Precedence() < PRECEDENCE_ARG:
-                key = '(%s)' % key
-            obj.SetAttr(key, value)
+            obj.SetAttr(key.GetString(PRECEDENCE_ARG), value)
         else:
             obj = obj.GetString(PRECEDENCE_ATOM)
             value = self.stack.pop().GetString(PRECEDENCE_NONE)
@@ -1276,40 +2833,40 @@ class Decompiler:
     def UNARY_CONVERT(self, code):
         code.ReadOpcode()
         value = self.stack.pop().GetString(PRECEDENCE_NONE)
-        self.stack.append(Expression('`%s`' % value, PRECEDENCE_ATOM))
+        self.stack.append(Expression('`%s`', PRECEDENCE_ATOM, value))
 
     def UNARY_INVERT(self, code):
         code.ReadOpcode()
         # only requires PRECEDENCE_UNARY, but both powers and other
         # unary operators are confusing without parentheses
         y = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('~%s' % y, PRECEDENCE_UNARY))
+        self.stack.append(Expression('~%s', PRECEDENCE_UNARY, y))
 
     def UNARY_NEGATIVE(self, code):
         code.ReadOpcode()
         # only requires PRECEDENCE_UNARY, but both powers and other
         # unary operators are confusing without parentheses
         y = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('-%s' % y, PRECEDENCE_UNARY))
+        self.stack.append(Expression('-%s', PRECEDENCE_UNARY, y))
 
     def UNARY_NOT(self, code):
         code.ReadOpcode()
         y = self.stack.pop().GetString(PRECEDENCE_NOT)
-        self.stack.append(Expression('not %s' % y, PRECEDENCE_NOT))
+        self.stack.append(Expression('not %s', PRECEDENCE_NOT, y))
 
     def UNARY_POSITIVE(self, code):
         code.ReadOpcode()
         # only requires PRECEDENCE_UNARY, but both powers and other
         # unary operators are confusing without parentheses
         y = self.stack.pop().GetString(PRECEDENCE_ATOM)
-        self.stack.append(Expression('+%s' % y, PRECEDENCE_UNARY))
+        self.stack.append(Expression('+%s', PRECEDENCE_UNARY, y))
 
     def build_target(self, code):
         if code.NextOpcode() not in ('STORE_FAST', 'STORE_GLOBAL', 'STORE_NAME',
                                      'UNPACK_SEQUENCE', 'UNPACK_TUPLE'):
-            d = Decompiler(self.version)
-            d.decompile(code, 'STORE_ATTR', 'STORE_SLICE+0', 'STORE_SLICE+1',\
-                        'STORE_SLICE+2', 'STORE_SLICE+3', 'STORE_SUBSCR')
+            d = self.subdecompiler()
+            yield d.block(code, 'STORE_ATTR', 'STORE_SLICE+0', 'STORE_SLICE+1',
+                          'STORE_SLICE+2', 'STORE_SLICE+3', 'STORE_SUBSCR')
         opcode = code.ReadOpcode()
         if opcode == 'STORE_ATTR':
             stack = d.getstack()
@@ -1317,64 +2874,212 @@ class Decompiler:
             name = stack.pop().GetString(PRECEDENCE_ATOM)
             oparg = code.ReadOperand()
             attr = code.GetName(oparg)
-            target = Expression('%s.%s' % (name, attr), PRECEDENCE_ATOM)
+            target = Expression('%s.%s', PRECEDENCE_ATOM, name, attr)
         elif opcode == 'STORE_FAST':
             oparg = code.ReadOperand()
-            target = Local(code.GetLocal(oparg))
+            target = self.name(Local, code.GetLocal(oparg))
         elif opcode == 'STORE_GLOBAL':
             oparg = code.ReadOperand()
-            target = Global(code.GetName(oparg))
+            target = self.name(Global, code.GetName(oparg))
         elif opcode == 'STORE_NAME':
             oparg = code.ReadOperand()
-            target = Local(code.GetName(oparg))
+            target = self.name(Local, code.GetName(oparg))
         elif opcode == 'STORE_SLICE+0':
             stack = d.getstack()
             assert len(stack) == 1, `stack`
             x = stack.pop().GetString(PRECEDENCE_ATOM)
-            target = Expression('%s[:]' % x, PRECEDENCE_ATOM)
+            target = Expression('%s[:]', PRECEDENCE_ATOM, x)
         elif opcode == 'STORE_SLICE+1':
             stack = d.getstack()
             assert len(stack) == 2, `stack`
             y = stack.pop().GetString(PRECEDENCE_ARG)
             x = stack.pop().GetString(PRECEDENCE_ATOM)
-            target = Expression('%s[%s:]' % (x, y), PRECEDENCE_ATOM)
+            target = Expression('%s[%s:]', PRECEDENCE_ATOM, x, y)
         elif opcode == 'STORE_SLICE+2':
             stack = d.getstack()
             assert len(stack) == 2, `stack`
             z = stack.pop().GetString(PRECEDENCE_ARG)
             x = stack.pop().GetString(PRECEDENCE_ATOM)
-            target = Expression('%s[:%s]' % (x, z), PRECEDENCE_ATOM)
+            target = Expression('%s[:%s]', PRECEDENCE_ATOM, x, z)
         elif opcode == 'STORE_SLICE+3':
             stack = d.getstack()
             assert len(stack) == 3, `stack`
             z = stack.pop().GetString(PRECEDENCE_ARG)
             y = stack.pop().GetString(PRECEDENCE_ARG)
             x = stack.pop().GetString(PRECEDENCE_ATOM)
-            target = Expression('%s[%s:%s]' % (x, y, z), PRECEDENCE_ATOM)
+            target = Expression('%s[%s:%s]', PRECEDENCE_ATOM, x, y, z)
         elif opcode == 'STORE_SUBSCR':
             stack = d.getstack()
             assert len(stack) == 2, `stack`
             key = stack.pop().GetString(PRECEDENCE_NONE)
             name = stack.pop().GetString(PRECEDENCE_ATOM)
-            target = Expression('%s[%s]' % (name, key), PRECEDENCE_ATOM)
+            target = Expression('%s[%s]', PRECEDENCE_ATOM, name, key)
         else:
             assert opcode in ('UNPACK_SEQUENCE', 'UNPACK_TUPLE'), `opcode`
             count = code.ReadOperand()
             values = []
             while count > 0:
-                value = self.build_target(code).GetString(PRECEDENCE_ARG)
-                values.append(value)
+                value = yield self.build_target(code)
+                values.append(value.GetString(PRECEDENCE_ARG))
                 count = count - 1
             target = Tuple(values)
-        return target
+        raise Return(target)
 
     def UNPACK_SEQUENCE(self, code):
-        seq = self.build_target(code).GetString(PRECEDENCE_NONE)
+        seq = yield self.build_target(code)
+        seq = seq.GetString(PRECEDENCE_NONE)
         rhs = self.stack.pop().GetString(PRECEDENCE_NONE)
         self.addline(code.GetLine(), '%s = %s' % (seq, rhs))
 
     UNPACK_TUPLE = UNPACK_SEQUENCE
 
+dispatch_table(Decompiler)
+
+class HandlerProfile:
+
+    # Counts and times for each opcode handler, gathered by a
+    # ProfilingDecompiler and its nested decompilers.  For each handler
+    # name, stats holds a list of the calls, the inclusive and exclusive
+    # time, the Decompilers made for nested blocks and code objects, and
+    # the deepest nesting of handler calls it was called at.  Inclusive
+    # time is only counted for the outermost call of a recursive handler.
+
+    def __init__(self):
+        self.stats = {}
+        self.stack = []     # [name, time in nested handlers] of each call
+        self.active = {}    # number of calls of each name on the stack
+
+    def call(self, name, function, decompiler, code):
+        # Call a handler.  A handler that returns a generator is wrapped,
+        # so that the call lasts until the generator is done, including
+        # the nested blocks the engine decompiles for it.
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = [0, 0.0, 0.0, 0, 0]
+        stack = self.stack
+        frame = [name, 0.0]
+        stack.append(frame)
+        if len(stack) > stats[4]:
+            stats[4] = len(stack)
+        self.active[name] = self.active.get(name, 0) + 1
+        start = time.time()
+        try:
+            generator = function(decompiler, code)
+        except:
+            self.leave(stats, frame, start)
+            raise
+        if generator is None:
+            self.leave(stats, frame, start)
+            return None
+        return self.trace(generator, stats, frame, start)
+
+    def trace(self, generator, stats, frame, start):
+        # pass the engine's requests and results through
+        try:
+            value = error = None
+            while 1:
+                if error is None:
+                    request = generator.send(value)
+                else:
+                    request = generator.throw(error[0], error[1], error[2])
+                value = error = None
+                try:
+                    value = yield request
+                except:
+                    error = sys.exc_info()
+        finally:
+            self.leave(stats, frame, start)
+
+    def leave(self, stats, frame, start):
+        elapsed = time.time() - start
+        stack = self.stack
+        stack.pop()
+        name = frame[0]
+        self.active[name] = self.active[name] - 1
+        stats[0] = stats[0] + 1
+        if not self.active[name]:
+            stats[1] = stats[1] + elapsed
+        stats[2] = stats[2] + elapsed - frame[1]
+        if stack:
+            stack[-1][1] = stack[-1][1] + elapsed
+
+    def nested(self):
+        # a Decompiler was made by the handler being called
+        if self.stack:
+            self.stats[self.stack[-1][0]][3] = \
+                self.stats[self.stack[-1][0]][3] + 1
+
+    def merge(self, stats):
+        # add the stats of another profile, such as another file's
+        for name, other in stats.items():
+            mine = self.stats.get(name)
+            if mine is None:
+                mine = self.stats[name] = [0, 0.0, 0.0, 0, 0]
+            mine[0] = mine[0] + other[0]
+            mine[1] = mine[1] + other[1]
+            mine[2] = mine[2] + other[2]
+            mine[3] = mine[3] + other[3]
+            mine[4] = max(mine[4], other[4])
+
+    def report(self, file, title):
+        # write a table of the handlers, by exclusive time
+        items = map(lambda item: (-item[1][2], item[0], item[1]),
+                    self.stats.items())
+        items.sort()
+        file.write('%s\n' % title)
+        file.write('%-22s %8s %12s %12s %7s %6s\n' %
+                   ('handler', 'calls', 'inclusive', 'exclusive', 'nested',
+                    'depth'))
+        for key, name, stats in items:
+            file.write('%-22s %8d %10.3fms %10.3fms %7d %6d\n' %
+                       (name, stats[0], stats[1] * 1000, stats[2] * 1000,
+                        stats[3], stats[4]))
+        file.write('\n')
+
+def profiled_handler(name, function):
+    # wrap an opcode handler for a ProfilingDecompiler
+    def handler(self, code, name=name, function=function):
+        return self.profile.call(name, function, self, code)
+    return handler
+
+class ProfilingDecompiler(Decompiler):
+
+    # A Decompiler that records the calls of its opcode handlers, and
+    # those of its nested decompilers, in a HandlerProfile.  Decompiler
+    # itself is not changed, so there's no cost when not profiling.
+
+    wrap_handler = staticmethod(profiled_handler)
+
+    def __init__(self, version, cache=None, memo=None, faults=None,
+                 profile=None):
+        Decompiler.__init__(self, version, cache, memo, faults)
+        if profile is None:
+            profile = HandlerProfile()
+        self.profile = profile
+
+    def subdecompiler(self):
+        self.profile.nested()
+        d = Decompiler.subdecompiler(self)
+        d.profile = self.profile
+        return d
+
+dispatch_table(ProfilingDecompiler)
+
+class DiffDecompiler(Decompiler):
+
+    # A Decompiler for diff_code, which compares the bodies of nested
+    # functions and classes separately, so they are left as pass here.
+    # Their headers, which are made by the enclosing code, are kept.
+
+    def code_request(self, code, co, header):
+        # a request with no cursor, which is already done
+        d = self.subdecompiler()
+        d.code = code
+        d.addline(header, 'pass')
+        return d, None, (), None
+
+dispatch_table(DiffDecompiler)
+
 # These tests need to be more complete, however, the things that are
 # known to be broken are represented
 tests = [
@@ -1465,11 +3170,12 @@ tests = [
     ]
 
 def test():
-    import traceback
+    # the tests are compiled to 2.0 bytecode, whatever Python runs them
+    import compile20, traceback
     for osrc in tests:
-        code1 = compile(osrc, '<string>', 'exec')
         d = Decompiler((2, 0))
         try:
+            code1 = compile20.compile_source(osrc)
             d.decompile(CodeCursor(code1))
         except:
             print osrc
@@ -1486,7 +3192,7 @@ def test():
         if dsrc == osrc:
             continue
         try:
-            code2 = compile(dsrc, '<string>', 'exec')
+            code2 = compile20.compile_source(dsrc)
         except SyntaxError:
             code2 = None
         if code2 and code2.co_code == code1.co_code:
@@ -1568,45 +3274,1159 @@ def f():
 ##    if a and (b and c):
 ##        del c
 
-if __name__ == '__main__':
-  if 1:
-    test()
-  else:
-    out = open(r'E:\output.txt', 'wt')
+# The magic number at the start of a compiled module for each version of
+# Python that has one, with the Decompiler class whose handlers can
+# decompile its bytecode, or None.  Development versions that changed
+# the bytecode have magic numbers of their own; only the releases of
+# Python 3 are listed.
+MAGIC_NUMBERS = [
+    (20121, (1, 5, 2), Decompiler),
+    (50428, (1, 6), None),
+    (50823, (2, 0), Decompiler),
+    (60202, (2, 1), None),
+    (60717, (2, 2), None),
+    (62011, (2, 3), None),
+    (62021, (2, 3), None),
+    (62041, (2, 4), None),
+    (62051, (2, 4), None),
+    (62061, (2, 4), None),
+    (62071, (2, 5), None),
+    (62081, (2, 5), None),
+    (62091, (2, 5), None),
+    (62092, (2, 5), None),
+    (62101, (2, 5), None),
+    (62111, (2, 5), None),
+    (62121, (2, 5), None),
+    (62131, (2, 5), None),
+    (62151, (2, 6), None),
+    (62161, (2, 6), None),
+    (62171, (2, 7), None),
+    (62181, (2, 7), None),
+    (62191, (2, 7), None),
+    (62201, (2, 7), None),
+    (62211, (2, 7), None),
+    (3131, (3, 0), None),
+    (3151, (3, 1), None),
+    (3180, (3, 2), None),
+    (3230, (3, 3), None),
+    (3310, (3, 4), None),
+    (3350, (3, 5), None),
+    (3351, (3, 5), None),
+    (3379, (3, 6), None),
+    (3394, (3, 7), None),
+    (3413, (3, 8), None),
+    (3425, (3, 9), None),
+    (3439, (3, 10), None),
+    (3495, (3, 11), None),
+    (3531, (3, 12), None),
+    (3571, (3, 13), None),
+    ]
+
+magics = {}
+for number, version, handlers in MAGIC_NUMBERS:
+    magics[chr(number & 0xff) + chr(number >> 8) + '\r\n'] = \
+        version, handlers
+del number, version, handlers
+
+def version_name(version):
+    if version is None:
+        return 'unknown'
+    return string.join(map(str, version), '.')
+
+ARCHIVES = ('.zip', '.egg', '.jar')
+
+archives = {}
+
+def split_archive(filename):
+    # Split a path such as lib/site.egg/pkg/mod.pyc into the archive and
+    # the name of the member in it, as zipimport does, or return None if
+    # the path isn't inside an archive.
+    archive = filename
+    while not os.path.isfile(archive):
+        parent = os.path.dirname(archive)
+        if not parent or parent == archive:
+            return None
+        archive = parent
+    if archive == filename:
+        return None
+    member = filename[len(archive):].lstrip(os.sep)
+    return archive, string.replace(member, os.sep, '/')
+
+def open_archive(archive):
+    # A ZipFile for an archive, opened once per process, since reading
+    # the directory of a large egg for each member would be slow.
+    import zipfile
+    z = archives.get(archive)
+    if z is None:
+        z = zipfile.ZipFile(archive)
+        archives[archive] = z
+    return z
+
+class OldUnmarshaller:
+
+    # Reads the marshal format of Python 1.5 to 2.0, which the marshal
+    # module of a later Python can't: the numbers in a code object are
+    # 16 bits, and it has no free or cell variables.  Code objects are
+    # made with the fields the later Python has, which is all the
+    # Decompiler looks at.
+
+    def __init__(self, data, offset=0):
+        self.data = data
+        self.i = offset
+
+    def read(self, n):
+        i = self.i
+        if i + n > len(self.data):
+            raise EOFError, 'marshal data too short'
+        self.i = i + n
+        return self.data[i:i+n]
+
+    def short(self):
+        import struct
+        return struct.unpack('<h', self.read(2))[0]
+
+    def long(self):
+        import struct
+        return struct.unpack('<i', self.read(4))[0]
+
+    def load(self):
+        import struct
+        kind = self.read(1)
+        if kind == 'N':
+            return None
+        elif kind == '.':
+            return Ellipsis
+        elif kind == 'i':
+            return int(self.long())
+        elif kind == 'I':
+            return int(struct.unpack('<q', self.read(8))[0])
+        elif kind == 'l':
+            # base 2**15 digits, the sign in that of the count
+            n = self.long()
+            value = 0L
+            for i in range(abs(n)):
+                value = value | (long(self.short() & 0x7fff) << (15 * i))
+            if n < 0:
+                value = -value
+            return value
+        elif kind == 'f':
+            return float(self.read(ord(self.read(1))))
+        elif kind == 'x':
+            real = float(self.read(ord(self.read(1))))
+            imag = float(self.read(ord(self.read(1))))
+            return complex(real, imag)
+        elif kind == 's':
+            return self.read(self.long())
+        elif kind == 'u':
+            return unicode(self.read(self.long()), 'utf-8')
+        elif kind in '([':
+            items = []
+            for i in range(self.long()):
+                items.append(self.load())
+            if kind == '(':
+                return tuple(items)
+            return items
+        elif kind == '{':
+            value = {}
+            while self.data[self.i:self.i+1] != '0':
+                key = self.load()
+                value[key] = self.load()
+            self.i = self.i + 1
+            return value
+        elif kind == 'c':
+            argcount = self.short()
+            nlocals = self.short()
+            stacksize = self.short()
+            flags = self.short()
+            code = self.load()
+            consts = self.load()
+            names = self.load()
+            varnames = self.load()
+            filename = self.load()
+            name = self.load()
+            firstlineno = self.short()
+            lnotab = self.load()
+            return types.CodeType(argcount, nlocals, stacksize, flags, code,
+                                  consts, names, varnames, filename, name,
+                                  firstlineno, lnotab)
+        raise ValueError, 'bad marshal data: %s' % `kind`
+
+def read_pyc(data, filename, handled=1):
+    # Return (version, code) for the contents of a compiled module file,
+    # which may be a string or a memory map.  The code is unmarshalled
+    # from a buffer, so that the contents aren't copied again, or by an
+    # OldUnmarshaller for versions before 2.1.  With handled false, a
+    # version no Decompiler handles is read as well, for tools that only
+    # look at the bytecode.
+    import marshal
+    if len(data) < 8:
+        raise RuntimeError, '%s: truncated compiled module' % filename
+    magic = data[:4]
+    if not magics.has_key(magic):
+        raise RuntimeError, 'unrecognised magic: %s' % `magic`
+    version, handlers = magics[magic]
+    if handlers is None and handled:
+        raise RuntimeError, 'Python %s bytecode is not supported' % \
+              version_name(version)
+    if version < (2, 1):
+        return version, OldUnmarshaller(data, 8).load()
+    return version, marshal.loads(buffer(data, 8))
+
+def load_pyc(filename, handled=1):
+    # Return (version, code) for a compiled module file, as read_pyc.  A
+    # plain file is memory-mapped rather than read; a path inside a zip,
+    # egg or jar archive is read from the archive in place.
+    import mmap
+    if not os.path.exists(filename):
+        parts = split_archive(filename)
+        if parts is not None:
+            archive, member = parts
+            return read_pyc(open_archive(archive).read(member), filename,
+                            handled)
+    f = open(filename, 'rb')
+    try:
+        if os.fstat(f.fileno()).st_size < 8:
+            return read_pyc(f.read(), filename, handled)
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+    try:
+        return read_pyc(data, filename, handled)
+    finally:
+        data.close()
+
+def format_source(lines):
+    # Join a line dictionary into source text, leaving blank lines where
+    # there is no source so that line numbers match the original.
+    keys = lines.keys()
+    keys.sort()
+    out = []
+    for lineno in range(1, keys[-1] + 1):
+        out.append(lines.get(lineno, ''))
+    return string.join(out, '\n') + '\n'
+
+def write_source(items, file, sourcemap=None):
+    # Write (lineno, line) pairs, such as those generated by
+    # Decompiler.iterdecompile, to a file as they arrive, leaving blank
+    # lines so that line numbers match the original.  A line that arrives
+    # out of order is written on the next line, and moved there in the
+    # SourceMap, if any.
+    current = 1
+    for lineno, line in items:
+        if lineno > current:
+            file.write('\n' * (lineno - current))
+            current = lineno
+        elif lineno < current and sourcemap is not None:
+            sourcemap.move(lineno, current)
+        file.write(line)
+        file.write('\n')
+        current = current + 1
+
+def sniff_versions(filenames):
+    # Group compiled module files by the version of Python that made
+    # them, reading only the header of each, so that a tree of mixed
+    # versions can be split into batches before any code is unmarshalled.
+    # Returns a dictionary mapping each version to a list of the files,
+    # in the order given; files with an unknown magic number, or that
+    # can't be read, are under None.  Archives are opened here and closed
+    # again, rather than kept by open_archive, so as not to share them
+    # with worker processes.
+    import zipfile
+    groups = {}
+    opened = {}
+    try:
+        for filename in filenames:
+            parts = None
+            if not os.path.exists(filename):
+                parts = split_archive(filename)
+            try:
+                if parts is None:
+                    f = open(filename, 'rb')
+                else:
+                    archive, member = parts
+                    if not opened.has_key(archive):
+                        opened[archive] = zipfile.ZipFile(archive)
+                    f = opened[archive].open(member)
+                try:
+                    header = f.read(8)
+                finally:
+                    f.close()
+            except (IOError, OSError, KeyError, zipfile.BadZipfile):
+                header = ''
+            version = None
+            if len(header) == 8 and magics.has_key(header[:4]):
+                version = magics[header[:4]][0]
+            groups.setdefault(version, []).append(filename)
+    finally:
+        for z in opened.values():
+            z.close()
+    return groups
+
+def decompile_file(filename, outname, cache=None, memo=None, profile=None,
+                   faults=None, sourcemap=None):
+    # Decompile a compiled module into a source file, or with no outname,
+    # return the source as a string.  With a list of faults, code objects
+    # that can't be decompiled are replaced by a commented disassembly
+    # and described in the list, as for the Decompiler; if that's the
+    # module itself, the whole file is.  A SourceMap is filled in for the
+    # source, and then the cache and memo aren't used, since the code
+    # objects found in them have no map.
+    import StringIO
+    if sourcemap is not None:
+        cache = memo = None
+    version, code = load_pyc(filename)
+    cursor = CodeCursor(code)
+    if outname is None:
+        out = StringIO.StringIO()
+    else:
+        makedirs(os.path.dirname(outname))
+        out = open(outname, 'w')
     try:
-        stdout = sys.stdout
-        sys.stdout = out
-        if 1:
-            import marshal
-            m = open(r'C:\Python20\Lib\code.pyc', 'rb')
-            magic = m.read(4)
-            if magic == '\207\306\015\012':
-                version = (2, 0)
-            elif magic == '\231N\015\012':
-                version = (1, 5, 2)
+        try:
+            if profile is None:
+                d = Decompiler(version, cache, memo, faults)
             else:
-                raise RuntimeError, 'unrecognised magic: %s' % `magic`
-            timestamp = m.read(4)
-            s = m.read()
-            code = marshal.loads(s)
-            m.close()
+                d = ProfilingDecompiler(version, cache, memo, faults, profile)
+            d.sourcemap = sourcemap
+            write_source(d.iterdecompile(cursor), out, sourcemap)
+        finally:
+            if outname is not None:
+                out.close()
+    except (KeyboardInterrupt, SystemExit, MemoryError):
+        if outname is not None:
+            os.remove(outname)
+        raise
+    except:
+        if faults is None:
+            # don't leave a partial file behind
+            if outname is not None:
+                os.remove(outname)
+            raise
+        error = describe_error()
+        del faults[:]
+        faults.append({
+            'name': code.co_name,
+            'line': code.co_firstlineno,
+            'offset': cursor.GetPosition(),
+            'size': len(code.co_code),
+            'error': error,
+            })
+        if sourcemap is not None:
+            sourcemap.clear()
+        text = format_source(fallback_lines(code, error))
+        if outname is None:
+            return text
+        out = open(outname, 'w')
+        try:
+            out.write(text)
+        finally:
+            out.close()
+        return
+    if outname is None:
+        return out.getvalue()
+
+def archive_inputs(archive, relname):
+    # The (filename, relative name) pairs of the compiled modules in a
+    # zip, egg or jar archive.  The filename is the path of the member
+    # below the archive, as for zipimport, and the relative name is the
+    # same below relname.
+    import zipfile
+    inputs = []
+    names = zipfile.ZipFile(archive).namelist()
+    names.sort()
+    for name in names:
+        if os.path.splitext(name)[1] in ('.pyc', '.pyo'):
+            member = string.replace(name, '/', os.sep)
+            inputs.append((os.path.join(archive, member),
+                           os.path.join(relname, member)))
+    return inputs
+
+def is_archive(filename):
+    import zipfile
+    return os.path.splitext(filename)[1] in ARCHIVES and \
+           os.path.isfile(filename) and zipfile.is_zipfile(filename)
+
+def find_inputs(args):
+    # Expand the command line arguments into a list of (filename,
+    # relative name) pairs.  Directories are searched for compiled
+    # modules, and the relative name is the path below the directory, or
+    # below the fixed part of a glob pattern, so the output mirrors the
+    # input tree.  Zip, egg and jar archives are searched like directories.
+    import glob
+    inputs = []
+    for arg in args:
+        if os.path.isdir(arg):
+            for dirpath, dirnames, filenames in os.walk(arg):
+                dirnames.sort()
+                filenames.sort()
+                for name in filenames:
+                    filename = os.path.join(dirpath, name)
+                    relname = filename[len(arg):].lstrip(os.sep)
+                    if os.path.splitext(name)[1] in ('.pyc', '.pyo'):
+                        inputs.append((filename, relname))
+                    elif is_archive(filename):
+                        inputs.extend(archive_inputs(filename, relname))
+        else:
+            root = arg
+            while glob.has_magic(root):
+                root = os.path.dirname(root)
+            filenames = glob.glob(arg)
+            filenames.sort()
+            if not filenames:
+                # let the worker report the missing file
+                filenames = [arg]
+            for filename in filenames:
+                if os.path.isdir(filename):
+                    inputs.extend(find_inputs([filename]))
+                elif is_archive(filename):
+                    inputs.extend(archive_inputs(filename, ''))
+                elif root == filename:
+                    inputs.append((filename, os.path.basename(filename)))
+                else:
+                    inputs.append((filename,
+                                   filename[len(root):].lstrip(os.sep)))
+    return inputs
+
+def one_per_module(inputs):
+    # The inputs without the .pyo files of modules whose .pyc file is
+    # there too, since both would be decompiled to the same .py file.
+    compiled = {}
+    for filename, relname in inputs:
+        stem, ext = os.path.splitext(relname)
+        if ext == '.pyc':
+            compiled[stem] = 1
+    return filter(lambda input, compiled=compiled:
+                  os.path.splitext(input[1])[1] != '.pyo' or
+                  not compiled.has_key(os.path.splitext(input[1])[0]),
+                  inputs)
+
+worker_caches = {}
+worker_memos = {}
+
+def batch_worker(job):
+    # Decompile one (filename, outname, options) job in a batch, returning
+    # the filename, None or a description of the failure, a dictionary
+    # of counts for the summary, and a dictionary of details: the stats
+    # of the file's HandlerProfile when profiling, and the faults that
+    # were isolated, if any.  Objects named by the options are made once
+    # per process, so the memo is shared by the files in a worker.  When
+    # the output is an archive, outname is the name of the member, and
+    # the source is returned in the details for the parent to write.
+    # When verifying, the verdict is returned in the details instead, and
+    # the cache holds verdicts rather than decompiled code objects.  With
+    # source maps, each is written to outname + '.map', or returned in
+    # the details with the source.
+    filename, outname, options = job
+    cache = None
+    if options.get('cache'):
+        cache = worker_caches.get(options['cache'])
+        if cache is None:
+            directory, maxsize = options['cache']
+            cache = DecompileCache(directory, maxsize)
+            worker_caches[options['cache']] = cache
+    memo = None
+    if options.get('memo'):
+        memo = worker_memos.get(options['memo'])
+        if memo is None:
+            memo = DecompileMemo(options['memo'])
+            worker_memos[options['memo']] = memo
+        hits, misses = memo.hits, memo.misses
+    profile = None
+    if options.get('profile'):
+        profile = HandlerProfile()
+    faults = None
+    if options.get('isolate'):
+        faults = []
+    sourcemap = None
+    if options.get('sourcemap'):
+        sourcemap = SourceMap()
+    details = {}
+    counts = {}
+    error = None
+    try:
+        if options.get('verify'):
+            verdict, cached = verify_file(filename, cache, memo)
+            details['verdict'] = verdict
+            counts[verdict['status']] = 1
+            if cached:
+                counts['cached verdicts'] = 1
+        elif options.get('archive'):
+            details['source'] = outname, decompile_file(filename, None, cache,
+                                                        memo, profile, faults,
+                                                        sourcemap)
+            if sourcemap is not None:
+                import StringIO
+                out = StringIO.StringIO()
+                sourcemap.dump(out)
+                details['sourcemap'] = outname + '.map', out.getvalue()
+        else:
+            decompile_file(filename, outname, cache, memo, profile, faults,
+                           sourcemap)
+            if sourcemap is not None:
+                out = open(outname + '.map', 'w')
+                try:
+                    sourcemap.dump(out)
+                finally:
+                    out.close()
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except:
+        exc_type, exc_value = sys.exc_info()[:2]
+        error = '%s: %s' % (getattr(exc_type, '__name__', exc_type),
+                            exc_value)
+        if options.get('verify'):
+            # the file is in the report all the same
+            details['verdict'] = unchecked_verdict('error', error)
+            counts['error'] = 1
+    if memo is not None:
+        counts['memo hits'] = memo.hits - hits
+        counts['memo misses'] = memo.misses - misses
+    if profile is not None:
+        details['profile'] = profile.stats
+    if faults:
+        counts['faults'] = len(faults)
+        details['faults'] = faults
+    return filename, error, counts, details
+
+def code_tree(code, qualname=''):
+    # Return a list of (qualified name, code object) pairs for a code
+    # object and the functions and classes nested in it, parents first.
+    # Lambdas are part of the code they are in.  A name used again in
+    # the same scope gets a #2, #3... suffix.
+    tree = [(qualname, code)]
+    seen = {}
+    for const in code.co_consts:
+        if type(const) is types.CodeType and const.co_name != '<lambda>':
+            name = const.co_name
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                name = '%s#%d' % (name, seen[name])
+            if qualname:
+                name = qualname + '.' + name
+            tree.extend(code_tree(const, name))
+    return tree
+
+def own_key(code):
+    # The parts of a code object compared by diff_code: its own
+    # instructions, constants and names, with line numbers relative to
+    # its first line.  Nested functions and classes are compared on
+    # their own, so only their names count here.
+    import marshal
+    base = code.co_firstlineno
+    consts = []
+    for const in code.co_consts:
+        if type(const) is not types.CodeType:
+            consts.append(const)
+        elif const.co_name == '<lambda>':
+            consts.append([const.co_firstlineno - base,
+                           code_key(const, base)])
         else:
-            version = (2, 0)
-            print f.func_code.co_names
-            print f.func_code.co_varnames
-            print f.func_code.co_consts
-            code = f.func_code
-        c = CodeCursor(code)
-        d = Decompiler(version)
-        d.decompile(c)
-        lines = d.getsource(0)
-        keys = lines.keys()
-        keys.sort()
-        for lineno in range(keys[0], keys[-1] + 1):
-            print '%4d %s' % (lineno, lines.get(lineno, ''))
-        print
-        sys.stdout = stdout
+            consts.append([const.co_name])
+    return marshal.dumps((relative_code(code, base), consts, code.co_names,
+                          code.co_varnames, code.co_argcount, code.co_flags))
+
+def unit_source(version, code, qualname):
+    # The source of one code object for diff_code, as a list of lines:
+    # a header for a function or class, and its body.
+    indent = 0
+    lines = []
+    if qualname:
+        indent = 1
+        name = string.split(qualname, '.')[-1]
+        if code.co_flags & NEWLOCALS:
+            argcount = code.co_argcount
+            params = list(code.co_varnames[:argcount])
+            if code.co_flags & VARARGS:
+                params.append('*' + code.co_varnames[argcount])
+                argcount = argcount + 1
+            if code.co_flags & KWARGS:
+                params.append('**' + code.co_varnames[argcount])
+            lines.append('def %s(%s):' % (name, string.join(params, ', ')))
+        else:
+            lines.append('class %s:' % name)
+    d = DiffDecompiler(version)
+    try:
+        d.decompile(CodeCursor(code))
+        body = d.getsource(indent)
+    except (KeyboardInterrupt, SystemExit, MemoryError):
+        raise
+    except:
+        body = {}
+        for lineno, line in fallback_lines(code, describe_error()).items():
+            body[lineno] = '    ' * indent + line
+    keys = body.keys()
+    keys.sort()
+    for lineno in keys:
+        lines.append(body[lineno])
+    return lines
+
+def diff_code(oldname, oldversion, old, newname, newversion, new):
+    # Return a unified diff, as a list of lines, of the functions and
+    # classes that differ between two module code objects.  Only those
+    # are decompiled, so the time taken depends on the size of the
+    # change rather than of the modules.
+    import difflib
+    oldtree = code_tree(old)
+    olds = {}
+    for qualname, code in oldtree:
+        olds[qualname] = code
+    news = {}
+    units = []
+    for qualname, code in code_tree(new):
+        news[qualname] = code
+        units.append(qualname)
+    for qualname, code in oldtree:
+        if not news.has_key(qualname):
+            units.append(qualname)
+    diff = []
+    for qualname in units:
+        oldcode = olds.get(qualname)
+        newcode = news.get(qualname)
+        if oldcode is not None and newcode is not None and \
+           own_key(oldcode) == own_key(newcode):
+            continue
+        oldlines = newlines = []
+        if oldcode is not None:
+            oldlines = unit_source(oldversion, oldcode, qualname)
+        if newcode is not None:
+            newlines = unit_source(newversion, newcode, qualname)
+        label = qualname or '<module>'
+        diff.extend(difflib.unified_diff(
+            oldlines, newlines, '%s:%s' % (oldname, label),
+            '%s:%s' % (newname, label), lineterm=''))
+    return diff
+
+def diff_files(oldname, newname, file):
+    # Write the diff_code of two compiled modules to a file, returning
+    # whether they differ.
+    oldversion, old = load_pyc(oldname)
+    newversion, new = load_pyc(newname)
+    diff = diff_code(oldname, oldversion, old, newname, newversion, new)
+    for line in diff:
+        file.write(line + '\n')
+    return len(diff) > 0
+
+# The construct a round trip mismatch is reported under, by the prefix
+# of the name of the first instruction that differs.  The first prefix
+# that matches is used.
+CONSTRUCTS = [
+    ('SET_LINENO', 'line numbers'),
+    ('SETUP_LOOP', 'loop'),
+    ('BREAK_LOOP', 'loop'),
+    ('FOR_LOOP', 'for loop'),
+    ('SETUP_EXCEPT', 'try/except'),
+    ('SETUP_FINALLY', 'try/finally'),
+    ('END_FINALLY', 'try'),
+    ('POP_BLOCK', 'try'),
+    ('JUMP_IF_', 'if or boolean operator'),
+    ('JUMP_', 'jump'),
+    ('COMPARE_OP', 'comparison'),
+    ('BUILD_CLASS', 'class'),
+    ('MAKE_', 'def or lambda'),
+    ('CALL_FUNCTION', 'call'),
+    ('BUILD_', 'display'),
+    ('IMPORT_', 'import'),
+    ('PRINT_', 'print'),
+    ('RAISE_', 'raise'),
+    ('RETURN_', 'return'),
+    ('EXEC_STMT', 'exec'),
+    ('DELETE_', 'del'),
+    ('INPLACE_', 'augmented assignment'),
+    ('STORE_', 'assignment'),
+    ('UNPACK_', 'assignment'),
+    ('DUP_TOP', 'assignment'),
+    ('ROT_', 'assignment'),
+    ('SLICE', 'slice'),
+    ('BINARY_', 'operator'),
+    ('UNARY_', 'operator'),
+    ('POP_TOP', 'expression statement'),
+    ('LOAD_', 'expression'),
+]
+
+def construct_name(opname):
+    for prefix, construct in CONSTRUCTS:
+        if opname[:len(prefix)] == prefix:
+            return construct
+    return 'other'
+
+def round_trip_compiler(version):
+    # The function compiling source to the bytecode of a version, as
+    # compile_source(source, filename), for the round trip of a verify,
+    # or None.  compile20 does it for 2.0; no Python that runs this
+    # module compiles 1.5.2 bytecode.
+    if tuple(version) == (2, 0):
+        import compile20
+        return compile20.compile_source
+    return None
+
+def decompiler_digest(cache={}):
+    # A hex digest of the source of this module, so that verdicts cached
+    # by one version of the decompiler are not used by another.
+    import hashlib
+    if not cache.has_key(__file__):
+        f = open(os.path.splitext(__file__)[0] + '.py', 'rb')
+        try:
+            cache[__file__] = hashlib.sha1(f.read()).hexdigest()
+        finally:
+            f.close()
+    return cache[__file__]
+
+def verify_key(version, code):
+    # The key of the verdict on a module in a DecompileCache: a digest of
+    # the decompiler, the version and the whole code object.
+    import hashlib, marshal
+    return hashlib.sha1(marshal.dumps(('verify', decompiler_digest(),
+                                       tuple(version), marshal.dumps(code)))
+                        ).hexdigest()
+
+def instruction_text(stream, k):
+    if k >= len(stream.offsets):
+        return 'end of code'
+    if stream.opcodes[k] >= HAVE_ARGUMENT:
+        return '%s %d' % (stream.opnames[k], stream.operands[k])
+    return stream.opnames[k]
+
+def code_mismatch(expected, found, name):
+    # Describe where the instructions of a recompiled code object first
+    # differ from those of the original.
+    old = InstructionStream(expected)
+    new = InstructionStream(found)
+    n = min(len(old.offsets), len(new.offsets))
+    k = 0
+    while k < n and old.opcodes[k] == new.opcodes[k] and \
+          old.operands[k] == new.operands[k]:
+        k = k + 1
+    if k < len(old.offsets):
+        offset = old.offsets[k]
+        opname = old.opnames[k]
+    else:
+        offset = len(expected.co_code)
+        opname = new.opnames[k]
+    addrs, linenos = line_table(expected)
+    return {
+        'name': name,
+        'construct': construct_name(opname),
+        'line': linenos[bisect.bisect_right(addrs, offset) - 1],
+        'offset': offset,
+        'expected': instruction_text(old, k),
+        'found': instruction_text(new, k),
+        }
+
+def compare_key(value):
+    # A key that two constants share only if a round trip may give one
+    # for the other: their type and value, so that 1 and 1.0 differ, with
+    # floats and complex numbers by their repr, since 0.0 == -0.0, and
+    # tuples and code objects by the keys of what they hold.  Unlike the
+    # bytes from marshal, it doesn't tell an interned string from another.
+    kind = type(value)
+    if kind is types.TupleType:
+        return kind, tuple(map(compare_key, value))
+    if kind is types.FloatType or kind is types.ComplexType:
+        return kind, repr(value)
+    if kind is types.CodeType:
+        return (kind, value.co_code, compare_key(value.co_consts),
+                value.co_names, value.co_varnames, value.co_argcount,
+                value.co_flags)
+    return kind, value
+
+def compare_code(expected, found, qualname, mismatches, faulted):
+    # Append to mismatches the first difference between a code object and
+    # the one compiled from its decompiled source, and do the same for
+    # the code objects nested in them, which are paired in order.  Code
+    # objects that were replaced by a disassembly, listed in faulted by
+    # (name, first line), have been reported already and are skipped.
+    if faulted.has_key((expected.co_name, expected.co_firstlineno)):
+        return
+    name = qualname or '<module>'
+    mismatch = None
+    if expected.co_code != found.co_code:
+        mismatch = code_mismatch(expected, found, name)
+    else:
+        for attr, construct in (('co_consts', 'constants'),
+                                ('co_names', 'names'),
+                                ('co_varnames', 'names'),
+                                ('co_argcount', 'def or lambda'),
+                                ('co_flags', 'def or lambda')):
+            old = getattr(expected, attr)
+            new = getattr(found, attr)
+            if attr == 'co_consts':
+                # nested code objects are compared below
+                old = map(compare_key, filter(
+                    lambda c: type(c) is not types.CodeType, old))
+                new = map(compare_key, filter(
+                    lambda c: type(c) is not types.CodeType, new))
+            if old != new:
+                mismatch = {
+                    'name': name,
+                    'construct': construct,
+                    'line': expected.co_firstlineno,
+                    'offset': None,
+                    'expected': attr,
+                    'found': attr,
+                    }
+                break
+    if mismatch is not None:
+        mismatches.append(mismatch)
+    olds = filter(lambda c: type(c) is types.CodeType, expected.co_consts)
+    news = filter(lambda c: type(c) is types.CodeType, found.co_consts)
+    if len(olds) != len(news):
+        mismatches.append({
+            'name': name,
+            'construct': 'def or lambda',
+            'line': expected.co_firstlineno,
+            'offset': None,
+            'expected': '%d nested code objects' % len(olds),
+            'found': '%d nested code objects' % len(news),
+            })
+        return
+    for old, new in map(None, olds, news):
+        if qualname:
+            nested = qualname + '.' + old.co_name
+        else:
+            nested = old.co_name
+        compare_code(old, new, nested, mismatches, faulted)
+
+def code_count(code):
+    # the number of code objects in a code object, itself included
+    count = 1
+    for const in code.co_consts:
+        if type(const) is types.CodeType:
+            count = count + code_count(const)
+    return count
+
+def unchecked_verdict(status, error, code_objects=0):
+    # the verdict on a file that could not be checked, 'skipped' or
+    # 'error', with the reason in error
+    return {
+        'status': status,
+        'code_objects': code_objects,
+        'mismatches': [],
+        'error': error,
+        }
+
+def verify_code(filename, version, code, memo=None):
+    # Decompile a module, compile the source again as the version that
+    # compiled the module did, and compare the two, returning the
+    # verdict: a dictionary of the status ('ok', 'mismatch', 'skipped'
+    # or 'error'), the number of code objects and a list of mismatches,
+    # each naming the code object, the construct, the line and offset in
+    # the original, and the expected and found instructions.  Code
+    # objects that can't be decompiled are mismatches of their own, under
+    # 'decompile error'.  A version with no compiler for the round trip
+    # is skipped.
+    compile_source = round_trip_compiler(version)
+    if compile_source is None:
+        return unchecked_verdict('skipped',
+                                 'Python %s bytecode can not be verified' %
+                                 version_name(version), code_count(code))
+    verdict = {
+        'status': 'ok',
+        'code_objects': code_count(code),
+        'mismatches': [],
+        'error': None,
+        }
+    faults = []
+    source = decompile_file(filename, None, None, memo, None, faults)
+    mismatches = verdict['mismatches']
+    faulted = {}
+    for fault in faults:
+        faulted[(fault['name'], fault['line'])] = 1
+        mismatches.append({
+            'name': fault['name'],
+            'construct': 'decompile error',
+            'line': fault['line'],
+            'offset': fault['offset'],
+            'expected': '',
+            'found': fault['error'],
+            })
+    try:
+        recompiled = compile_source(source, filename)
+    except SyntaxError, exc:
+        mismatches.append({
+            'name': '<module>',
+            'construct': 'syntax error',
+            'line': exc.lineno,
+            'offset': None,
+            'expected': '',
+            'found': describe_error(),
+            })
+    else:
+        compare_code(code, recompiled, '', mismatches, faulted)
+    if mismatches:
+        verdict['status'] = 'mismatch'
+    return verdict
+
+def verify_file(filename, cache=None, memo=None):
+    # Return the verify_code verdict on a compiled module, and whether it
+    # came from the cache.  Verdicts are cached by verify_key, so a module
+    # is only checked again when it or the decompiler has changed.  Files
+    # of any version are read, so that each one gets a verdict.
+    version, code = load_pyc(filename, handled=0)
+    key = None
+    if cache is not None and round_trip_compiler(version) is not None:
+        key = verify_key(version, code)
+        verdict = cache.get(key)
+        if verdict is not None:
+            return verdict, 1
+    verdict = verify_code(filename, version, code, memo)
+    if key is not None:
+        cache.put(key, verdict)
+    return verdict, 0
+
+def verify_report(verdicts):
+    # The report written by --verify: the verdict on each file, the
+    # mismatches of all files grouped by construct, and the number of
+    # files with each status.
+    files = {}
+    constructs = {}
+    totals = {}
+    for filename, verdict in verdicts.items():
+        status = verdict['status']
+        totals[status] = totals.get(status, 0) + 1
+        files[filename] = {
+            'status': status,
+            'code_objects': verdict['code_objects'],
+            'mismatches': len(verdict['mismatches']),
+            'error': verdict['error'],
+            }
+        for mismatch in verdict['mismatches']:
+            entry = mismatch.copy()
+            del entry['construct']
+            entry['file'] = filename
+            constructs.setdefault(mismatch['construct'], []).append(entry)
+    for entries in constructs.values():
+        entries.sort(lambda a, b: cmp((a['file'], a['line'], a['name']),
+                                      (b['file'], b['line'], b['name'])))
+    return {
+        'files': files,
+        'constructs': constructs,
+        'totals': totals,
+        }
+
+usage ="""usage: decompile.py [options] file|dir|glob ...
+       decompile.py --diff old.pyc new.pyc
+
+Decompile compiled modules (.pyc and .pyo files) into .py files.
+Directories and zip, egg or jar archives are searched recursively, and
+the output tree in outdir (default: the current directory) mirrors the
+input tree, with one .py file for each module: where a module has both
+a .pyc and a .pyo file, the .pyc file is decompiled.  Files are shared
+among a pool of processes, by default one per CPU.  Python 1.5.2 and
+2.0 bytecode can be decompiled, by any Python from 2.6 on.
+
+  -o outdir           write the output tree under outdir, or into a new
+                      archive if outdir ends in .zip, .egg or .jar
+  -j processes        number of worker processes
+  --cache=dir         keep decompiled code objects in a cache directory
+  --cache-size=mb     limit the cache size (default 256 megabytes)
+  --memo-size=n       remember up to n decompiled code objects in each
+                      process (default 1024, 0 to turn off)
+  --profile=file      write the calls and times of each opcode handler,
+                      for each file and for the batch, to file
+  --faults=file       write the code objects that could not be
+                      decompiled in each file to file, as JSON
+  --strict            fail a whole file if any part of it can't be
+                      decompiled, rather than writing a disassembly
+  --versions          list the files by the version of Python that
+                      compiled them, reading only their headers
+  --source-maps       write a source map beside each .py file, in a .map
+                      file, mapping the bytecode offsets of each code
+                      object to lines and columns of the source; the
+                      cache and memo are not used
+  --verify=file       instead of writing source, check that the source of
+                      each file compiles back to the same code objects,
+                      and write the mismatches, grouped by construct, to
+                      file as JSON; with --cache, verdicts are cached
+
+With --diff, write a unified diff of the functions and classes that
+differ between two compiled modules, decompiling only those, and exit
+with status 1 if there are any.
+
+With no arguments, run the self test.
+"""
+
+def main(args):
+    import getopt
+    try:
+        opts, args = getopt.getopt(args, 'ho:j:', ['cache=', 'cache-size=',
+                                                  'memo-size=', 'profile=',
+                                                  'faults=', 'strict',
+                                                  'diff', 'versions',
+                                                  'verify=', 'source-maps'])
+    except getopt.error, msg:
+        sys.stderr.write('%s\n%s' % (msg, usage))
+        return 2
+    outdir = os.curdir
+    processes = None
+    cachedir = None
+    cachesize = 256
+    profilename = faultsname = verifyname = None
+    options = {'memo': 1024, 'isolate': 1}
+    sniff = diff = 0
+    for opt, value in opts:
+        if opt == '-h':
+            sys.stdout.write(usage)
+            return 0
+        elif opt == '-o':
+            outdir = value
+        elif opt == '-j':
+            processes = int(value)
+        elif opt == '--cache':
+            cachedir = os.path.abspath(value)
+        elif opt == '--cache-size':
+            cachesize = float(value)
+        elif opt == '--memo-size':
+            options['memo'] = int(value)
+        elif opt == '--profile':
+            profilename = value
+            options['profile'] = 1
+        elif opt == '--faults':
+            faultsname = value
+        elif opt == '--strict':
+            options['isolate'] = 0
+        elif opt == '--versions':
+            sniff = 1
+        elif opt == '--verify':
+            verifyname = value
+            options['verify'] = 1
+        elif opt == '--source-maps':
+            options['sourcemap'] = 1
+        elif opt == '--diff':
+            diff = 1
+    if diff:
+        if len(args) != 2:
+            sys.stderr.write('--diff needs two files\n%s' % usage)
+            return 2
+        return diff_files(args[0], args[1], sys.stdout) and 1 or 0
+    if cachedir is not None:
+        options['cache'] = cachedir, int(cachesize * 1024 * 1024)
+    if not args:
+        test()
+        return 0
+    import itertools
+    outarchive = None
+    if verifyname is None and os.path.splitext(outdir)[1] in ARCHIVES:
+        import zipfile
+        options['archive'] = 1
+        outarchive = zipfile.ZipFile(outdir, 'w', zipfile.ZIP_DEFLATED)
+    inputs = find_inputs(args)
+    if verifyname is None and not sniff:
+        inputs = one_per_module(inputs)
+    relnames = {}
+    for filename, relname in inputs:
+        relnames[filename] = relname
+    groups = sniff_versions(map(lambda input: input[0], inputs))
+    versions = groups.keys()
+    versions.sort()
+    if sniff:
+        for version in versions:
+            sys.stdout.write('%s: %d files\n' % (version_name(version),
+                                                 len(groups[version])))
+            for filename in groups[version]:
+                sys.stdout.write('    %s\n' % filename)
+        return 0
+    # the jobs are batched by version, so the files a worker takes
+    # together, and the code in its memo, are mostly of one version
+    jobs = []
+    for filename in reduce(lambda a, b: a + b,
+                           map(groups.get, versions), []):
+        relname = relnames[filename]
+        outname = os.path.splitext(relname)[0] + '.py'
+        if verifyname is not None:
+            outname = None
+        elif outarchive is None:
+            outname = os.path.join(outdir, outname)
+        else:
+            outname = string.replace(outname, os.sep, '/')
+        jobs.append((filename, outname, options))
+    start = time.time()
+    pool = None
+    if processes == 1 or len(jobs) <= 1:
+        results = itertools.imap(batch_worker, jobs)
+    else:
+        import multiprocessing
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(processes)
+        # large chunks, so that each worker takes many files; the results
+        # arrive in order, so an output archive is written as they do
+        chunksize = max(1, len(jobs) / (processes * 4))
+        results = pool.imap(batch_worker, jobs, chunksize)
+    failures = []
+    totals = {}
+    profiles = []
+    faults = {}
+    verdicts = {}
+    try:
+        for filename, error, counts, details in results:
+            if details.has_key('source'):
+                name, source = details['source']
+                outarchive.writestr(name, source)
+            if details.has_key('sourcemap'):
+                name, text = details['sourcemap']
+                outarchive.writestr(name, text)
+            if error is not None:
+                failures.append((filename, error))
+                sys.stderr.write('%s: %s\n' % (filename, error))
+            for name, count in counts.items():
+                totals[name] = totals.get(name, 0) + count
+            if details.has_key('profile'):
+                profiles.append((filename, details['profile']))
+            if details.has_key('faults'):
+                faults[filename] = details['faults']
+            if details.has_key('verdict'):
+                verdicts[filename] = details['verdict']
     finally:
-        out.close()
-    sys.stderr.write('DONE\n')
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if outarchive is not None:
+            outarchive.close()
+    elapsed = time.time() - start
+    rate = len(jobs) / max(elapsed, 1e-6)
+    sys.stderr.write('%d files in %.2fs (%.1f files/s), %d failed\n' %
+                     (len(jobs), elapsed, rate, len(failures)))
+    names = totals.keys()
+    if names:
+        names.sort()
+        sys.stderr.write('%s\n' % string.join(map(
+            lambda name, totals=totals: '%s: %d' % (name, totals[name]),
+            names), ', '))
+    if profilename is not None:
+        profiles.sort()
+        batch = HandlerProfile()
+        f = open(profilename, 'w')
+        try:
+            for filename, stats in profiles:
+                if not stats:
+                    continue
+                profile = HandlerProfile()
+                profile.stats = stats
+                profile.report(f, filename)
+                batch.merge(stats)
+            batch.report(f, 'all %d files' % len(profiles))
+        finally:
+            f.close()
+    if faultsname is not None:
+        import json
+        f = open(faultsname, 'w')
+        try:
+            json.dump(faults, f, indent=1, sort_keys=True)
+            f.write('\n')
+        finally:
+            f.close()
+    if verifyname is not None:
+        import json
+        report = verify_report(verdicts)
+        f = open(verifyname, 'w')
+        try:
+            json.dump(report, f, indent=1, sort_keys=True)
+            f.write('\n')
+        finally:
+            f.close()
+        if report['totals'].get('mismatch'):
+            return 1
+    return failures and 1 or 0
 
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
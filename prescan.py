@@ -0,0 +1,334 @@
+#
+# prescan.py - bytecode scans of whole corpora with NumPy
+#
+# For statistics over a corpus, and for indexes built before decompiling,
+# only the instructions are needed: where each one starts, the opcode
+# histogram, the jump targets and the line tables.  A Prescan finds these
+# for many code objects at once, with the co_code of all of them viewed
+# as one uint8 array, so that the work is done by NumPy over whole
+# arrays rather than by a Python loop over each byte.
+#
+# Instructions are one byte, or three for an opcode at or above
+# HAVE_ARGUMENT, as in Python 1.5 to 2.7, and an EXTENDED_ARG prefix
+# supplies the high 16 bits of the next operand.  Since the width of an
+# instruction depends on its first byte, the starts are found by pointer
+# doubling: every byte gets the offset of the instruction that would
+# follow an instruction starting there, and the starts reached from the
+# start of each code object are marked in log2(length) whole-array steps.
+#
+# Prescan.Stream gives the instructions of one code object in the same
+# arrays as a decompile.InstructionStream, and LineTable and JumpTargets
+# its line table and jumps as decompile.line_table and jump_targets do,
+# so a PrescannedCursor can decompile without decoding again:
+#
+#     scan = prescan.Prescan(prescan.code_objects(code))
+#     d = decompile.Decompiler(version)
+#     d.decompile(prescan.PrescannedCursor(code, scan))
+#
+# Run as a script, it prints the totals and opcode histogram of the
+# compiled modules named on the command line, skipping those of a
+# version no Decompiler handles:
+#
+#     python prescan.py file|dir|glob ...
+#
+
+import array, string, sys, types
+
+import numpy
+
+import decompile
+
+def code_objects(code):
+    # a code object and the code objects nested in it, parents first
+    codes = [code]
+    for const in code.co_consts:
+        if type(const) is types.CodeType:
+            codes.extend(code_objects(const))
+    return codes
+
+def segments(sizes):
+    # the number of the segment each item is in, for segments of the
+    # given sizes laid end to end
+    return numpy.repeat(numpy.arange(len(sizes)), sizes)
+
+def opcode_table(opcodes):
+    # a boolean array, indexed by opcode, true for the given opcodes
+    table = numpy.zeros(256, bool)
+    table[list(opcodes)] = True
+    return table
+
+class Stream:
+
+    # The instructions of one code object from a Prescan, in the arrays
+    # of a decompile.InstructionStream, which DecodedCodeCursor and
+    # ControlFlow use.
+
+    def __init__(self, offsets, opcodes, operands, nexts, index):
+        self.offsets = array.array('i', offsets.astype(numpy.intc).tostring())
+        self.opcodes = array.array('B', opcodes.astype(numpy.uint8).tostring())
+        self.operands = array.array('l',
+                                    operands.astype(numpy.int_).tostring())
+        self.nexts = array.array('i', nexts.astype(numpy.intc).tostring())
+        self.opnames = map(decompile.opname.__getitem__, self.opcodes)
+        self.index = array.array('i', index.astype(numpy.intc).tostring())
+
+class Prescan:
+
+    # The instructions of a list of code objects, found together.  The
+    # arrays hold the instructions of all the code objects in order, and
+    # the offsets in them are byte offsets in the co_code of the code
+    # object each instruction belongs to:
+    #
+    #     offsets, opcodes, operands, nexts
+    #         as for InstructionStream, with EXTENDED_ARG applied
+    #     code        the number of the code object of each instruction
+    #     targets     the offset each instruction jumps to, or -1
+    #     first       first[n] is the index of the first instruction of
+    #                 code object n, and first[-1] the number of them
+    #     histogram   the number of each opcode, EXTENDED_ARG included
+    #
+    # and the line tables, as from decompile.line_table, are in addrs and
+    # lines, with linefirst indexing them as first does the instructions.
+
+    def __init__(self, codes):
+        self.codes = codes
+        self.numbers = {}
+        for n in range(len(codes)):
+            self.numbers[id(codes[n])] = n
+        self.scan_instructions()
+        self.scan_lines()
+
+    def scan_instructions(self):
+        codes = self.codes
+        sizes = numpy.array(map(lambda co: len(co.co_code), codes), numpy.int64)
+        ends = numpy.cumsum(sizes)
+        bases = ends - sizes
+        self.bases = bases
+        data = numpy.fromstring(
+            string.join(map(lambda co: co.co_code, codes), ''), numpy.uint8)
+        n = len(data)
+        segend = numpy.repeat(ends, sizes)
+        width = numpy.where(data >= decompile.HAVE_ARGUMENT, 3, 1)
+        follow = numpy.arange(n, dtype=numpy.int64) + width
+        # An instruction would run past the end of its code object only
+        # if the code was truncated, which decoding it reports below.
+        # Each chain of instructions ends at the sentinel n, rather than
+        # going on into the next code object.
+        jump = numpy.empty(n + 1, numpy.int64)
+        jump[:n] = numpy.where(follow >= segend, n, follow)
+        jump[n] = n
+        marked = numpy.zeros(n + 1, bool)
+        marked[bases[sizes > 0]] = True
+        count = 0
+        while 1:
+            # after step t, each instruction up to 2**(t+1) - 1 after the
+            # start of its code object is marked, and jump skips 2**(t+1)
+            marked[jump[marked]] = True
+            new = numpy.count_nonzero(marked)
+            if new == count:
+                break
+            count = new
+            jump = jump[jump]
+        starts = numpy.flatnonzero(marked[:n])
+        ops = data[starts]
+        self.histogram = numpy.bincount(ops, minlength=256)
+        hasarg = ops >= decompile.HAVE_ARGUMENT
+        truncated = hasarg & (starts + 3 > segend[starts])
+        assert not truncated.any(), \
+               `starts[truncated][:1] - bases[segments(sizes)[starts][:1]]`
+        argat = starts[hasarg]
+        raw = numpy.zeros(len(starts), numpy.int64)
+        raw[hasarg] = data[argat + 1] + (data[argat + 2].astype(numpy.int64)
+                                         << 8)
+        seg = numpy.searchsorted(ends, starts, 'right')
+        extended = ops == decompile.opmap['EXTENDED_ARG']
+        # an EXTENDED_ARG applies to the instruction after it, which may
+        # itself be one
+        prefixed = numpy.zeros(len(starts), bool)
+        prefixed[1:] = extended[:-1] & (seg[1:] == seg[:-1])
+        operands = raw.copy()
+        while 1:
+            shifted = raw.copy()
+            shifted[1:] = raw[1:] + (operands[:-1] << 16)
+            update = numpy.where(prefixed, shifted, raw)
+            if (update == operands).all():
+                break
+            operands = update
+        real = ~extended
+        offsets = starts[real]
+        self.code = seg[real]
+        self.opcodes = ops[real]
+        self.operands = operands[real]
+        width = numpy.where(self.opcodes >= decompile.HAVE_ARGUMENT, 3, 1)
+        nexts = offsets + width
+        # the start of any prefix: the end of the instruction before, in
+        # the same code object, or the start of the code object
+        self.prefixes = numpy.empty(len(offsets), numpy.int64)
+        self.prefixes[:] = bases[self.code]
+        same = self.code[1:] == self.code[:-1]
+        self.prefixes[1:][same] = nexts[:-1][same]
+        base = bases[self.code]
+        self.offsets = offsets - base
+        self.nexts = nexts - base
+        self.prefixes = self.prefixes - base
+        self.first = numpy.searchsorted(self.code, numpy.arange(len(codes) + 1))
+        relative = opcode_table(decompile.hasjrel)[self.opcodes]
+        absolute = opcode_table(decompile.hasjabs)[self.opcodes]
+        self.targets = numpy.where(relative, self.nexts + self.operands,
+                                   numpy.where(absolute, self.operands, -1))
+
+    def scan_lines(self):
+        # Each co_lnotab is a list of (address increment, line increment)
+        # byte pairs.  The running sums, taken over all the tables at once
+        # and then made relative to each table, give the addresses and
+        # lines, and where several pairs give the same address, the last
+        # one is kept.
+        codes = self.codes
+        tables = numpy.fromstring(
+            string.join(map(lambda co: co.co_lnotab, codes), ''), numpy.uint8)
+        pairs = numpy.array(map(lambda co: len(co.co_lnotab) / 2, codes),
+                            numpy.int64)
+        firstlines = numpy.array(map(lambda co: co.co_firstlineno, codes),
+                                 numpy.int64)
+        # each table gets a (0, 0) pair in front, for its first line
+        counts = pairs + 1
+        ends = numpy.cumsum(counts)
+        starts = ends - counts
+        seg = segments(counts)
+        addrs = numpy.zeros(ends[-1], numpy.int64)
+        lines = numpy.zeros(ends[-1], numpy.int64)
+        inside = numpy.ones(ends[-1], bool)
+        inside[starts] = False
+        addrs[inside] = tables[0::2]
+        lines[inside] = tables[1::2]
+        addrs = numpy.cumsum(addrs)
+        lines = numpy.cumsum(lines)
+        addrs = addrs - addrs[starts][seg]
+        lines = lines - lines[starts][seg] + firstlines[seg]
+        keep = numpy.ones(ends[-1], bool)
+        keep[:-1] = (addrs[1:] != addrs[:-1]) | (seg[1:] != seg[:-1])
+        self.addrs = addrs[keep]
+        self.lines = lines[keep]
+        self.linefirst = numpy.searchsorted(seg[keep],
+                                            numpy.arange(len(codes) + 1))
+
+    def Number(self, code):
+        # the number of a code object in the scan
+        return self.numbers[id(code)]
+
+    def Instructions(self, code):
+        # the slice of the instruction arrays for a code object
+        n = self.Number(code)
+        return slice(self.first[n], self.first[n + 1])
+
+    def Stream(self, code):
+        # the instructions of a code object, as an InstructionStream
+        span = self.Instructions(code)
+        offsets = self.offsets[span]
+        index = numpy.empty(len(code.co_code) + 1, numpy.int64)
+        index[:] = -1
+        k = numpy.arange(len(offsets))
+        index[self.prefixes[span]] = k
+        index[offsets] = k
+        return Stream(offsets, self.opcodes[span], self.operands[span],
+                      self.nexts[span], index)
+
+    def LineTable(self, code):
+        # the (addrs, lines) arrays of decompile.line_table for a code
+        # object
+        n = self.Number(code)
+        span = slice(self.linefirst[n], self.linefirst[n + 1])
+        return (array.array('i', self.addrs[span].astype(numpy.intc).tostring()),
+                array.array('i', self.lines[span].astype(numpy.intc).tostring()))
+
+    def JumpTargets(self, code):
+        # the (offsets, targets) arrays of decompile.jump_targets for a
+        # code object
+        span = self.Instructions(code)
+        targets = self.targets[span]
+        jumps = targets >= 0
+        return (array.array('i', self.offsets[span][jumps].astype(
+                    numpy.intc).tostring()),
+                array.array('i', targets[jumps].astype(numpy.intc).tostring()))
+
+    def Histogram(self, code=None):
+        # the number of each opcode, EXTENDED_ARG excepted, in a code
+        # object, or including EXTENDED_ARG in all of them
+        if code is None:
+            return self.histogram
+        return numpy.bincount(self.opcodes[self.Instructions(code)],
+                              minlength=256)
+
+class PrescannedCursor(decompile.DecodedCodeCursor):
+
+    # A DecodedCodeCursor reading the instructions, line table and jumps
+    # of a code object, and of the code objects nested in it, from a
+    # Prescan.
+
+    def __init__(self, code, scan):
+        decompile.DecodedCodeCursor.__init__(self, code, scan.Stream(code),
+                                             scan.LineTable(code))
+        self.scan = scan
+
+    def NestedCursor(self, code):
+        return self.__class__(code, self.scan)
+
+    def Flow(self):
+        if self.flow is None:
+            self.flow = decompile.ControlFlow(self.code, self.stream,
+                                              self.scan.JumpTargets(self.code))
+        return self.flow
+
+def main(args):
+    if not args:
+        sys.stderr.write('usage: prescan.py file|dir|glob ...\n')
+        return 2
+    # only versions a Decompiler handles share the opcode tables used
+    # here; the headers are sniffed first so the others aren't read
+    filenames = map(lambda input: input[0], decompile.find_inputs(args))
+    versions = {}
+    for version, group in decompile.sniff_versions(filenames).items():
+        for filename in group:
+            versions[filename] = version
+    handled = {}
+    for version, handlers in decompile.magics.values():
+        if handlers is not None:
+            handled[version] = 1
+    codes = []
+    failed = 0
+    for filename in filenames:
+        version = versions[filename]
+        if version is not None and not handled.has_key(version):
+            sys.stderr.write('%s: skipped, Python %s bytecode\n' % (
+                filename, decompile.version_name(version)))
+            continue
+        try:
+            version, code = decompile.load_pyc(filename)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            exc_type, exc_value = sys.exc_info()[:2]
+            sys.stderr.write('%s: %s: %s\n' % (
+                filename, getattr(exc_type, '__name__', exc_type), exc_value))
+            failed = failed + 1
+            continue
+        codes.extend(code_objects(code))
+    if not codes:
+        return 1
+    scan = Prescan(codes)
+    size = reduce(lambda a, b: a + b, map(lambda co: len(co.co_code), codes))
+    print '%d code objects, %d bytes, %d instructions, %d jumps, %d lines' % (
+        len(codes), size, len(scan.opcodes),
+        numpy.count_nonzero(scan.targets >= 0),
+        len(scan.addrs))
+    histogram = scan.Histogram()
+    order = numpy.argsort(-histogram, kind='mergesort')
+    for op in order:
+        if not histogram[op]:
+            break
+        print '%-20s %10d %6.2f%%' % (decompile.opname[op], histogram[op],
+                                      histogram[op] * 100.0 / histogram.sum())
+    return failed and 1 or 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,28 @@
+def kind(x):
+    if x is None:
+        return 'none'
+    elif type(x) == type(0):
+        if x < 0:
+            return 'negative'
+        elif x == 0:
+            return 'zero'
+        return 'positive'
+    elif type(x) == type(''):
+        return 'string'
+    else:
+        return 'other'
+
+def classify(items):
+    result = []
+    for item in items:
+        if not item:
+            result.append(0)
+        elif item > 100: result.append(3)
+        elif item > 10: result.append(2)
+        else: result.append(1)
+    return result
+
+if __name__ == '__main__':
+    print classify([0, 5, 50, 500])
+elif __name__ == 'elif':
+    pass
@@ -0,0 +1,40 @@
+import os, sys
+from string import join
+
+class Walker:
+    def __init__(self, top, skip=None):
+        self.top = top
+        self.skip = skip or []
+        self.__seen = {}
+
+    def walk(self, visit):
+        stack = [self.top]
+        while stack:
+            path = stack[-1]
+            del stack[-1]
+            try:
+                names = os.listdir(path)
+            except os.error, why:
+                sys.stderr.write('%s: %s\n' % (path, why))
+                continue
+            for name in names:
+                if name in self.skip:
+                    continue
+                full = os.path.join(path, name)
+                if os.path.isdir(full):
+                    if not self.__seen.has_key(full):
+                        self.__seen[full] = 1
+                        stack.append(full)
+                else:
+                    try:
+                        visit(full)
+                    finally:
+                        self.count = self.count + 1
+        return self.count
+
+def sizes(top):
+    total = {}
+    def visit(name, total=total):
+        total[name] = os.path.getsize(name)
+    Walker(top, ['CVS']).walk(visit)
+    return map(lambda item: '%s %d' % item, total.items())
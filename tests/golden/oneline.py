@@ -0,0 +1,9 @@
+a = 1; b = 2; c = a + b
+if a: b = 3; c = 4
+else: d = 5
+for i in range(3): x = i; y = x * 2
+while a > 0: a = a - 1; b = b + 1
+def f(x): return x * 2
+try: g = f(a)
+except ValueError: g = None
+print a; print c
@@ -0,0 +1,103 @@
+#
+# test_archive.py - compiled modules read from zip and egg archives
+#
+# 2.0 modules are written into an egg, which is searched in place like
+# a directory, and decompiled into a tree or into another archive.
+#
+
+import os, shutil, string, StringIO, sys, tempfile, unittest, zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+MODULES = [
+    ('pkg/__init__.pyc', 'x = 1\n'),
+    ('pkg/mod.pyc', 'def f(a):\n    return a + 1\n'),
+    ('pkg/mod.pyo', 'def f(a):\n    return a + 1\n'),
+    ('README.txt', None),
+]
+
+class ArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.egg = os.path.join(self.directory, 'lib', 'site.egg')
+        os.mkdir(os.path.dirname(self.egg))
+        z = zipfile.ZipFile(self.egg, 'w')
+        for name, source in MODULES:
+            if source is None:
+                z.writestr(name, 'not a module\n')
+            else:
+                code = compile20.compile_source(source, name)
+                z.writestr(name, compile20.MAGIC + '\0\0\0\0' +
+                           compile20.dumps(code))
+        z.close()
+
+    def tearDown(self):
+        for archive in decompile.archives.keys():
+            if archive[:len(self.directory)] == self.directory:
+                decompile.archives[archive].close()
+                del decompile.archives[archive]
+        shutil.rmtree(self.directory)
+
+    def member(self, name):
+        return os.path.join(self.egg, string.replace(name, '/', os.sep))
+
+    def test_split(self):
+        self.assertEqual(decompile.split_archive(self.member('pkg/mod.pyc')),
+                         (self.egg, 'pkg/mod.pyc'))
+        self.assertEqual(decompile.split_archive(self.egg), None)
+        self.assertEqual(decompile.split_archive(
+            os.path.join(self.directory, 'missing', 'mod.pyc')), None)
+
+    def test_inputs(self):
+        # the archive is searched like a directory, by name or when it's
+        # found in one
+        names = ['pkg/__init__.pyc', 'pkg/mod.pyc', 'pkg/mod.pyo']
+        expected = map(lambda name, self=self:
+                       (self.member(name), string.replace(name, '/', os.sep)),
+                       names)
+        self.assertEqual(decompile.find_inputs([self.egg]), expected)
+        found = decompile.find_inputs([self.directory])
+        self.assertEqual(map(lambda input: input[0], found),
+                         map(lambda input: input[0], expected))
+        self.assertEqual(found[0][1], os.path.join('lib', 'site.egg',
+                                                   'pkg', '__init__.pyc'))
+        # the .pyo of a module with a .pyc is left out
+        self.assertEqual(decompile.one_per_module(found), found[:2])
+
+    def test_member(self):
+        # a member is loaded, sniffed and decompiled in place
+        filename = self.member('pkg/mod.pyc')
+        version, code = decompile.load_pyc(filename)
+        self.assertEqual(version, (2, 0))
+        self.assertEqual(code.co_filename, 'pkg/mod.pyc')
+        self.assertEqual(decompile.decompile_file(filename, None),
+                         'def f(a):\n    return a + 1\n')
+        groups = decompile.sniff_versions([filename,
+                                           self.member('pkg/missing.pyc')])
+        self.assertEqual(groups, {(2, 0): [filename],
+                                  None: [self.member('pkg/missing.pyc')]})
+
+    def test_output_archive(self):
+        # with -o naming an archive, the tree is written into it
+        outname = os.path.join(self.directory, 'out.zip')
+        stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+        try:
+            status = decompile.main(['-o', outname, '-j', '1', self.egg])
+        finally:
+            sys.stderr = stderr
+        self.assertEqual(status, 0)
+        z = zipfile.ZipFile(outname)
+        try:
+            names = z.namelist()
+            names.sort()
+            self.assertEqual(names, ['pkg/__init__.py', 'pkg/mod.py'])
+            self.assertEqual(z.read('pkg/__init__.py'), 'x = 1\n')
+        finally:
+            z.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#
+# test_cache.py - DecompileCache, the on-disk cache of code objects
+#
+# A 2.0 module is decompiled through a cache, and decompiled again from
+# it.  Eviction is run by hand, with the modification times of the
+# entries set, so the order of use is known.
+#
+
+import os, shutil, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+SOURCE = '''\
+def f(a, b=1):
+    return a + b
+
+class C:
+    def m(self):
+        return f(self)
+'''
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cachedir = os.path.join(self.directory, 'cache')
+        self.filename = os.path.join(self.directory, 'module.pyc')
+        self.code = compile20.compile_source(SOURCE, 'module.py')
+        compile20.write_pyc(self.code, self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def entries(self):
+        names = []
+        for dirpath, dirnames, filenames in os.walk(self.cachedir):
+            names.extend(filter(lambda name: name != 'lock', filenames))
+        names.sort()
+        return names
+
+    def test_hit(self):
+        # a second run, in a cache of its own, gets the same source from
+        # the entries of the first and writes none of its own
+        cache = decompile.DecompileCache(self.cachedir)
+        first = decompile.decompile_file(self.filename, None, cache)
+        entries = self.entries()
+        self.assert_(entries)
+        cache = decompile.DecompileCache(self.cachedir)
+        again = decompile.decompile_file(self.filename, None, cache)
+        self.assertEqual(again, first)
+        self.assertEqual(self.entries(), entries)
+        self.assertEqual(cache.written, 0)
+        self.assertEqual(first, decompile.decompile_file(self.filename, None))
+
+    def test_hit_is_used(self):
+        # the module is not decompiled again when its lines are cached
+        cache = decompile.DecompileCache(self.cachedir)
+        key = decompile.code_digest(self.code, (2, 0))
+        cache.put(key, {0: 'cached = 1'})
+        self.assertEqual(decompile.decompile_file(self.filename, None, cache),
+                         'cached = 1\n')
+
+    def test_version(self):
+        # entries are kept by version, so 1.5.2 doesn't see those of 2.0
+        cache = decompile.DecompileCache(self.cachedir)
+        decompile.decompile_file(self.filename, None, cache)
+        self.assertNotEqual(decompile.code_digest(self.code, (2, 0)),
+                            decompile.code_digest(self.code, (1, 5, 2)))
+        key, lines = decompile.Decompiler((2, 0), cache).lookup(self.code)
+        self.assert_(lines is not None)
+        key, lines = decompile.Decompiler((1, 5, 2), cache).lookup(self.code)
+        self.assert_(lines is None)
+
+    def fill(self, cache):
+        # four entries of the same size, used in the order of their keys
+        keys = ['aa01', 'aa02', 'bb03', 'bb04']
+        for i in range(len(keys)):
+            cache.put(keys[i], 'x' * 1000)
+            os.utime(cache.filename(keys[i]), (1000 + i, 1000 + i))
+        return keys, os.path.getsize(cache.filename(keys[0]))
+
+    def test_evict(self):
+        # the least recently used entries go first, and reading an entry
+        # counts as using it
+        cache = decompile.DecompileCache(self.cachedir)
+        keys, size = self.fill(cache)
+        self.assertNotEqual(cache.get(keys[0]), None)
+        cache.maxsize = size * 3
+        cache.evict()
+        self.assertEqual(map(lambda key, cache=cache: cache.get(key) is None,
+                             keys), [0, 1, 1, 0])
+
+    def test_evict_on_put(self):
+        # writing a sixteenth of the size since the last check evicts
+        cache = decompile.DecompileCache(self.cachedir, 40000)
+        for i in range(800):
+            cache.put('%04x' % i, 'x' * 100)
+        total = 0
+        for name in self.entries():
+            total = total + os.path.getsize(cache.filename(name))
+        self.assert_(total <= cache.maxsize, total)
+
+    def test_lock(self):
+        # a process that holds the lock is left to do the evicting
+        try:
+            import fcntl
+        except ImportError:
+            return
+        cache = decompile.DecompileCache(self.cachedir)
+        keys, size = self.fill(cache)
+        cache.maxsize = size
+        lock = open(os.path.join(self.cachedir, 'lock'), 'a')
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            cache.evict()
+            self.assertEqual(len(self.entries()), 4)
+        finally:
+            lock.close()
+        cache.evict()
+        self.assertEqual(len(self.entries()), 0)
+
+if __name__ == '__main__':
+    unittest.main()
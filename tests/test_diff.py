@@ -0,0 +1,107 @@
+#
+# test_diff.py - the function-level diff of two compiled modules
+#
+# Two versions of a module are compiled to 2.0 bytecode, and only the
+# functions and classes that changed, not those that moved, should be
+# in their diff.
+#
+
+import os, shutil, string, StringIO, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+OLD = '''\
+def f(a):
+    return a + 1
+
+def g(b):
+    return b * 2
+
+class C:
+    def m(self):
+        return 1
+'''
+
+# f is longer, which moves g and C down without changing them
+MOVED = '''\
+def f(a):
+    a = a + 1
+    return a
+
+def g(b):
+    return b * 2
+
+class C:
+    def m(self):
+        return 1
+'''
+
+class DiffTest(unittest.TestCase):
+
+    def diff(self, old, new):
+        return decompile.diff_code(
+            'old', (2, 0), compile20.compile_source(old),
+            'new', (2, 0), compile20.compile_source(new))
+
+    def labels(self, diff):
+        return map(lambda line: line[4:],
+                   filter(lambda line: line[:4] == '+++ ', diff))
+
+    def test_same(self):
+        self.assertEqual(self.diff(OLD, OLD), [])
+
+    def test_moved(self):
+        # g and C.m moved down a line, and only f is in the diff
+        diff = self.diff(OLD, MOVED)
+        self.assertEqual(self.labels(diff), ['new:f'])
+        self.assert_('-    return a + 1' in diff)
+        self.assert_('+    a = a + 1' in diff)
+
+    def test_moved_module(self):
+        # a blank line before everything moves every line but changes
+        # nothing
+        self.assertEqual(self.diff(OLD, '\n' + OLD), [])
+
+    def test_added_and_removed(self):
+        new = string.replace(OLD, 'def g(b)', 'def h(b)')
+        diff = self.diff(OLD, new)
+        # the module's names changed too
+        self.assertEqual(self.labels(diff), ['new:<module>', 'new:h', 'new:g'])
+        self.assert_('+def h(b):' in diff)
+        self.assert_('-def g(b):' in diff)
+
+    def test_nested(self):
+        new = string.replace(OLD, 'return 1', 'return 2')
+        diff = self.diff(OLD, new)
+        self.assertEqual(self.labels(diff), ['new:C.m'])
+        self.assert_('+    return 2' in diff)
+
+    def test_main(self):
+        # the diff is written with the exit status 1, even with options
+        # after --diff
+        directory = tempfile.mkdtemp()
+        try:
+            oldname = os.path.join(directory, 'old.pyc')
+            newname = os.path.join(directory, 'new.pyc')
+            compile20.write_pyc(compile20.compile_source(OLD), oldname)
+            compile20.write_pyc(compile20.compile_source(MOVED), newname)
+            stdout = sys.stdout
+            sys.stdout = StringIO.StringIO()
+            try:
+                status = decompile.main(['--diff', '-j', '1', oldname,
+                                         newname])
+                output = sys.stdout.getvalue()
+            finally:
+                sys.stdout = stdout
+            self.assertEqual(status, 1)
+            self.assert_(string.find(output, '+++ %s:f\n' % newname) >= 0,
+                         output)
+            self.assertEqual(decompile.diff_files(oldname, oldname,
+                                                  StringIO.StringIO()), 0)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
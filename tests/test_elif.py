@@ -0,0 +1,75 @@
+#
+# test_elif.py - if/elif chains, compiled to 2.0 bytecode by compile20
+#
+# A chain of elifs is decompiled one clause after another by the if
+# statement that starts it; these check that each clause comes out at
+# the level of the if, and that an if inside an else clause stays there.
+#
+
+import os, string, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+def decompile_source(source):
+    d = decompile.Decompiler((2, 0))
+    d.decompile(decompile.CodeCursor(compile20.compile_source(source)))
+    lines = d.getsource(0)
+    return string.join(map(lambda k, lines=lines: lines.get(k, ''),
+                           range(1, max(lines.keys()) + 1)), '\n') + '\n'
+
+class ElifTest(unittest.TestCase):
+
+    def check(self, source):
+        self.assertEqual(decompile_source(source), source)
+
+    def test_chain(self):
+        self.check('if a:\n'
+                   '    b = 1\n'
+                   'elif c:\n'
+                   '    d = 2\n'
+                   'elif e:\n'
+                   '    f = 3\n'
+                   'else:\n'
+                   '    g = 4\n')
+
+    def test_chain_without_else(self):
+        self.check('if a:\n'
+                   '    b = 1\n'
+                   'elif c:\n'
+                   '    d = 2\n'
+                   'elif e:\n'
+                   '    f = 3\n')
+
+    def test_clauses_on_one_line(self):
+        # each clause on the line of its header, where an elif used to
+        # come out as an if following "else:"
+        self.check('if a:\n'
+                   '    pass\n'
+                   'elif b: pass\n'
+                   'else: c = 3\n')
+        self.check('if a: b = 1\n'
+                   'elif c: d = 2\n')
+
+    def test_if_in_else(self):
+        self.check('if a:\n'
+                   '    b = 1\n'
+                   'else:\n'
+                   '    if c: d = 2\n'
+                   '    else: e = 3\n')
+
+    def test_chain_in_loop(self):
+        self.check('def f(x):\n'
+                   '    while x:\n'
+                   '        if x == 1:\n'
+                   '            y = 1\n'
+                   '        elif x == 2:\n'
+                   '            y = 2\n'
+                   '        else:\n'
+                   '            y = 3\n'
+                   '        x = x - 1\n'
+                   '    return y\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#
+# test_faults.py - isolating the code objects that can't be decompiled
+#
+# A 2.0 module has one of its code objects corrupted, by a first
+# instruction no handler decompiles.  That code object is replaced by a
+# commented disassembly and recorded as a fault, and the rest of the
+# module decompiles as before; with --strict, the whole file fails.
+#
+
+import json, os, shutil, string, StringIO, sys, tempfile, types, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+SOURCE = '''\
+def f(a):
+    return a + 1
+
+def g(b):
+    return b * 2
+
+x = f(g(3))
+'''
+
+class FaultTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'module.pyc')
+        self.code = compile20.compile_source(SOURCE, 'module.py')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, code):
+        compile20.write_pyc(code, self.filename)
+
+    def test_nested(self):
+        # only g is lost, and the fault says where
+        self.write(corrupt_nested(self.code, 'g'))
+        faults = []
+        source = decompile.decompile_file(self.filename, None, None, None,
+                                          None, faults)
+        lines = string.split(source, '\n')
+        self.assertEqual(lines[:2], ['def f(a):', '    return a + 1'])
+        self.assertEqual(lines[3], 'def g(b):')
+        self.assert_(lines[4][:35] == '    pass  # could not decompile (At',
+                     lines[4])
+        self.assertEqual(lines[6], 'x = f(g(3))')
+        self.assertEqual(len(faults), 1)
+        fault = faults[0]
+        self.assertEqual((fault['name'], fault['line'], fault['offset']),
+                         ('g', 4, 0))
+        self.assert_(string.find(fault['error'], 'STOP_CODE') >= 0)
+        # the source still compiles, to the same f and module code
+        recompiled = compile20.compile_source(source, 'module.py')
+        mismatches = []
+        decompile.compare_code(self.code, recompiled, '', mismatches,
+                               {('g', 4): 1})
+        self.assertEqual(mismatches, [])
+
+    def test_module(self):
+        # when the module itself fails, the whole file is the disassembly
+        self.write(corrupt(self.code))
+        faults = []
+        source = decompile.decompile_file(self.filename, None, None, None,
+                                          None, faults)
+        self.assertEqual(source[:30], 'pass  # could not decompile (A')
+        self.assertEqual(len(faults), 1)
+        self.assertEqual(faults[0]['name'], self.code.co_name)
+
+    def test_strict(self):
+        # without a list of faults, the failure is raised
+        self.write(corrupt_nested(self.code, 'g'))
+        self.assertRaises(AttributeError, quietly, decompile.decompile_file,
+                          self.filename, None)
+        filename, error, counts, details = quietly(
+            decompile.batch_worker, (self.filename, None, {'archive': 1}))
+        self.assert_(string.find(error, 'STOP_CODE') >= 0, error)
+        self.assert_(not details.has_key('faults'))
+        filename, error, counts, details = decompile.batch_worker(
+            (self.filename, None, {'archive': 1, 'isolate': 1}))
+        self.assertEqual(error, None)
+        self.assertEqual(counts, {'faults': 1})
+        self.assertEqual(details['faults'][0]['name'], 'g')
+
+    def test_main(self):
+        # the command line isolates faults unless it is --strict, and
+        # writes them to the --faults file
+        self.write(corrupt_nested(self.code, 'g'))
+        outdir = os.path.join(self.directory, 'out')
+        faultsname = os.path.join(self.directory, 'faults.json')
+        outname = os.path.join(outdir, 'module.py')
+        self.assertEqual(quietly(decompile.main,
+                                 ['-o', outdir, '--faults', faultsname,
+                                  self.filename]), 0)
+        self.assert_(os.path.exists(outname))
+        faults = json.load(open(faultsname))
+        self.assertEqual(faults.keys(), [self.filename])
+        self.assertEqual(faults[self.filename][0]['name'], 'g')
+        os.remove(outname)
+        self.assertEqual(quietly(decompile.main,
+                                 ['-o', outdir, '--strict', self.filename]),
+                         1)
+        self.assert_(not os.path.exists(outname))
+
+def quietly(function, *args):
+    # call function without the disassembly printed for a failure, or
+    # the summary of a batch
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = StringIO.StringIO()
+    try:
+        return apply(function, args)
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+def corrupt(code):
+    # code starting with STOP_CODE, which no handler decompiles
+    return replace_code(code, chr(0) + code.co_code[1:], code.co_consts)
+
+def corrupt_nested(code, name):
+    consts = []
+    for const in code.co_consts:
+        if type(const) is types.CodeType and const.co_name == name:
+            const = corrupt(const)
+        consts.append(const)
+    return replace_code(code, code.co_code, tuple(consts))
+
+def replace_code(code, co_code, co_consts):
+    return types.CodeType(code.co_argcount, code.co_nlocals,
+                          code.co_stacksize, code.co_flags, co_code,
+                          co_consts, code.co_names, code.co_varnames,
+                          code.co_filename, code.co_name,
+                          code.co_firstlineno, code.co_lnotab)
+
+if __name__ == '__main__':
+    unittest.main()
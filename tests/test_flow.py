@@ -0,0 +1,60 @@
+#
+# test_flow.py - ControlFlow on 2.0 code objects
+#
+
+import os, sys, types, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+SOURCE = '''\
+def f(a):
+    while a:
+        if a > 1:
+            break
+        a = a - 1
+    else:
+        a = 0
+    try:
+        b = a / 2
+    except ZeroDivisionError:
+        b = None
+    return b
+'''
+
+class FlowTest(unittest.TestCase):
+
+    def setUp(self):
+        module = compile20.compile_source(SOURCE)
+        self.code = filter(lambda c: type(c) is types.CodeType,
+                           module.co_consts)[0]
+
+    def test_blocks(self):
+        # Block and the lazily made blocks array agree, and both end with
+        # the number of blocks
+        flow = decompile.ControlFlow(self.code)
+        self.assert_(not flow.__dict__.has_key('blocks'))
+        n = len(self.code.co_code)
+        for offset in range(n + 1):
+            self.assertEqual(flow.Block(offset), flow.blocks[offset])
+        self.assertEqual(flow.Block(n), len(flow.starts))
+        for b in range(len(flow.starts)):
+            self.assertEqual(flow.Block(flow.starts[b]), b)
+            self.assertEqual(flow.Block(flow.ends[b] - 1), b)
+
+    def test_successors(self):
+        flow = decompile.ControlFlow(self.code)
+        for b in range(len(flow.starts)):
+            for s in flow.successors[b]:
+                self.assert_(0 <= s < len(flow.starts), `b, s`)
+        kinds = map(lambda region: region[0], flow.regions)
+        self.assertEqual(kinds, ['SETUP_LOOP', 'SETUP_EXCEPT'])
+
+    def test_shared_stream(self):
+        cursor = decompile.DecodedCodeCursor(self.code)
+        self.assert_(cursor.Flow().stream is cursor.stream)
+        self.assert_(cursor.Flow() is cursor.Flow())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#
+# test_golden.py - decompiled output of whole modules, against golden files
+#
+# Each golden/NAME.py is compiled to a 2.0 .pyc file by compile20 and
+# decompiled as the command line does it, and the source must be
+# golden/NAME.out exactly.  Where the two files differ, the .out file
+# shows how the decompiler writes the module: private names as they were
+# mangled, one import statement per module, and so on.  The source map
+# made at the same time, saved and loaded again, must place each
+# statement on its line of the output.
+#
+
+import StringIO, os, string, sys, tempfile, unittest
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import compile20, decompile
+
+def read(name):
+    f = open(os.path.join(here, 'golden', name))
+    try:
+        return f.read()
+    finally:
+        f.close()
+
+class GoldenTest(unittest.TestCase):
+
+    def decompile(self, name):
+        # the source and SourceMap of golden/NAME.py, decompiled from 2.0
+        # bytecode, with the map saved and loaded again
+        source = os.path.join(here, 'golden', name + '.py')
+        code = compile20.compile_source(read(name + '.py'), source)
+        fd, pycname = tempfile.mkstemp('.pyc')
+        os.close(fd)
+        try:
+            compile20.write_pyc(code, pycname)
+            sourcemap = decompile.SourceMap()
+            text = decompile.decompile_file(pycname, None,
+                                            sourcemap=sourcemap)
+        finally:
+            os.remove(pycname)
+        out = StringIO.StringIO()
+        sourcemap.dump(out)
+        out.seek(0)
+        return text, decompile.load_sourcemap(out)
+
+    def check(self, name):
+        text, sourcemap = self.decompile(name)
+        self.assertEqual(text, read(name + '.out'))
+        lines = string.split(text, '\n')
+        for table in sourcemap.tables:
+            spans = map(None, table['lines'], table['columns'],
+                        table['colends'])
+            for lineno, column, end in spans:
+                statement = lines[lineno - 1][column:end]
+                self.assert_(statement and
+                             statement == string.strip(statement),
+                             `table['name'], lineno, statement`)
+        return text, sourcemap
+
+    def test_nested(self):
+        # blocks inside loops inside blocks, in methods and functions
+        self.check('nested')
+
+    def test_elif(self):
+        # elif chains at each level, with and without else clauses
+        self.check('elif')
+
+    def test_oneline(self):
+        # several statements, and clauses, on one line
+        text, sourcemap = self.check('oneline')
+        for table in sourcemap.tables:
+            if table['name'] == '?':
+                break
+        lines = string.split(text, '\n')
+        statements = []
+        for k in range(len(table['lines'])):
+            if table['lines'][k] == 4:
+                statements.append(
+                    lines[3][table['columns'][k]:table['colends'][k]])
+        self.assertEqual(statements, ['for i in range(3):', 'x = i',
+                                      'y = x * 2'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#
+# test_memo.py - DecompileMemo, the in-memory memo of code objects
+#
+# Bodies that are the same but for where they are in a 2.0 module are
+# decompiled once, and give the same source as without the memo.
+#
+
+import os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+SOURCE = '''\
+def f(x):
+    return x * 2 + 1
+
+class A:
+    def f(x):
+        return x * 2 + 1
+
+class B:
+    def f(x):
+        return x * 2 + 1
+'''
+
+def decompile_code(code, memo=None):
+    d = decompile.Decompiler((2, 0), None, memo)
+    d.decompile(decompile.CodeCursor(code))
+    return d.getsource(0)
+
+class MemoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.code = compile20.compile_source(SOURCE)
+
+    def test_same_bodies(self):
+        # the second and third f are found in the memo, and placed at
+        # their own lines
+        memo = decompile.DecompileMemo()
+        self.assertEqual(decompile_code(self.code, memo),
+                         decompile_code(self.code))
+        self.assertEqual(memo.hits, 2)
+
+    def test_module_again(self):
+        # a module decompiled again is found whole
+        memo = decompile.DecompileMemo()
+        first = decompile_code(self.code, memo)
+        hits = memo.hits
+        self.assertEqual(decompile_code(self.code, memo), first)
+        self.assertEqual(memo.hits, hits + 1)
+
+    def test_digest(self):
+        # the digest of a code object is remembered, and is the same for
+        # a version as code_digest's
+        memo = decompile.DecompileMemo()
+        digest = memo.digest(self.code, (2, 0))
+        self.assertEqual(digest, decompile.code_digest(self.code, (2, 0)))
+        self.assert_(memo.digest(self.code, (2, 0)) is digest)
+        self.assertNotEqual(memo.digest(self.code, (1, 5, 2)), digest)
+
+    def test_evict(self):
+        # past maxsize, the least recently used quarter goes, and getting
+        # a value counts as using it
+        memo = decompile.DecompileMemo(4)
+        for key in 'abcd':
+            memo.put(key, {1: key})
+        self.assertEqual(memo.get('a'), {1: 'a'})
+        memo.put('e', {1: 'e'})
+        kept = memo.values.keys()
+        kept.sort()
+        self.assertEqual(kept, ['a', 'd', 'e'])
+        self.assertEqual(memo.get('b'), None)
+        self.assertEqual(memo.misses, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#
+# test_nodes.py - the expression nodes a Decompiler shares
+#
+
+import os, string, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+class NodesTest(unittest.TestCase):
+
+    def test_names(self):
+        # one node per name and kind in a module, nested code included,
+        # and none kept from one module to the next
+        d = decompile.Decompiler((2, 0))
+        local = d.name(decompile.Local, 'a')
+        self.assert_(d.name(decompile.Local, 'a') is local)
+        self.assert_(d.subdecompiler().name(decompile.Local, 'a') is local)
+        self.assert_(d.name(decompile.Global, 'a') is not local)
+        other = decompile.Decompiler((2, 0))
+        self.assert_(other.name(decompile.Local, 'a') is not local)
+        d.decompile(decompile.CodeCursor(compile20.compile_source(
+            'a = 1\ndef f(a):\n    return a\n')))
+        self.assert_(d.names[(decompile.Local, 'a')] is local)
+
+    def test_none(self):
+        # the shared node isn't made again, which would drop its text
+        str(decompile.CONSTANT_NONE)
+        d = decompile.Decompiler((2, 0))
+        self.assert_(d.constant(None) is decompile.CONSTANT_NONE)
+        self.assertEqual(decompile.CONSTANT_NONE.text, 'None')
+
+    def test_constants(self):
+        d = decompile.Decompiler((2, 0))
+        self.assertEqual(str(d.constant((1, Ellipsis))), '(1, Ellipsis)')
+        self.assertEqual(str(d.constant(((Ellipsis,),))), '((Ellipsis,),)')
+        self.assertEqual(str(d.constant(Ellipsis)), '...')
+        self.assertEqual(str(d.constant((1.0, 'a'))), "(1.0, 'a')")
+        # equal values of different types, or written differently, get
+        # nodes of their own
+        self.assertEqual(str(d.constant(1)), '1')
+        self.assertEqual(str(d.constant(1L)), '1L')
+        self.assertEqual(str(d.constant(-0.0)), '-0.0')
+        self.assertEqual(str(d.constant((0.0,))), '(0.0,)')
+        self.assertEqual(str(d.constant((-0.0,))), '(-0.0,)')
+        # equal strings share one
+        a = 'spam'
+        b = string.join(['sp', 'am'], '')
+        self.assert_(a is not b)
+        self.assert_(d.constant(a) is d.constant(b))
+        self.assert_(d.constant((b, 1)).items[0] is d.constant(a))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#
+# test_prescan.py - decompiling from a Prescan, on 2.0 modules
+#
+# A PrescannedCursor takes the instructions, line table and jumps of each
+# code object from a Prescan, and must decompile the golden modules to
+# the same source, and find the same control flow, as a CodeCursor.
+# Skipped without NumPy.
+#
+
+import glob, os, sys, unittest
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import compile20, decompile
+
+try:
+    import prescan
+except ImportError:
+    prescan = None
+
+def golden_codes():
+    codes = []
+    for filename in glob.glob(os.path.join(here, 'golden', '*.py')):
+        f = open(filename)
+        try:
+            codes.append(compile20.compile_source(f.read(), filename))
+        finally:
+            f.close()
+    return codes
+
+class PrescanTest(unittest.TestCase):
+
+    def setUp(self):
+        if prescan is None:
+            self.skipTest('NumPy is not installed')
+        self.codes = golden_codes()
+        codes = []
+        for code in self.codes:
+            codes.extend(prescan.code_objects(code))
+        self.scan = prescan.Prescan(codes)
+
+    def test_tables(self):
+        for code in self.codes:
+            for co in prescan.code_objects(code):
+                stream = decompile.InstructionStream(co)
+                self.assertEqual(self.scan.LineTable(co),
+                                 decompile.line_table(co))
+                self.assertEqual(self.scan.JumpTargets(co),
+                                 decompile.jump_targets(stream))
+
+    def test_flow(self):
+        for code in self.codes:
+            for co in prescan.code_objects(code):
+                expected = decompile.ControlFlow(co)
+                found = prescan.PrescannedCursor(co, self.scan).Flow()
+                for name in ('targets', 'sources', 'starts', 'ends',
+                             'successors', 'regions'):
+                    self.assertEqual(getattr(found, name),
+                                     getattr(expected, name), name)
+
+    def test_decompile(self):
+        for code in self.codes:
+            expected = decompile.Decompiler((2, 0))
+            expected.decompile(decompile.CodeCursor(code))
+            found = decompile.Decompiler((2, 0))
+            found.decompile(prescan.PrescannedCursor(code, self.scan))
+            self.assertEqual(found.getsource(0), expected.getsource(0))
+
+if __name__ == '__main__':
+    unittest.main()
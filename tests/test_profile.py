@@ -0,0 +1,102 @@
+#
+# test_profile.py - ProfilingDecompiler and HandlerProfile
+#
+# A 2.0 module with nested functions is decompiled with and without
+# profiling, and the counts of its handlers checked.
+#
+
+import os, string, StringIO, sys, types, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+SOURCE = '''\
+def f(a):
+    def g(b):
+        return b + 1
+    return g(a)
+
+def h(c):
+    if c:
+        return 1
+    return 2
+'''
+
+class ProfileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.code = compile20.compile_source(SOURCE)
+
+    def run_decompiler(self, d):
+        d.decompile(decompile.CodeCursor(self.code))
+        return d.getsource(0)
+
+    def test_same_source(self):
+        profile = decompile.HandlerProfile()
+        d = decompile.ProfilingDecompiler((2, 0), profile=profile)
+        self.assertEqual(self.run_decompiler(d),
+                         self.run_decompiler(decompile.Decompiler((2, 0))))
+        self.assert_(profile.stats)
+        self.assertEqual(profile.stack, [])
+
+    def test_counts(self):
+        # calls, the decompilers made by each handler and the depth of
+        # nesting it was called at
+        profile = decompile.HandlerProfile()
+        self.run_decompiler(decompile.ProfilingDecompiler((2, 0),
+                                                          profile=profile))
+        stats = profile.stats
+        calls, inclusive, exclusive, nested, depth = stats['MAKE_FUNCTION']
+        self.assertEqual(calls, 3)
+        self.assertEqual(nested, 3)
+        self.assertEqual(depth, 2)
+        # one call for each return, the implicit ones included
+        returns = 0
+        for co in code_objects(self.code):
+            stream = decompile.InstructionStream(co)
+            returns = returns + stream.opnames.count('RETURN_VALUE')
+        self.assertEqual(stats['RETURN_VALUE'][0], returns)
+        self.assertEqual(stats['RETURN_VALUE'][4], 3)
+        for name, (calls, inclusive, exclusive, nested, depth) in \
+            stats.items():
+            self.assert_(exclusive <= inclusive + 1e-6, name)
+
+    def test_plain_table(self):
+        # only the profiling class has its handlers wrapped
+        plain = decompile.dispatch_table(decompile.Decompiler)
+        wrapped = decompile.dispatch_table(decompile.ProfilingDecompiler)
+        op = decompile.opmap['RETURN_VALUE']
+        self.assert_(plain[op] is decompile.Decompiler.RETURN_VALUE.im_func)
+        self.assert_(wrapped[op] is not plain[op])
+
+    def test_merge_and_report(self):
+        profile = decompile.HandlerProfile()
+        self.run_decompiler(decompile.ProfilingDecompiler((2, 0),
+                                                          profile=profile))
+        batch = decompile.HandlerProfile()
+        batch.merge(profile.stats)
+        batch.merge(profile.stats)
+        self.assertEqual(batch.stats['MAKE_FUNCTION'][0], 6)
+        self.assertEqual(batch.stats['MAKE_FUNCTION'][4], 2)
+        out = StringIO.StringIO()
+        batch.report(out, 'all')
+        lines = string.split(out.getvalue(), '\n')
+        self.assertEqual(lines[0], 'all')
+        self.assertEqual(string.split(lines[1])[:2], ['handler', 'calls'])
+        names = map(lambda line: string.split(line)[0],
+                    filter(None, lines[2:]))
+        names.sort()
+        expected = batch.stats.keys()
+        expected.sort()
+        self.assertEqual(names, expected)
+
+def code_objects(code):
+    codes = [code]
+    for const in code.co_consts:
+        if type(const) is types.CodeType:
+            codes.extend(code_objects(const))
+    return codes
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#
+# test_sniff.py - the magic number registry and version sniffing
+#
+# Files of 1.5.2, 2.0 and 2.7 bytecode, and files that aren't compiled
+# modules, are grouped by their headers, and only the versions with a
+# Decompiler are read as code to decompile.
+#
+
+import imp, marshal, os, shutil, StringIO, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+MAGIC_152 = '\x99N\r\n'
+
+class SniffTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        code = compile20.compile_source('a = 1\n')
+        self.files = {}
+        self.write('old.pyc', MAGIC_152 + '\0\0\0\0' + compile20.dumps(code))
+        self.write('new.pyc', compile20.MAGIC + '\0\0\0\0' +
+                   compile20.dumps(code))
+        self.write('host.pyc', imp.get_magic() + '\0\0\0\0' +
+                   marshal.dumps(compile('a = 1\n', 'host.py', 'exec')))
+        self.write('junk.pyc', 'not a compiled module\n')
+        self.write('short.pyc', compile20.MAGIC)
+        self.missing = os.path.join(self.directory, 'missing.pyc')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, data):
+        filename = os.path.join(self.directory, name)
+        f = open(filename, 'wb')
+        f.write(data)
+        f.close()
+        self.files[name] = filename
+
+    def test_registry(self):
+        self.assertEqual(decompile.magics[MAGIC_152],
+                         ((1, 5, 2), decompile.Decompiler))
+        self.assertEqual(decompile.magics[compile20.MAGIC],
+                         ((2, 0), decompile.Decompiler))
+        version, handlers = decompile.magics[imp.get_magic()]
+        self.assertEqual(version, sys.version_info[:2])
+        self.assertEqual(handlers, None)
+        self.assertEqual(len(decompile.magics),
+                         len(decompile.MAGIC_NUMBERS))
+        self.assertEqual(decompile.version_name((1, 5, 2)), '1.5.2')
+        self.assertEqual(decompile.version_name(None), 'unknown')
+
+    def test_sniff(self):
+        # grouped by version in the order given, with files that can't be
+        # read or aren't compiled modules under None
+        names = ['new.pyc', 'junk.pyc', 'host.pyc', 'old.pyc', 'short.pyc']
+        filenames = map(self.files.get, names) + [self.missing]
+        groups = decompile.sniff_versions(filenames)
+        self.assertEqual(groups, {
+            (1, 5, 2): [self.files['old.pyc']],
+            (2, 0): [self.files['new.pyc']],
+            sys.version_info[:2]: [self.files['host.pyc']],
+            None: [self.files['junk.pyc'], self.files['short.pyc'],
+                   self.missing],
+            })
+
+    def test_read(self):
+        # a version with no Decompiler is only read when asked for
+        version, code = decompile.load_pyc(self.files['old.pyc'])
+        self.assertEqual(version, (1, 5, 2))
+        self.assertEqual(code.co_consts, (1, None))
+        try:
+            decompile.load_pyc(self.files['host.pyc'])
+        except RuntimeError, error:
+            self.assertEqual(str(error), 'Python %s bytecode is not '
+                             'supported' % decompile.version_name(
+                                 sys.version_info[:2]))
+        else:
+            self.fail('host bytecode was read')
+        version, code = decompile.load_pyc(self.files['host.pyc'], 0)
+        self.assertEqual(code.co_filename, 'host.py')
+        self.assertRaises(RuntimeError, decompile.load_pyc,
+                          self.files['junk.pyc'], 0)
+        self.assertRaises(RuntimeError, decompile.load_pyc,
+                          self.files['short.pyc'], 0)
+
+    def test_versions(self):
+        # --versions lists the groups, unknown first, reading only the
+        # headers
+        stdout = sys.stdout
+        sys.stdout = StringIO.StringIO()
+        try:
+            status = decompile.main(['--versions', self.directory])
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(status, 0)
+        self.assertEqual(output, 'unknown: 2 files\n    %s\n    %s\n'
+                         '1.5.2: 1 files\n    %s\n'
+                         '2.0: 1 files\n    %s\n'
+                         '%s: 1 files\n    %s\n' % (
+            self.files['junk.pyc'], self.files['short.pyc'],
+            self.files['old.pyc'], self.files['new.pyc'],
+            decompile.version_name(sys.version_info[:2]),
+            self.files['host.pyc']))
+
+if __name__ == '__main__':
+    unittest.main()
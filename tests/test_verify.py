@@ -0,0 +1,112 @@
+#
+# test_verify.py - the round trip of --verify, on 2.0 modules
+#
+# Modules are compiled to 2.0 .pyc files by compile20, and the verdicts
+# of verify_file and batch_worker checked: a module that decompiles to
+# the same code, one that doesn't, and files that can't be checked.
+#
+
+import os, string, sys, tempfile, types, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compile20, decompile
+
+class VerifyTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp('.pyc')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def compile(self, source, magic=None):
+        compile20.write_pyc(compile20.compile_source(source, 'mod.py'),
+                            self.filename)
+        if magic is not None:
+            f = open(self.filename, 'r+b')
+            try:
+                f.write(magic)
+            finally:
+                f.close()
+
+    def test_ok(self):
+        self.compile('import os\n'
+                     'def f(a, b=1):\n'
+                     '    for x in a:\n'
+                     '        if x > b:\n'
+                     '            return x\n'
+                     '    return os.sep\n')
+        verdict, cached = decompile.verify_file(self.filename)
+        self.assertEqual(verdict['status'], 'ok')
+        self.assertEqual(verdict['code_objects'], 2)
+        self.assertEqual(verdict['mismatches'], [])
+        self.assertEqual(cached, 0)
+
+    def test_mismatch(self):
+        # chained assignment is decompiled as one assignment after another
+        self.compile('a = b = f()\n')
+        verdict, cached = decompile.verify_file(self.filename)
+        self.assertEqual(verdict['status'], 'mismatch')
+        mismatch = verdict['mismatches'][0]
+        self.assertEqual(mismatch['name'], '<module>')
+        self.assertEqual(mismatch['construct'], 'assignment')
+        self.assertEqual(mismatch['line'], 1)
+
+    def test_skipped(self):
+        # 1.5.2 bytecode can be decompiled, but not compiled again
+        self.compile('a = 1\n', '\x99N\r\n')
+        verdict, cached = decompile.verify_file(self.filename)
+        self.assertEqual(verdict['status'], 'skipped')
+        self.assertEqual(verdict['code_objects'], 1)
+
+    def test_error(self):
+        # a file that can't be read still gets a verdict from the worker
+        self.compile('a = 1\n', 'junk')
+        filename, error, counts, details = decompile.batch_worker(
+            (self.filename, None, {'verify': 1}))
+        self.assert_(error is not None)
+        self.assertEqual(details['verdict']['status'], 'error')
+        self.assertEqual(counts, {'error': 1})
+        report = decompile.verify_report({filename: details['verdict']})
+        self.assertEqual(report['totals'], {'error': 1})
+        self.assertEqual(report['files'][filename]['error'], error)
+
+    def test_interned_constants(self):
+        # an interned string and an equal one that isn't marshal
+        # differently, but are the same constant
+        code = compile20.compile_source("a = 'fill'; b = 1.0\n")
+        plain = string.join(['fi', 'll'], '')
+        self.assert_(plain is not intern(plain))
+        mismatches = []
+        decompile.compare_code(with_consts(code, intern, 1.0),
+                               with_consts(code, lambda s, plain=plain: plain,
+                                           1.0),
+                               '', mismatches, {})
+        self.assertEqual(mismatches, [])
+        # while 1 and 1.0 are not
+        decompile.compare_code(with_consts(code, intern, 1.0),
+                               with_consts(code, intern, 1),
+                               '', mismatches, {})
+        self.assertEqual(map(lambda m: m['construct'], mismatches),
+                         ['constants'])
+
+def with_consts(code, string_const, number):
+    # code with its string constants passed through string_const and its
+    # float constant replaced by number
+    consts = []
+    for const in code.co_consts:
+        if type(const) is types.StringType:
+            const = string_const(const)
+        elif type(const) is types.FloatType:
+            const = number
+        consts.append(const)
+    return types.CodeType(code.co_argcount, code.co_nlocals,
+                          code.co_stacksize, code.co_flags, code.co_code,
+                          tuple(consts), code.co_names, code.co_varnames,
+                          code.co_filename, code.co_name,
+                          code.co_firstlineno, code.co_lnotab)
+
+if __name__ == '__main__':
+    unittest.main()